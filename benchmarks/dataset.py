@@ -0,0 +1,113 @@
+"""Reproducible synthetic datasets for the benchmark suite.
+
+The same :class:`DatasetSpec` always produces the same appliances, task history and readings
+(one seeded ``random.Random``, readings anchored at a fixed instant).  Task due dates are laid
+out relative to today so the due-task queries always have work to do.
+"""
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from math import sin, tau
+from typing import Iterator
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from home_dashboard import models, rollups
+
+META_KEY = "benchmark_dataset"
+READINGS_ANCHOR = datetime(2024, 1, 1, tzinfo=timezone.utc)
+INSERT_CHUNK = 10_000
+INTERVALS = (None, 3, 7, 14, 30, 90)
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    appliances: int = 1_000
+    tasks_per_appliance: int = 100
+    readings: int = 100_000
+    rooms: int = 8
+    # seconds between consecutive readings of the whole house
+    reading_step_s: int = 15
+    seed: int = 1
+
+    def key(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+    def room_names(self) -> list[str]:
+        return [f"room-{i:02d}" for i in range(self.rooms)]
+
+def _appliance_rows(spec: DatasetSpec, rng: random.Random) -> list[dict]:
+    created = READINGS_ANCHOR - timedelta(days=3 * 365)
+    return [
+        {
+            "id": i + 1,
+            "name": f"Bench appliance {i:06d}",
+            "cleaning_interval_days": rng.choice(INTERVALS),
+            "created_at": created + timedelta(minutes=i),
+        }
+        for i in range(spec.appliances)
+    ]
+
+def _task_rows(spec: DatasetSpec, appliances: list[dict], rng: random.Random) -> Iterator[dict]:
+    today = date.today()
+    for appliance in appliances:
+        interval = appliance["cleaning_interval_days"]
+        if not interval:
+            continue
+        # one open task somewhere between slightly overdue and a full interval ahead
+        upcoming = today + timedelta(days=rng.randint(-3, interval))
+        for k in range(spec.tasks_per_appliance - 1, 0, -1):
+            due = upcoming - timedelta(days=k * interval)
+            done = datetime.combine(due, datetime.min.time(), timezone.utc) + timedelta(hours=rng.randint(0, 47))
+            yield {"appliance_id": appliance["id"], "due_date": due, "completed": True, "completed_at": done}
+        yield {"appliance_id": appliance["id"], "due_date": upcoming, "completed": False, "completed_at": None}
+
+def _reading_rows(spec: DatasetSpec, rng: random.Random) -> Iterator[dict]:
+    rooms = spec.room_names()
+    start = READINGS_ANCHOR - timedelta(seconds=spec.reading_step_s * spec.readings)
+    for i in range(spec.readings):
+        recorded_at = start + timedelta(seconds=spec.reading_step_s * i)
+        daily = sin(tau * (recorded_at.hour * 60 + recorded_at.minute) / 1440)
+        room_index = i % len(rooms)
+        value = 19.0 + room_index * 0.5 + 2.5 * daily + rng.gauss(0, 0.3)
+        yield {"recorded_at": recorded_at, "value_c": round(value, 2), "room": rooms[room_index]}
+
+async def _insert_chunked(conn, table, rows: Iterator[dict]) -> int:
+    total = 0
+    chunk: list[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= INSERT_CHUNK:
+            await conn.execute(insert(table), chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        await conn.execute(insert(table), chunk)
+        total += len(chunk)
+    return total
+
+async def stored_spec(engine: AsyncEngine) -> str | None:
+    async with engine.connect() as conn:
+        return (await conn.execute(select(models.AppMeta.value).where(models.AppMeta.key == META_KEY))).scalar()
+
+async def generate(engine: AsyncEngine, spec: DatasetSpec) -> dict[str, int]:
+    """Fill an empty, initialised database; returns the row count per table."""
+    rng = random.Random(spec.seed)
+    appliances = _appliance_rows(spec, rng)
+    counts: dict[str, int] = {}
+    async with engine.begin() as conn:
+        counts["appliances"] = await _insert_chunked(conn, models.Appliance.__table__, iter(appliances))
+        counts["cleaning_tasks"] = await _insert_chunked(conn, models.CleaningTask.__table__, _task_rows(spec, appliances, rng))
+        counts["temperature_readings"] = await _insert_chunked(conn, models.TemperatureReading.__table__, _reading_rows(spec, rng))
+        # mark the dashboard defaults as seeded so they never mix into the synthetic data
+        await conn.execute(insert(models.AppMeta), [
+            {"key": "seed_defaults_done", "value": "1"},
+            {"key": META_KEY, "value": spec.key()},
+        ])
+    async with async_sessionmaker(engine)() as session:
+        counts["temperature_rollups"] = await rollups.backfill(session)
+        await session.commit()
+    return counts
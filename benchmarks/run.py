@@ -0,0 +1,272 @@
+"""Data-scale benchmarks for ``crud`` and the HTTP API.
+
+    PYTHONPATH=src python -m benchmarks.run --appliances 10000 --readings 1000000 --output bench.json
+    PYTHONPATH=src python -m benchmarks.run --baseline bench.json
+
+The dataset is generated once into an isolated SQLite file (``--db``) and reused while its
+spec matches.  Every case runs in-process (HTTP cases through ``ASGITransport``) and reports
+latency percentiles, SQL statements per call and peak Python memory of one traced call.
+With ``--baseline`` the run exits non-zero when a case got slower than ``--threshold`` or
+issues more queries than before.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+DEFAULT_DB = Path(__file__).parent / ".data" / "bench.db"
+# batch size of the write case; its readings live in a room of their own and are cleared afterwards
+WRITE_BATCH = 100
+WRITE_ROOM = "bench-writes"
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], Awaitable[object]]
+    teardown: Callable[[], Awaitable[object]] | None = None
+
+@dataclass
+class CaseResult:
+    iterations: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    queries: float
+    peak_kib: float
+
+class QueryCounter:
+    """Counts statements on the writer and reader engines via ``before_cursor_execute``."""
+
+    def __init__(self, *engines) -> None:
+        from sqlalchemy import event
+
+        self.count = 0
+        for engine in {id(e): e for e in engines}.values():
+            event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_args) -> None:
+        self.count += 1
+
+def _percentile(samples: list[float], pct: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+async def measure(case: Case, counter: QueryCounter, iterations: int, warmup: int) -> CaseResult:
+    for _ in range(warmup):
+        await case.run()
+    samples: list[float] = []
+    queries_before = counter.count
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await case.run()
+        samples.append((time.perf_counter() - started) * 1000)
+    queries = (counter.count - queries_before) / iterations
+    tracemalloc.start()
+    try:
+        await case.run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    if case.teardown is not None:
+        await case.teardown()
+    return CaseResult(
+        iterations=iterations,
+        mean_ms=statistics.fmean(samples),
+        p50_ms=_percentile(samples, 50),
+        p95_ms=_percentile(samples, 95),
+        p99_ms=_percentile(samples, 99),
+        max_ms=max(samples),
+        queries=queries,
+        peak_kib=peak / 1024,
+    )
+
+def build_cases(client, spec) -> list[Case]:
+    from home_dashboard import cache, crud, rollups
+    from home_dashboard.db import ReadSessionLocal, SessionLocal
+
+    room = spec.room_names()[0]
+    appliance_id = 1
+
+    def crud_case(name: str, call) -> Case:
+        async def run():
+            async with ReadSessionLocal() as session:  # type: ignore
+                return await call(session)
+        return Case(name, run)
+
+    def http_case(name: str, url: str, **params) -> Case:
+        async def run():
+            response = await client.get(url, params=params)
+            if response.status_code != 200:
+                raise RuntimeError(f"{name}: GET {url} returned {response.status_code}")
+        return Case(name, run)
+
+    async def dashboard_uncached():
+        # a version bump invalidates the payload cache, so every call rebuilds the dashboard
+        cache.bump()
+        response = await client.get("/api/dashboard")
+        response.raise_for_status()
+
+    etag: dict[str, str] = {}
+
+    async def dashboard_not_modified():
+        headers = {"If-None-Match": etag["value"]} if etag else {}
+        response = await client.get("/api/dashboard", headers=headers)
+        if "ETag" in response.headers:
+            etag["value"] = response.headers["ETag"]
+
+    written = {"batches": 0}
+
+    async def temperature_batch():
+        written["batches"] += 1
+        base = datetime(2030, 1, 1, tzinfo=timezone.utc) + timedelta(hours=written["batches"])
+        batch = [
+            {"value_c": 21.0, "room": WRITE_ROOM, "recorded_at": (base + timedelta(seconds=i)).isoformat()}
+            for i in range(WRITE_BATCH)
+        ]
+        response = await client.post("/api/temperature/batch", json=batch)
+        response.raise_for_status()
+
+    async def clear_write_room():
+        async with SessionLocal() as session:  # type: ignore
+            await crud.clear_temperatures(session, WRITE_ROOM)
+            await session.commit()
+
+    return [
+        crud_case("crud.list_appliances", crud.list_appliances),
+        crud_case("crud.list_appliances[limit=100]", lambda s: crud.list_appliances(s, limit=100)),
+        crud_case("crud.list_tasks_for_appliance", lambda s: crud.list_tasks_for_appliance(s, appliance_id)),
+        crud_case("crud.list_due_tasks", crud.list_due_tasks),
+        crud_case("crud.recent_temperatures", crud.recent_temperatures),
+        crud_case("crud.recent_temperatures_per_room", lambda s: crud.recent_temperatures_per_room(s, 100)),
+        crud_case("crud.list_temperatures[room]", lambda s: crud.list_temperatures(s, room)),
+        crud_case("rollups.query[hour]", lambda s: rollups.query(s, "hour", room)),
+        http_case("GET /api/appliances/", "/api/appliances/"),
+        http_case("GET /api/appliances/{id}/tasks", f"/api/appliances/{appliance_id}/tasks"),
+        http_case("GET /api/tasks/due", "/api/tasks/due"),
+        http_case("GET /api/temperature/", "/api/temperature/"),
+        http_case("GET /api/temperature/?room", "/api/temperature/", room=room),
+        http_case("GET /api/temperature/rollup", "/api/temperature/rollup", resolution="day"),
+        Case("GET /api/dashboard[uncached]", dashboard_uncached),
+        Case("GET /api/dashboard[304]", dashboard_not_modified),
+        Case(f"POST /api/temperature/batch[{WRITE_BATCH}]", temperature_batch, clear_write_room),
+    ]
+
+def _stored_spec(db_path: Path) -> str | None:
+    if not db_path.exists():
+        return None
+    with sqlite3.connect(db_path) as conn:
+        try:
+            row = conn.execute("SELECT value FROM app_meta WHERE key = 'benchmark_dataset'").fetchone()
+        except sqlite3.OperationalError:
+            return None
+    return row[0] if row else None
+
+def _remove_database(db_path: Path) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+async def run_suite(args: argparse.Namespace, spec) -> dict:
+    from httpx import ASGITransport, AsyncClient
+
+    from home_dashboard.db import dispose_engines, get_engine, get_read_engine, init_db
+    from home_dashboard.main import create_app
+
+    from . import dataset
+
+    await init_db()
+    engine = get_engine()
+    if await dataset.stored_spec(engine) is None:
+        started = time.perf_counter()
+        counts = await dataset.generate(engine, spec)
+        print(f"generated {counts} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    counter = QueryCounter(engine, get_read_engine())
+    results: dict[str, dict] = {}
+    async with AsyncClient(transport=ASGITransport(app=create_app()), base_url="http://bench") as client:
+        for case in build_cases(client, spec):
+            if args.only and not any(pattern in case.name for pattern in args.only):
+                continue
+            result = await measure(case, counter, args.iterations, args.warmup)
+            results[case.name] = asdict(result)
+            print(f"{case.name:45} p50 {result.p50_ms:9.2f} ms  p95 {result.p95_ms:9.2f} ms  "
+                  f"{result.queries:5.1f} q  {result.peak_kib:9.1f} KiB", file=sys.stderr)
+    await dispose_engines()
+    return {
+        "meta": {
+            "dataset": json.loads(spec.key()),
+            "iterations": args.iterations,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Human-readable regressions of ``current`` against ``baseline``."""
+    regressions = []
+    if current["meta"]["dataset"] != baseline["meta"]["dataset"]:
+        print("warning: baseline was recorded with a different dataset spec", file=sys.stderr)
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"] if before["p50_ms"] else 1.0
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: p50 {before['p50_ms']:.2f} -> {result['p50_ms']:.2f} ms ({ratio:.2f}x)")
+        if result["queries"] > before["queries"]:
+            regressions.append(f"{name}: queries per call {before['queries']:g} -> {result['queries']:g}")
+    return regressions
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="SQLite file for the synthetic dataset")
+    parser.add_argument("--appliances", type=int, default=1_000)
+    parser.add_argument("--tasks-per-appliance", type=int, default=100)
+    parser.add_argument("--readings", type=int, default=100_000)
+    parser.add_argument("--rooms", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", action="append", help="run cases whose name contains this (repeatable)")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare against a previous --output file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50 slowdown, 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    args.db.parent.mkdir(parents=True, exist_ok=True)
+    # the app's engines read the database URL from the environment when they are first created
+    os.environ["HOME_DASHBOARD_DB_URL"] = f"sqlite+aiosqlite:///{args.db.resolve()}"
+    from .dataset import DatasetSpec
+
+    spec = DatasetSpec(args.appliances, args.tasks_per_appliance, args.readings, args.rooms, seed=args.seed)
+    if _stored_spec(args.db) != spec.key():
+        _remove_database(args.db)
+
+    report = asyncio.run(run_suite(args, spec))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
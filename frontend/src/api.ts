@@ -1,6 +1,7 @@
 export const API_BASE = (import.meta as any).env?.VITE_API_BASE || 'http://127.0.0.1:8000';
 
 export interface Appliance { id: number; name: string; cleaning_interval_days: number | null; created_at: string; }
+export interface ApplianceOverview extends Appliance { next_task_id: number | null; next_due_date: string | null; overdue: boolean; last_completed_at: string | null; task_count: number; open_task_count: number; overdue_task_count: number; }
 export interface Task { id: number; appliance_id: number; due_date: string; completed: boolean; completed_at: string | null; }
 export interface TemperatureReading { id: number; recorded_at: string; value_c: number; room: string; }
 export interface DashboardData { due_tasks: Array<{ id: number; due_date: string; completed: boolean; completed_at: string | null; appliance: Appliance }>; recent_temps: TemperatureReading[]; recent_temps_by_room: Record<string, TemperatureReading[]>; }
@@ -20,6 +21,9 @@ export function getDashboard(): Promise<DashboardData> {
 export function listAppliances(): Promise<Appliance[]> {
   return json<Appliance[]>(fetch(`${API_BASE}/api/appliances/`));
 }
+export function listApplianceOverview(): Promise<ApplianceOverview[]> {
+  return json<ApplianceOverview[]>(fetch(`${API_BASE}/api/appliances/overview`));
+}
 export function createAppliance(name: string, interval?: number): Promise<Appliance> {
   return json<Appliance>(fetch(`${API_BASE}/api/appliances/`, {
     method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ name, cleaning_interval_days: interval ?? null })
@@ -53,3 +57,11 @@ export function clearTemps(room?: string): Promise<{ deleted: number }> {
   if (room) url.searchParams.set('room', room);
   return json<{ deleted: number }>(fetch(url, { method: 'DELETE' }));
 }
+export function openStream(onChange: () => void): () => void {
+  // any pushed change just triggers a (cheap, ETag-revalidated) dashboard reload
+  const source = new EventSource(`${API_BASE}/api/stream`);
+  for (const kind of ['temperature.added', 'temperature.batch', 'temperature.cleared', 'task.updated', 'lagged']) {
+    source.addEventListener(kind, onChange);
+  }
+  return () => source.close();
+}
@@ -1,9 +1,9 @@
 import React, { useEffect, useState, FormEvent } from 'react';
-import { listAppliances, createAppliance, updateInterval, bulkDelete, listTasks, completeTask, Appliance, Task } from '../api';
+import { listApplianceOverview, createAppliance, updateInterval, bulkDelete, listTasks, completeTask, ApplianceOverview, Task } from '../api';
 import { Box, Button, TextField, Checkbox, Card, CardContent, Typography, Table, TableBody, TableCell, TableRow, TableHead, Stack, Chip } from '@mui/material';
 
 export function Appliances() {
-  const [appliances, setAppliances] = useState<Appliance[]>([]);
+  const [appliances, setAppliances] = useState<ApplianceOverview[]>([]);
   const [newName, setNewName] = useState('');
   const [newInterval, setNewInterval] = useState<number | ''>('');
   const [selected, setSelected] = useState<Set<number>>(new Set());
@@ -14,7 +14,7 @@ export function Appliances() {
   async function refresh() {
     setLoading(true);
     try {
-      const data = await listAppliances();
+      const data = await listApplianceOverview();
       setAppliances(data);
     } catch (e: any) { setError(e.message); }
     finally { setLoading(false); }
@@ -56,7 +56,7 @@ export function Appliances() {
   }
 
   async function markComplete(task: Task) {
-    try { await completeTask(task.id); await loadTasks(task.appliance_id); } catch (e: any) { setError(e.message); }
+    try { await completeTask(task.id); await Promise.all([loadTasks(task.appliance_id), refresh()]); } catch (e: any) { setError(e.message); }
   }
 
   return (
@@ -76,7 +76,7 @@ export function Appliances() {
         {loading && <Typography variant="body2">Завантаження...</Typography>}
         <Box display="grid" gap={2} gridTemplateColumns="repeat(auto-fill,minmax(260px,1fr))">
           {appliances.map(a => {
-            const overdue = tasks[a.id]?.some(t => !t.completed && new Date(t.due_date) < new Date());
+            const overdue = a.overdue;
             return (
               <Card key={a.id} variant="outlined" sx={{ borderColor: selected.has(a.id)? 'primary.main': overdue? 'error.main': 'divider' }}>
                 <CardContent sx={{ display:'flex', flexDirection:'column', gap:1 }}>
@@ -87,6 +87,11 @@ export function Appliances() {
                   <Typography variant="body2" color="text.secondary">
                     {a.cleaning_interval_days ? `Кожні ${a.cleaning_interval_days} днів` : 'Без розкладу'}
                   </Typography>
+                  {a.next_due_date && (
+                    <Typography variant="body2" color={overdue ? 'error.main' : 'text.secondary'}>
+                      Наступне: {a.next_due_date} · відкритих {a.open_task_count}{a.overdue_task_count ? `, прострочених ${a.overdue_task_count}` : ''}
+                    </Typography>
+                  )}
                   <Stack direction="row" flexWrap="wrap" gap={1}>
                     <Button size="small" variant="contained" onClick={()=>changeInterval(a.id, a.cleaning_interval_days? null : 7)}>
                       {a.cleaning_interval_days ? 'Скасувати' : 'Встановити 7 днів'}
@@ -1,5 +1,5 @@
 import React, { useEffect, useState, FormEvent } from 'react';
-import { getDashboard, DashboardData, addTemp, clearTemps, completeTask } from '../api';
+import { getDashboard, DashboardData, addTemp, clearTemps, completeTask, openStream } from '../api';
 import { Box, Button, Card, CardContent, Typography, TextField, Stack, Chip } from '@mui/material';
 
 export function Dashboard() {
@@ -15,7 +15,14 @@ export function Dashboard() {
     setLoading(true);
     try { const result = await getDashboard(); setData(result); } catch (e: any) { setError(e.message); } finally { setLoading(false); }
   }
-  useEffect(() => { load(); const id = setInterval(load, 15000); return ()=>clearInterval(id); }, []);
+  useEffect(() => {
+    load();
+    let pending: ReturnType<typeof setTimeout> | null = null;
+    const close = openStream(() => { if (!pending) pending = setTimeout(() => { pending = null; load(); }, 500); });
+    // slow poll only as a fallback for missed pushes (e.g. the due-date horizon rolling over)
+    const id = setInterval(load, 60000);
+    return () => { close(); clearInterval(id); if (pending) clearTimeout(pending); };
+  }, []);
 
   async function submitTemp(e: FormEvent) {
     e.preventDefault();
@@ -1,3 +1,7 @@
+import time
+
+# start of the package import, the origin of the startup timing report
+IMPORT_STARTED = time.perf_counter()
+
 __all__ = ["create_app"]
 from .main import create_app  # noqa: E402
-
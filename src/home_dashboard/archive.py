@@ -0,0 +1,127 @@
+"""Completed-task archive and per-appliance completion statistics.
+
+``appliance_stats`` holds counters per appliance (completions, summed and maximum lateness,
+last completion, archived tasks).  A completion bumps them with one upsert, so history
+questions never scan tasks.  Reopening a completed task cannot be undone on a running maximum,
+so :func:`rebuild_stats` recomputes those appliances from the live and archived rows instead;
+it is also how the migration backfills existing databases.
+
+:func:`archive_completed` moves completed tasks older than a cutoff into
+``cleaning_tasks_archive`` (keeping their ids), which keeps ``cleaning_tasks`` down to the
+rows that scheduling and the due-task queries actually scan.  The retention worker runs it
+when ``HOME_DASHBOARD_TASK_ARCHIVE_DAYS`` is set.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Iterable, Sequence
+
+from sqlalchemy import Integer, cast, delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import changes, models
+
+def lateness_days(due_date: date, completed_at: datetime) -> int:
+    return (completed_at.date() - due_date).days
+
+async def record_completions(session: AsyncSession, completions: Iterable[tuple[int, date, datetime]]) -> None:
+    """Add ``(appliance_id, due_date, completed_at)`` completions to the counters, one upsert per call."""
+    rows: dict[int, dict] = {}
+    for appliance_id, due_date, completed_at in completions:
+        late = lateness_days(due_date, completed_at)
+        row = rows.setdefault(appliance_id, {
+            "appliance_id": appliance_id, "completions": 0, "total_lateness_days": 0,
+            "max_lateness_days": late, "last_completed_at": completed_at, "archived_tasks": 0,
+        })
+        row["completions"] += 1
+        row["total_lateness_days"] += late
+        row["max_lateness_days"] = max(row["max_lateness_days"], late)
+        row["last_completed_at"] = max(row["last_completed_at"], completed_at)
+    if not rows:
+        return
+    stats = models.ApplianceStats
+    stmt = sqlite_insert(stats).values(list(rows.values()))
+    excluded = stmt.excluded
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=[stats.appliance_id],
+        set_={
+            "completions": stats.completions + excluded.completions,
+            "total_lateness_days": stats.total_lateness_days + excluded.total_lateness_days,
+            # two-argument max() is SQLite's scalar max; coalesce covers rows rebuilt without completions
+            "max_lateness_days": func.max(func.coalesce(stats.max_lateness_days, excluded.max_lateness_days), excluded.max_lateness_days),
+            "last_completed_at": func.max(func.coalesce(stats.last_completed_at, excluded.last_completed_at), excluded.last_completed_at),
+        },
+    ))
+
+def rebuild_statements(appliance_ids: Sequence[int] | None = None) -> list:
+    """DELETE + INSERT ... SELECT recomputing the stats of ``appliance_ids`` (all when ``None``).
+
+    Plain statements, so the sync migration and async callers can both execute them.
+    """
+    live = models.CleaningTask
+    archived = models.ArchivedCleaningTask
+    stats = models.ApplianceStats
+    done = union_all(
+        select(live.appliance_id, live.due_date, live.completed_at, literal(0).label("archived"))
+        .where(live.completed == True, live.completed_at.is_not(None)),  # noqa: E712
+        select(archived.appliance_id, archived.due_date, archived.completed_at, literal(1)),
+    ).subquery()
+    late = cast(func.julianday(func.date(done.c.completed_at)) - func.julianday(done.c.due_date), Integer)
+    source = select(
+        done.c.appliance_id,
+        func.count(),
+        func.sum(late),
+        func.max(late),
+        func.max(done.c.completed_at),
+        func.sum(done.c.archived),
+    ).group_by(done.c.appliance_id)
+    clear = delete(stats)
+    if appliance_ids is not None:
+        source = source.where(done.c.appliance_id.in_(appliance_ids))
+        clear = clear.where(stats.appliance_id.in_(appliance_ids))
+    columns = ["appliance_id", "completions", "total_lateness_days", "max_lateness_days", "last_completed_at", "archived_tasks"]
+    return [clear, insert(stats).from_select(columns, source)]
+
+async def rebuild_stats(session: AsyncSession, appliance_ids: Sequence[int]) -> None:
+    for stmt in rebuild_statements(appliance_ids):
+        await session.execute(stmt)
+
+async def get_stats(session: AsyncSession, appliance_id: int) -> models.ApplianceStats | None:
+    return await session.get(models.ApplianceStats, appliance_id)
+
+async def archive_completed(session: AsyncSession, cutoff: datetime, limit: int) -> int:
+    """Move up to ``limit`` tasks completed before ``cutoff`` into the archive; returns how many."""
+    live = models.CleaningTask
+    archived = models.ArchivedCleaningTask
+    stats = models.ApplianceStats
+    rows = (await session.execute(
+        select(live.id, live.appliance_id)
+        .where(live.completed == True, live.completed_at < cutoff)  # noqa: E712
+        .order_by(live.completed_at)
+        .limit(limit)
+    )).all()
+    if not rows:
+        return 0
+    ids = [row.id for row in rows]
+    now = datetime.now(cutoff.tzinfo)
+    await session.execute(insert(archived).from_select(
+        ["id", "appliance_id", "due_date", "completed_at", "archived_at"],
+        select(live.id, live.appliance_id, live.due_date, live.completed_at, literal(now, models.ArchivedCleaningTask.archived_at.type))
+        .where(live.id.in_(ids)),
+    ))
+    await session.execute(delete(live).where(live.id.in_(ids)), execution_options={"synchronize_session": False})
+    for row in rows:
+        changes.record(session, "task.archived", {"id": row.id, "appliance_id": row.appliance_id}, entity_id=row.id)
+    per_appliance: dict[int, int] = {}
+    for row in rows:
+        per_appliance[row.appliance_id] = per_appliance.get(row.appliance_id, 0) + 1
+    stmt = sqlite_insert(stats).values([
+        {"appliance_id": appliance_id, "completions": 0, "total_lateness_days": 0, "archived_tasks": count}
+        for appliance_id, count in per_appliance.items()
+    ])
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=[stats.appliance_id],
+        set_={"archived_tasks": stats.archived_tasks + stmt.excluded.archived_tasks},
+    ))
+    return len(ids)
@@ -0,0 +1,126 @@
+"""In-process pub/sub fan-out for live dashboard updates.
+
+Write paths in ``crud`` attach events to their session with :func:`publish_after_commit`;
+they are handed to the process-wide :data:`broadcaster` only once the session commits, so
+subscribers never see rolled-back changes.  Each subscriber owns a bounded buffer: a slow
+consumer gets older temperature updates for the same room coalesced into the newest one, and
+beyond that the oldest events are dropped and counted so the client knows to resync.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Iterable
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_PENDING_KEY = "home_dashboard.pending_events"
+# only the latest value matters for these, so a backlog of them collapses per room
+COALESCED_KINDS = frozenset({"temperature.added", "temperature.batch"})
+
+@dataclass
+class Event:
+    kind: str
+    data: dict[str, Any]
+    room: str | None = None
+    id: int = 0
+
+    def to_sse(self) -> str:
+        payload = json.dumps(self.data, default=_json_default, separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.kind}\ndata: {payload}\n\n"
+
+def _json_default(value: object) -> object:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+@dataclass(eq=False)
+class Subscription:
+    rooms: frozenset[str] | None = None
+    max_queue: int = 100
+    dropped: int = 0
+    _events: deque[Event] = field(default_factory=deque)
+    _ready: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def wants(self, event: Event) -> bool:
+        # room-less events (task updates, clears of every room) go to everyone
+        return self.rooms is None or event.room is None or event.room in self.rooms
+
+    def offer(self, event: Event) -> None:
+        if not self.wants(event):
+            return
+        if len(self._events) >= self.max_queue:
+            if event.kind in COALESCED_KINDS and self._coalesce(event):
+                return
+            self._events.popleft()
+            self.dropped += 1
+        self._events.append(event)
+        self._ready.set()
+
+    def _coalesce(self, event: Event) -> bool:
+        for i, queued in enumerate(self._events):
+            if queued.kind in COALESCED_KINDS and queued.room == event.room:
+                del self._events[i]
+                self._events.append(event)
+                self.dropped += 1
+                return True
+        return False
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+    async def get(self, timeout: float | None = None) -> Event | None:
+        """Next event, or ``None`` if nothing arrived within ``timeout`` seconds."""
+        if not self._events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._events.popleft()
+
+class Broadcaster:
+    def __init__(self) -> None:
+        self._subscribers: set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, rooms: Iterable[str] | None = None, max_queue: int = 100) -> Subscription:
+        sub = Subscription(frozenset(rooms) if rooms else None, max_queue)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    def publish(self, event: Event) -> None:
+        """Non-blocking fan-out: cost is one append per interested subscriber."""
+        event.id = next(self._ids)
+        self.published += 1
+        for sub in self._subscribers:
+            sub.offer(event)
+
+broadcaster = Broadcaster()
+
+def publish_after_commit(session: AsyncSession | Session, event: Event) -> None:
+    session.info.setdefault(_PENDING_KEY, []).append(event)
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for event in session.info.pop(_PENDING_KEY, ()):
+        broadcaster.publish(event)
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,92 @@
+"""Versioned in-process cache for pre-serialized dashboard payloads.
+
+Write paths in ``crud`` call :func:`mark_changed` on their session; once that session commits,
+the process-wide data version is bumped, which changes every ETag and leaves older cache
+entries to age out of the LRU.  Bumping after commit (not when the write is issued) means a
+reader can never cache pre-commit data under the new version.
+
+The counter only sees this process's commits, so callers also key ETags on
+``changes.head`` (the newest change-log id), which moves with writes from every worker.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+import uuid
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_CHANGED_KEY = "home_dashboard.data_changed"
+# distinguishes ETags across restarts, when the counter starts over
+_BOOT_ID = uuid.uuid4().hex[:8]
+_version = 0
+
+def data_version() -> int:
+    return _version
+
+def bump() -> int:
+    global _version
+    _version += 1
+    return _version
+
+def mark_changed(session: AsyncSession | Session) -> None:
+    """Flag the session so the data version is bumped when (and only if) it commits."""
+    session.info[_CHANGED_KEY] = True
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    if session.info.pop(_CHANGED_KEY, False):
+        bump()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+
+class ResponseCache:
+    """Small LRU of serialized response bodies keyed by their ETag.
+
+    ``ttl_s`` additionally expires every tag after that many seconds; 0 relies on the versions alone.
+    """
+
+    def __init__(self, max_entries: int = 32, ttl_s: float = 0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> ResponseCache:
+        return cls(ttl_s=float(os.getenv("HOME_DASHBOARD_DASHBOARD_CACHE_TTL_S", "0")))
+
+    def etag(self, *key: object, shared_version: int = 0) -> str:
+        """Tag for ``key`` at the current local version and ``shared_version`` (see ``changes.head``)."""
+        epoch = int(time.monotonic() // self.ttl_s) if self.ttl_s > 0 else 0
+        version = data_version()
+        digest = hashlib.blake2b(repr((version, shared_version, epoch, key)).encode(), digest_size=8).hexdigest()
+        return f'"{_BOOT_ID}-{version}-{digest}"'
+
+    def get(self, etag: str) -> bytes | None:
+        body = self._entries.get(etag)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(etag)
+        self.hits += 1
+        return body
+
+    def put(self, etag: str, body: bytes) -> None:
+        self._entries[etag] = body
+        self._entries.move_to_end(etag)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
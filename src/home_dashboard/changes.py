@@ -0,0 +1,114 @@
+"""Change log behind ``GET /api/changes`` (delta sync).
+
+Write paths call :func:`record` with the session they write through; the entries are queued
+on the session and written with one multi-row INSERT just before it commits, so they commit
+(or roll back) together with the changes they describe and entry ids follow commit order:
+SQLite has one writer at a time and the ids are taken under its lock.  A client keeps the id of
+the last entry it applied and asks for everything after it, paying only for what changed.
+
+Entries older than ``HOME_DASHBOARD_CHANGE_LOG_HOURS`` are compacted by the retention worker;
+the highest compacted id is kept in ``app_meta``, and a client whose cursor is below it (or
+ahead of the log, e.g. after a database reset) is told to resync from the full endpoints.
+
+Kinds: ``appliance.created|updated|deleted``, ``task.created|updated|deleted|archived``,
+``temperature.added|batch|cleared|purged``.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import models
+
+COMPACTED_KEY = "change_log_compacted_through"
+_PENDING_KEY = "home_dashboard.pending_changes"
+# 5 bound parameters per entry keeps each INSERT well below SQLite's variable limit
+_CHUNK = 500
+
+def _json_default(value: object) -> object:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def record(session: AsyncSession | Session, kind: str, data: dict[str, Any], entity_id: int | None = None, room: str | None = None) -> None:
+    """Queue an entry; it is written in the same transaction right before the session commits."""
+    session.info.setdefault(_PENDING_KEY, []).append({
+        "kind": kind,
+        "entity_id": entity_id,
+        "room": room,
+        "data": json.dumps(data, default=_json_default, separators=(",", ":")),
+    })
+
+@event.listens_for(Session, "before_commit")
+def _write_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    now = datetime.now(timezone.utc)
+    for entry in pending:
+        entry["created_at"] = now
+    for start in range(0, len(pending), _CHUNK):
+        session.execute(insert(models.ChangeLogEntry).values(pending[start:start + _CHUNK]))
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+async def compacted_through(session: AsyncSession) -> int:
+    value = (await session.execute(select(models.AppMeta.value).where(models.AppMeta.key == COMPACTED_KEY))).scalar()
+    return int(value) if value else 0
+
+async def _bounds(session: AsyncSession) -> tuple[int, int]:
+    """(compaction watermark, id of the newest entry ever written) in one query."""
+    watermark = select(models.AppMeta.value).where(models.AppMeta.key == COMPACTED_KEY).scalar_subquery()
+    newest, floor = (await session.execute(select(func.max(models.ChangeLogEntry.id), watermark))).one()
+    floor = int(floor) if floor else 0
+    return floor, max(newest or 0, floor)
+
+async def head(session: AsyncSession) -> int:
+    """Grows with every commit that logged a change, in any process; it never goes back on compaction."""
+    return (await _bounds(session))[1]
+
+@dataclass
+class ChangesPage:
+    changes: list
+    next: int
+    has_more: bool
+    resync_required: bool
+
+async def since(session: AsyncSession, cursor: int | None, limit: int) -> ChangesPage:
+    """Entries after ``cursor`` (oldest first), or a resync signal when they are no longer all there."""
+    entry = models.ChangeLogEntry
+    # one snapshot for the watermark and the entries
+    conn = await session.connection()
+    await conn.exec_driver_sql("BEGIN")
+    floor, head = await _bounds(session)
+    if cursor is None or cursor < floor or cursor > head:
+        return ChangesPage([], head, False, True)
+    rows = (await session.execute(
+        select(entry.id, entry.kind, entry.entity_id, entry.room, entry.data, entry.created_at)
+        .where(entry.id > cursor)
+        .order_by(entry.id)
+        .limit(limit + 1)
+    )).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return ChangesPage(rows, rows[-1].id if rows else cursor, has_more, False)
+
+async def compact(session: AsyncSession, cutoff: datetime) -> int:
+    """Delete entries created before ``cutoff`` and raise the compaction watermark; returns rows deleted."""
+    entry = models.ChangeLogEntry
+    through = (await session.execute(select(func.max(entry.id)).where(entry.created_at < cutoff))).scalar()
+    if through is None:
+        return 0
+    result = await session.execute(delete(entry).where(entry.id <= through))
+    stmt = sqlite_insert(models.AppMeta).values(key=COMPACTED_KEY, value=str(through))
+    await session.execute(stmt.on_conflict_do_update(index_elements=["key"], set_={"value": stmt.excluded.value}))
+    return result.rowcount or 0
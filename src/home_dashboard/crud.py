@@ -1,9 +1,17 @@
 from __future__ import annotations
-from sqlalchemy import select, delete
+import os
+from typing import Sequence
+from sqlalchemy import and_, case, func, select, delete, insert, text, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 from datetime import datetime, timezone, date, timedelta
-from . import models
+from . import archive, broadcast, cache, changes, models, recent, rollups, scheduling, schemas
+
+# Tasks due within this many days from today count as "due" on the dashboard.
+DUE_HORIZON_DAYS = int(os.getenv("HOME_DASHBOARD_DUE_HORIZON_DAYS", "2"))
+
+# Rows per multi-row INSERT; 3 bound params per reading stays far below SQLite's variable limit.
+TEMPERATURE_BATCH_CHUNK = 500
 
 async def create_appliance(session: AsyncSession, name: str, cleaning_interval_days: int | None):
     existing = await session.execute(select(models.Appliance).where(models.Appliance.name == name))
@@ -12,24 +20,208 @@ async def create_appliance(session: AsyncSession, name: str, cleaning_interval_d
         # update interval if provided and different
         if cleaning_interval_days and appliance.cleaning_interval_days != cleaning_interval_days:
             appliance.cleaning_interval_days = cleaning_interval_days
+            cache.mark_changed(session)
+            _appliance_changed(session, "appliance.updated", appliance)
         return appliance
     appliance = models.Appliance(name=name, cleaning_interval_days=cleaning_interval_days)
     session.add(appliance)
     await session.flush()
-    await models.ensure_future_task(session, appliance)
+    _appliance_changed(session, "appliance.created", appliance)
+    await scheduling.ensure_future_task(session, appliance)
+    cache.mark_changed(session)
     return appliance
 
-async def list_appliances(session: AsyncSession):
-    result = await session.execute(select(models.Appliance).order_by(models.Appliance.created_at.desc()))
-    return result.scalars().all()
+def _appliance_changed(session: AsyncSession, kind: str, appliance) -> None:
+    payload = {
+        "id": appliance.id,
+        "name": appliance.name,
+        "cleaning_interval_days": appliance.cleaning_interval_days,
+        "created_at": appliance.created_at,
+    }
+    changes.record(session, kind, payload, entity_id=appliance.id)
+
+# Read paths below select plain columns and return Core rows (attribute access like the ORM
+# objects, without identity-map bookkeeping); ``payloads`` renders them straight to JSON.
+APPLIANCE_COLUMNS = (
+    models.Appliance.id,
+    models.Appliance.name,
+    models.Appliance.cleaning_interval_days,
+    models.Appliance.created_at,
+)
+TASK_COLUMNS = (
+    models.CleaningTask.id,
+    models.CleaningTask.appliance_id,
+    models.CleaningTask.due_date,
+    models.CleaningTask.completed,
+    models.CleaningTask.completed_at,
+)
+READING_COLUMNS = (
+    models.TemperatureReading.id,
+    models.TemperatureReading.recorded_at,
+    models.TemperatureReading.value_c,
+    models.TemperatureReading.room,
+)
+
+async def list_appliances(session: AsyncSession, limit: int | None = None, before: tuple[datetime, int] | None = None):
+    """Newest first; ``before`` is the (created_at, id) of the last appliance of the previous page."""
+    appliance = models.Appliance
+    stmt = select(*APPLIANCE_COLUMNS).order_by(appliance.created_at.desc(), appliance.id.desc())
+    if before is not None:
+        stmt = stmt.where(tuple_(appliance.created_at, appliance.id) < tuple_(*before))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await session.execute(stmt)
+    return result.all()
+
+async def appliance_overview(session: AsyncSession, limit: int | None = None, before: tuple[datetime, int] | None = None):
+    """Every appliance with its task summary, newest first, in one statement.
+
+    Task counts and the earliest open due date are aggregated per appliance in one pass over
+    ``cleaning_tasks`` (archived tasks are not counted); the open task on that date is joined
+    back for its id and the last completion comes from ``appliance_stats``.  Appliances
+    without tasks come back with zero counts and NULLs.
+    """
+    appliance = models.Appliance
+    task = models.CleaningTask
+    today = date.today()
+    stats = (
+        select(
+            task.appliance_id,
+            func.count().label("task_count"),
+            func.count(case((task.completed == False, 1))).label("open_task_count"),  # noqa: E712
+            func.count(case((and_(task.completed == False, task.due_date < today), 1))).label("overdue_task_count"),  # noqa: E712
+            func.min(case((task.completed == False, task.due_date))).label("next_due_date"),  # noqa: E712
+        )
+        .group_by(task.appliance_id)
+        .subquery()
+    )
+    next_task = (
+        select(task.appliance_id, func.min(task.id).label("next_task_id"))
+        .join(stats, and_(
+            stats.c.appliance_id == task.appliance_id,
+            task.due_date == stats.c.next_due_date,
+            task.completed == False,  # noqa: E712
+        ))
+        .group_by(task.appliance_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            *APPLIANCE_COLUMNS,
+            next_task.c.next_task_id,
+            stats.c.next_due_date,
+            models.ApplianceStats.last_completed_at,
+            func.coalesce(stats.c.task_count, 0).label("task_count"),
+            func.coalesce(stats.c.open_task_count, 0).label("open_task_count"),
+            func.coalesce(stats.c.overdue_task_count, 0).label("overdue_task_count"),
+        )
+        .outerjoin(stats, stats.c.appliance_id == appliance.id)
+        .outerjoin(next_task, next_task.c.appliance_id == appliance.id)
+        .outerjoin(models.ApplianceStats, models.ApplianceStats.appliance_id == appliance.id)
+        .order_by(appliance.created_at.desc(), appliance.id.desc())
+    )
+    if before is not None:
+        stmt = stmt.where(tuple_(appliance.created_at, appliance.id) < tuple_(*before))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return (await session.execute(stmt)).all()
+
+async def appliance_names(session: AsyncSession, appliance_id: int | None = None) -> dict[int, str]:
+    stmt = select(models.Appliance.id, models.Appliance.name)
+    if appliance_id is not None:
+        stmt = stmt.where(models.Appliance.id == appliance_id)
+    return dict((await session.execute(stmt)).all())
+
+async def appliance_exists(session: AsyncSession, appliance_id: int) -> bool:
+    return (await session.execute(select(models.Appliance.id).where(models.Appliance.id == appliance_id))).first() is not None
 
 async def get_appliance(session: AsyncSession, appliance_id: int):
     result = await session.execute(select(models.Appliance).where(models.Appliance.id == appliance_id))
     return result.scalars().first()
 
-async def list_tasks_for_appliance(session: AsyncSession, appliance_id: int):
-    result = await session.execute(select(models.CleaningTask).where(models.CleaningTask.appliance_id == appliance_id).order_by(models.CleaningTask.due_date))
-    return result.scalars().all()
+async def delete_appliances(session: AsyncSession, ids: Sequence[int]) -> int:
+    """Delete appliances with their tasks, archived tasks and stats; set-based DELETEs per chunk of ids."""
+    deleted = 0
+    for chunk in scheduling.chunks(sorted(set(ids))):
+        for dependent in (models.CleaningTask.appliance_id, models.ArchivedCleaningTask.appliance_id, models.ApplianceStats.appliance_id):
+            await session.execute(
+                delete(dependent.class_).where(dependent.in_(chunk)),
+                execution_options={"synchronize_session": False},
+            )
+        result = await session.execute(
+            delete(models.Appliance).where(models.Appliance.id.in_(chunk)).returning(models.Appliance.id),
+            execution_options={"synchronize_session": False},
+        )
+        for appliance_id in result.scalars():
+            changes.record(session, "appliance.deleted", {"id": appliance_id}, entity_id=appliance_id)
+            deleted += 1
+    if deleted:
+        cache.mark_changed(session)
+    return deleted
+
+async def upsert_appliances(
+    session: AsyncSession,
+    items: Sequence[schemas.ApplianceCreate],
+    update_existing: bool = True,
+) -> schemas.BulkUpsertAppliancesResult:
+    """Create or update appliances by name with one INSERT ... ON CONFLICT per chunk.
+
+    Like ``create_appliance``, an existing appliance only takes a new interval when one is given;
+    ``updated`` counts the appliances whose interval actually changed.  Newly created appliances
+    get their first task scheduled in bulk.
+    """
+    appliance = models.Appliance
+    intervals = {item.name: item.cleaning_interval_days for item in items}  # last occurrence wins
+    now = datetime.now(timezone.utc)
+    created_ids: list[int] = []
+    updated = 0
+    for chunk in scheduling.chunks(list(intervals)):
+        existing = set((await session.execute(select(appliance.name).where(appliance.name.in_(chunk)))).scalars())
+        stmt = sqlite_insert(appliance).values(
+            [{"name": name, "cleaning_interval_days": intervals[name], "created_at": now} for name in chunk]
+        )
+        if update_existing:
+            # rows whose interval is blank or unchanged are left alone and not returned
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[appliance.name],
+                set_={"cleaning_interval_days": stmt.excluded.cleaning_interval_days},
+                where=and_(
+                    stmt.excluded.cleaning_interval_days.is_not(None),
+                    appliance.cleaning_interval_days.is_distinct_from(stmt.excluded.cleaning_interval_days),
+                ),
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[appliance.name])
+        returned = stmt.returning(appliance.id, appliance.name, appliance.cleaning_interval_days, appliance.created_at)
+        for row in (await session.execute(returned)).all():
+            if row.name in existing:
+                updated += 1
+                _appliance_changed(session, "appliance.updated", row)
+            else:
+                created_ids.append(row.id)
+                _appliance_changed(session, "appliance.created", row)
+    states = await scheduling.load_states(session, created_ids) if created_ids else {}
+    scheduled = len(await scheduling.insert_tasks(
+        session, {id_: due for id_, state in states.items() if (due := state.next_due()) is not None}
+    ))
+    if created_ids or updated:
+        cache.mark_changed(session)
+    return schemas.BulkUpsertAppliancesResult(created=len(created_ids), updated=updated, scheduled=scheduled)
+
+async def list_tasks_for_appliance(
+    session: AsyncSession,
+    appliance_id: int,
+    limit: int | None = None,
+    after: tuple[date, int] | None = None,
+):
+    task = models.CleaningTask
+    stmt = select(*TASK_COLUMNS).where(task.appliance_id == appliance_id).order_by(task.due_date, task.id)
+    if after is not None:
+        stmt = stmt.where(tuple_(task.due_date, task.id) > tuple_(*after))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await session.execute(stmt)
+    return result.all()
 
 async def update_appliance_interval(session: AsyncSession, appliance_id: int, new_interval: int | None):
     appliance = await get_appliance(session, appliance_id)
@@ -37,75 +229,306 @@ async def update_appliance_interval(session: AsyncSession, appliance_id: int, ne
         return None
     old_interval = appliance.cleaning_interval_days
     appliance.cleaning_interval_days = new_interval
+    cache.mark_changed(session)
+    _appliance_changed(session, "appliance.updated", appliance)
     # remove all future incomplete tasks regardless of interval value
-    future_tasks_stmt = select(models.CleaningTask).where(
-        models.CleaningTask.appliance_id == appliance_id,
-        models.CleaningTask.completed == False,  # noqa: E712
-        models.CleaningTask.due_date >= date.today(),
+    removed = await session.execute(
+        delete(models.CleaningTask).where(
+            models.CleaningTask.appliance_id == appliance_id,
+            models.CleaningTask.completed == False,  # noqa: E712
+            models.CleaningTask.due_date >= date.today(),
+        ).returning(models.CleaningTask.id)
     )
-    result = await session.execute(future_tasks_stmt)
-    for t in result.scalars().all():
-        await session.delete(t)
-    await session.flush()
+    for task_id in removed.scalars():
+        changes.record(session, "task.deleted", {"id": task_id}, entity_id=task_id)
     if new_interval:
         # schedule from today (more intuitive after interval change)
         due = date.today() + timedelta(days=new_interval)
         new_task = models.CleaningTask(appliance_id=appliance.id, due_date=due)
         session.add(new_task)
         await session.flush()
+        scheduling.record_created(session, [new_task])
     return appliance
 
+def _set_completed(task: models.CleaningTask, completed: bool, now: datetime) -> int:
+    """Apply a completion change; +1 when the task became completed, -1 when reopened, else 0.
+
+    Completing an already completed task keeps its original completion time.
+    """
+    if completed == bool(task.completed):
+        return 0
+    task.completed = completed
+    task.completed_at = now if completed else None
+    return 1 if completed else -1
+
+async def _update_stats(session: AsyncSession, changed: Sequence[tuple[models.CleaningTask, int]]) -> None:
+    done = [(t.appliance_id, t.due_date, t.completed_at) for t, change in changed if change > 0]
+    reopened = sorted({t.appliance_id for t, change in changed if change < 0})
+    await archive.record_completions(session, done)
+    if reopened:
+        # a running maximum cannot be decremented; recount those appliances
+        await session.flush()
+        await archive.rebuild_stats(session, reopened)
+
 async def complete_task(session: AsyncSession, task_id: int, completed: bool):
     result = await session.execute(select(models.CleaningTask).where(models.CleaningTask.id == task_id))
     task = result.scalars().first()
     if not task:
         return None
-    task.completed = completed
-    task.completed_at = datetime.now(timezone.utc) if completed else None
+    change = _set_completed(task, completed, datetime.now(timezone.utc))
+    await _update_stats(session, [(task, change)])
+    cache.mark_changed(session)
+    _task_updated(session, task)
     if completed:
         appliance_result = await session.execute(select(models.Appliance).where(models.Appliance.id == task.appliance_id))
         appliance = appliance_result.scalars().first()
         if appliance:
-            await models.ensure_future_task(session, appliance)
+            await scheduling.ensure_future_task(session, appliance)
     await session.flush()
     return task
 
-async def list_due_tasks(session: AsyncSession):
-    from datetime import date
-    today = date.today()
-    stmt = select(models.CleaningTask).options(selectinload(models.CleaningTask.appliance)).where(models.CleaningTask.completed == False).order_by(models.CleaningTask.due_date)  # noqa: E712
+async def complete_tasks(session: AsyncSession, updates: dict[int, bool]):
+    """Apply many completion changes in one transaction; returns (updated tasks, created follow-ups).
+
+    Tasks are loaded with one query and the scheduling state of every appliance that had a
+    task completed with another; follow-ups are computed in memory and written with a
+    multi-row INSERT ... RETURNING.  Unknown task ids are skipped.
+    """
+    task_model = models.CleaningTask
+    tasks: list[models.CleaningTask] = []
+    for chunk in scheduling.chunks(sorted(updates)):
+        tasks.extend((await session.execute(select(task_model).where(task_model.id.in_(chunk)))).scalars())
+    if not tasks:
+        return [], []
+    now = datetime.now(timezone.utc)
+    await _update_stats(session, [(task, _set_completed(task, updates[task.id], now)) for task in tasks])
+    cache.mark_changed(session)
+    for task in tasks:
+        _task_updated(session, task)
+    await session.flush()
+    completed_for = sorted({task.appliance_id for task in tasks if task.completed})
+    states = await scheduling.load_states(session, completed_for) if completed_for else {}
+    created = await scheduling.insert_tasks(
+        session, {appliance_id: due for appliance_id, state in states.items() if (due := state.next_due()) is not None}
+    )
+    return tasks, created
+
+def _task_updated(session: AsyncSession, task: models.CleaningTask) -> None:
+    payload = scheduling.task_payload(task)
+    broadcast.publish_after_commit(session, broadcast.Event("task.updated", payload))
+    changes.record(session, "task.updated", payload, entity_id=task.id)
+
+async def list_due_tasks(
+    session: AsyncSession,
+    horizon_days: int | None = None,
+    limit: int | None = None,
+    after: tuple[date, int] | None = None,
+):
+    """Incomplete tasks due within ``horizon_days``, ordered by (due_date, id).
+
+    One joined query; appliance columns come back prefixed with ``appliance_``.
+    ``after`` is the (due_date, id) of the last task of the previous page.
+    """
+    horizon = DUE_HORIZON_DAYS if horizon_days is None else horizon_days
+    task = models.CleaningTask
+    appliance = models.Appliance
+    stmt = (
+        select(
+            task.id,
+            task.due_date,
+            task.completed,
+            task.completed_at,
+            appliance.id.label("appliance_id"),
+            appliance.name.label("appliance_name"),
+            appliance.cleaning_interval_days.label("appliance_cleaning_interval_days"),
+            appliance.created_at.label("appliance_created_at"),
+        )
+        .join(appliance, appliance.id == task.appliance_id)
+        .where(task.completed == False, task.due_date <= date.today() + timedelta(days=horizon))  # noqa: E712
+        .order_by(task.due_date, task.id)
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(task.due_date, task.id) > tuple_(*after))
+    if limit is not None:
+        stmt = stmt.limit(limit)
     result = await session.execute(stmt)
-    tasks = result.scalars().all()
-    return [t for t in tasks if t.due_date <= today + timedelta(days=2)]
+    return result.all()
+
+def _as_utc(value: datetime | None) -> datetime:
+    if value is None:
+        return datetime.now(timezone.utc)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
 
-async def add_temperature(session: AsyncSession, value_c: float, room: str | None):
-    reading = models.TemperatureReading(value_c=value_c, room=room or "default")
+async def add_temperature(session: AsyncSession, value_c: float, room: str | None, recorded_at: datetime | None = None):
+    reading = models.TemperatureReading(value_c=value_c, room=room or "default", recorded_at=_as_utc(recorded_at))
     session.add(reading)
     await session.flush()
+    await rollups.apply(session, [(reading.room, reading.recorded_at, reading.value_c)])
+    cache.mark_changed(session)
+    _publish_reading(session, reading)
+    recent.added_after_commit(session, [(reading.room, reading.id, reading.recorded_at, reading.value_c)])
     return reading
 
-async def recent_temperatures(session: AsyncSession, limit: int = 200):
-    result = await session.execute(select(models.TemperatureReading).order_by(models.TemperatureReading.recorded_at.desc()).limit(limit))
-    readings = list(reversed(result.scalars().all()))
+def _publish_reading(session: AsyncSession, reading: models.TemperatureReading) -> None:
+    payload = {"id": reading.id, "room": reading.room, "value_c": reading.value_c, "recorded_at": reading.recorded_at}
+    broadcast.publish_after_commit(session, broadcast.Event("temperature.added", payload, room=reading.room))
+    changes.record(session, "temperature.added", payload, entity_id=reading.id, room=reading.room)
+
+async def add_temperature_readings(session: AsyncSession, rows: Sequence[tuple[float, str | None, datetime | None]]):
+    """Persist many (value_c, room, recorded_at) rows as ORM objects with a single flush.
+
+    Used by the write-behind buffer, which needs the generated ids back.
+    """
+    readings = [
+        models.TemperatureReading(value_c=value_c, room=room or "default", recorded_at=_as_utc(recorded_at))
+        for value_c, room, recorded_at in rows
+    ]
+    session.add_all(readings)
+    await session.flush()
+    await rollups.apply(session, [(r.room, r.recorded_at, r.value_c) for r in readings])
+    cache.mark_changed(session)
+    for reading in readings:
+        _publish_reading(session, reading)
+    recent.added_after_commit(session, [(r.room, r.id, r.recorded_at, r.value_c) for r in readings])
     return readings
 
+async def add_temperatures(session: AsyncSession, readings: Sequence[schemas.TemperatureReadingCreate]) -> int:
+    """Insert a chunk of readings with a single multi-row INSERT (no ORM objects, no RETURNING).
+
+    Callers are expected to keep chunks at or below TEMPERATURE_BATCH_CHUNK and commit once.
+    With the recent-readings cache enabled the generated ids are needed, so the INSERT
+    returns them in parameter order.
+    """
+    if not readings:
+        return 0
+    rows = [
+        {"value_c": r.value_c, "room": r.room or "default", "recorded_at": _as_utc(r.recorded_at)}
+        for r in readings
+    ]
+    if recent.readings.enabled:
+        table = models.TemperatureReading.__table__
+        conn = await session.connection()
+        ids = (await conn.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows)).scalars()
+        recent.added_after_commit(session, [(row["room"], id_, row["recorded_at"], row["value_c"]) for row, id_ in zip(rows, ids)])
+    else:
+        await session.execute(insert(models.TemperatureReading).values(rows))
+    await rollups.apply(session, [(row["room"], row["recorded_at"], row["value_c"]) for row in rows])
+    cache.mark_changed(session)
+    # one summary event per room and chunk instead of one per row
+    latest: dict[str, dict] = {}
+    earliest: dict[str, datetime] = {}
+    counts: dict[str, int] = {}
+    for row in rows:
+        counts[row["room"]] = counts.get(row["room"], 0) + 1
+        current = latest.get(row["room"])
+        if current is None or row["recorded_at"] >= current["recorded_at"]:
+            latest[row["room"]] = row
+        if row["room"] not in earliest or row["recorded_at"] < earliest[row["room"]]:
+            earliest[row["room"]] = row["recorded_at"]
+    for room, row in latest.items():
+        payload = {"room": room, "count": counts[room], "value_c": row["value_c"], "recorded_at": row["recorded_at"]}
+        broadcast.publish_after_commit(session, broadcast.Event("temperature.batch", payload, room=room))
+        # the log gets the time range, so a syncing client can fetch exactly these readings
+        changes.record(session, "temperature.batch", {**payload, "start": earliest[room]}, room=room)
+    return len(rows)
+
+async def recent_temperatures(session: AsyncSession, limit: int = 200):
+    if recent.readings.enabled and (cached := recent.readings.latest(limit)) is not None:
+        return cached
+    reading = models.TemperatureReading
+    result = await session.execute(select(*READING_COLUMNS).order_by(reading.recorded_at.desc()).limit(limit))
+    return result.all()[::-1]
+
+# Loose index scan over (room, recorded_at): one index seek per distinct room, then the newest
+# :per_room rows of each room via the same index, so cost tracks rooms * N rather than table size.
+_LATEST_PER_ROOM_SQL = text("""
+WITH RECURSIVE rooms(room) AS (
+    SELECT min(room) FROM temperature_readings
+    UNION ALL
+    SELECT (SELECT min(room) FROM temperature_readings WHERE room > rooms.room)
+    FROM rooms WHERE rooms.room IS NOT NULL
+)
+SELECT t.id, t.recorded_at, t.value_c, t.room FROM rooms JOIN temperature_readings AS t ON t.id IN (
+    SELECT id FROM temperature_readings
+    WHERE room = rooms.room
+    ORDER BY recorded_at DESC, id DESC
+    LIMIT :per_room
+)
+ORDER BY t.room, t.recorded_at, t.id
+""").columns(*READING_COLUMNS)
+
+def temperature_filters(room: str | None = None, start: datetime | None = None, end: datetime | None = None) -> list:
+    """WHERE clauses selecting one room (or all) within [start, end)."""
+    reading = models.TemperatureReading
+    clauses = []
+    if room:
+        clauses.append(reading.room == room)
+    if start is not None:
+        clauses.append(reading.recorded_at >= _as_utc(start))
+    if end is not None:
+        clauses.append(reading.recorded_at < _as_utc(end))
+    return clauses
+
+async def list_temperatures(
+    session: AsyncSession,
+    room: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = 200,
+    before: tuple[datetime, int] | None = None,
+):
+    """Readings newest first, optionally for one room and within [start, end).
+
+    ``before`` is the (recorded_at, id) of the oldest reading of the previous page, so paging
+    walks back in time with an index seek on (room, recorded_at) or recorded_at.
+    """
+    if recent.readings.enabled and start is None and end is None and before is None:
+        cached = recent.readings.room_page(room, limit) if room else recent.readings.latest(limit)
+        if cached is not None:
+            return cached if room else cached[::-1]
+    reading = models.TemperatureReading
+    stmt = (
+        select(*READING_COLUMNS)
+        .where(*temperature_filters(room, start, end))
+        .order_by(reading.recorded_at.desc(), reading.id.desc())
+        .limit(limit)
+    )
+    if before is not None:
+        stmt = stmt.where(tuple_(reading.recorded_at, reading.id) < tuple_(*before))
+    result = await session.execute(stmt)
+    return result.all()
+
+async def recent_temperatures_per_room(session: AsyncSession, per_room_limit: int):
+    """Latest ``per_room_limit`` readings of every room, ordered by room then time."""
+    if recent.readings.enabled and (cached := recent.readings.latest_per_room(per_room_limit)) is not None:
+        return cached
+    result = await session.execute(_LATEST_PER_ROOM_SQL, {"per_room": per_room_limit})
+    return result.all()
+
 async def clear_temperatures(session: AsyncSession, room: str | None):
     stmt = delete(models.TemperatureReading)
     if room:
         from sqlalchemy import and_
         stmt = stmt.where(models.TemperatureReading.room == room)
     result = await session.execute(stmt)
+    await rollups.clear(session, room)
     await session.flush()
+    cache.mark_changed(session)
+    recent.cleared_after_commit(session, room)
+    broadcast.publish_after_commit(session, broadcast.Event("temperature.cleared", {"room": room}, room=room))
+    changes.record(session, "temperature.cleared", {"room": room}, room=room)
     return result.rowcount or 0
 
-async def seed_default_appliances(session: AsyncSession):
+async def seed_default_appliances(session: AsyncSession) -> int:
     """Idempotently create a starter set of appliances if they don't already exist.
-    Uses AppMeta sentinel key 'seed_defaults_done'.
+    Uses AppMeta sentinel key 'seed_defaults_done'. Returns the number of appliances created.
     """
     sentinel_key = "seed_defaults_done"
     meta_q = await session.execute(select(models.AppMeta).where(models.AppMeta.key == sentinel_key))
     if meta_q.scalars().first():
-        return []
+        return 0
     defaults = [
         ("Dishwasher", 30),
         ("Cat Fountain", 7),
@@ -115,16 +538,15 @@ async def seed_default_appliances(session: AsyncSession):
         ("Humidifier", 7),
         ("Litter Box Deep Clean", 14),
     ]
-    created = []
-    for name, interval in defaults:
-        existing = await session.execute(select(models.Appliance).where(models.Appliance.name == name))
-        if existing.scalars().first():
-            continue
-        created.append(await create_appliance(session, name, interval))
+    result = await upsert_appliances(
+        session,
+        [schemas.ApplianceCreate(name=name, cleaning_interval_days=interval) for name, interval in defaults],
+        update_existing=False,
+    )
     # set sentinel
     session.add(models.AppMeta(key=sentinel_key, value="1"))
     await session.flush()
-    return created
+    return result.created
 
 async def ensure_seed_defaults(session: AsyncSession, auto: bool):
     if not auto:
@@ -1,28 +1,189 @@
 from __future__ import annotations
 
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from dataclasses import dataclass, replace
+from typing import AsyncGenerator, Callable
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 import os
 
-DB_URL = os.getenv("HOME_DASHBOARD_DB_URL", "sqlite+aiosqlite:///./home_dashboard.db")
+DEFAULT_DB_URL = "sqlite+aiosqlite:///./home_dashboard.db"
 
 class Base(DeclarativeBase):
     pass
 
-engine = create_async_engine(DB_URL, echo=False, future=True)
-SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+@dataclass(frozen=True)
+class EngineProfile:
+    """SQLite connection settings applied to every new DBAPI connection via a connect hook."""
+    name: str
+    journal_mode: str | None = None
+    synchronous: str | None = None
+    cache_size: int | None = None  # negative values are KiB, positive values are pages
+    mmap_size: int | None = None
+    busy_timeout_ms: int | None = None
+    # only takes effect on a new database file (or after a manual VACUUM)
+    auto_vacuum: str | None = None
+    write_pool_size: int = 5
+    write_max_overflow: int = 10
+    read_pool_size: int = 5
+    read_max_overflow: int = 10
+
+PROFILES = {
+    # plain rollback-journal SQLite, what older releases always ran with
+    "default": EngineProfile("default"),
+    # WAL lets readers proceed while the single writer connection commits
+    "production": EngineProfile(
+        "production",
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size=-64_000,
+        mmap_size=256 * 1024 * 1024,
+        busy_timeout_ms=5_000,
+        auto_vacuum="INCREMENTAL",
+        write_pool_size=1,
+        write_max_overflow=0,
+        read_pool_size=8,
+        read_max_overflow=8,
+    ),
+}
+
+def load_profile() -> EngineProfile:
+    name = os.getenv("HOME_DASHBOARD_DB_PROFILE", "production").lower()
+    if name not in PROFILES:
+        raise ValueError(f"HOME_DASHBOARD_DB_PROFILE must be one of {sorted(PROFILES)}, got {name!r}")
+    profile = PROFILES[name]
+    overrides: dict[str, object] = {}
+    for field, env, cast in (
+        ("journal_mode", "HOME_DASHBOARD_SQLITE_JOURNAL_MODE", str),
+        ("synchronous", "HOME_DASHBOARD_SQLITE_SYNCHRONOUS", str),
+        ("cache_size", "HOME_DASHBOARD_SQLITE_CACHE_SIZE", int),
+        ("mmap_size", "HOME_DASHBOARD_SQLITE_MMAP_SIZE", int),
+        ("busy_timeout_ms", "HOME_DASHBOARD_SQLITE_BUSY_TIMEOUT_MS", int),
+        ("auto_vacuum", "HOME_DASHBOARD_SQLITE_AUTO_VACUUM", str),
+        ("write_pool_size", "HOME_DASHBOARD_DB_WRITE_POOL_SIZE", int),
+        ("read_pool_size", "HOME_DASHBOARD_DB_READ_POOL_SIZE", int),
+    ):
+        raw = os.getenv(env)
+        if raw:
+            overrides[field] = cast(raw)
+    return replace(profile, **overrides) if overrides else profile
+
+def _pragmas(profile: EngineProfile, read_only: bool) -> list[str]:
+    statements = []
+    if profile.busy_timeout_ms is not None:
+        statements.append(f"PRAGMA busy_timeout={int(profile.busy_timeout_ms)}")
+    if profile.auto_vacuum and not read_only:
+        statements.append(f"PRAGMA auto_vacuum={profile.auto_vacuum}")
+    if profile.journal_mode and not read_only:
+        # persistent per database file; only the writer needs to assert it
+        statements.append(f"PRAGMA journal_mode={profile.journal_mode}")
+    if profile.synchronous:
+        statements.append(f"PRAGMA synchronous={profile.synchronous}")
+    if profile.cache_size is not None:
+        statements.append(f"PRAGMA cache_size={int(profile.cache_size)}")
+    if profile.mmap_size is not None:
+        statements.append(f"PRAGMA mmap_size={int(profile.mmap_size)}")
+    if read_only:
+        statements.append("PRAGMA query_only=ON")
+    return statements
+
+def _is_file_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+def _create_engine(url: str, profile: EngineProfile, read_only: bool) -> AsyncEngine:
+    kwargs: dict[str, object] = {}
+    if _is_file_sqlite(url) and read_only:
+        kwargs.update(pool_size=profile.read_pool_size, max_overflow=profile.read_max_overflow)
+    elif _is_file_sqlite(url):
+        kwargs.update(pool_size=profile.write_pool_size, max_overflow=profile.write_max_overflow)
+    new_engine = create_async_engine(url, echo=False, future=True, **kwargs)
+    if make_url(url).get_backend_name() == "sqlite":
+        statements = _pragmas(profile, read_only)
+
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def _apply_profile(dbapi_connection, connection_record):  # noqa: ARG001
+            cursor = dbapi_connection.cursor()
+            for stmt in statements:
+                cursor.execute(stmt)
+            cursor.close()
+    return new_engine
+
+# Engines are created on first use (normally in the app lifespan) rather than as an import side
+# effect, so importing the package stays cheap and HOME_DASHBOARD_DB_URL is read when it matters.
+profile: EngineProfile | None = None
+_engines: tuple[AsyncEngine, AsyncEngine] | None = None
+_engine_callbacks: list[Callable[[AsyncEngine, AsyncEngine], None]] = []
+SessionLocal = async_sessionmaker(expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(expire_on_commit=False)
+
+def database_url() -> str:
+    return os.getenv("HOME_DASHBOARD_DB_URL", DEFAULT_DB_URL)
+
+def _ensure_engines() -> tuple[AsyncEngine, AsyncEngine]:
+    global _engines, profile
+    if _engines is None:
+        url = database_url()
+        profile = load_profile()
+        # single writer: with the production profile the pool holds one connection, so mutations serialize
+        writer = _create_engine(url, profile, read_only=False)
+        # in-memory databases are per-connection, so they cannot be split into a separate reader
+        reader = _create_engine(url, profile, read_only=True) if _is_file_sqlite(url) else writer
+        SessionLocal.configure(bind=writer)
+        ReadSessionLocal.configure(bind=reader)
+        _engines = (writer, reader)
+        for callback in _engine_callbacks:
+            callback(writer, reader)
+    return _engines
+
+def get_engine() -> AsyncEngine:
+    return _ensure_engines()[0]
+
+def get_read_engine() -> AsyncEngine:
+    return _ensure_engines()[1]
+
+def on_engines_created(callback: Callable[[AsyncEngine, AsyncEngine], None]) -> None:
+    """Run ``callback(writer, reader)`` for the current engines (if any) and any created later."""
+    _engine_callbacks.append(callback)
+    if _engines is not None:
+        callback(*_engines)
+
+async def dispose_engines() -> None:
+    global _engines
+    if _engines is None:
+        return
+    writer, reader = _engines
+    _engines = None
+    await writer.dispose()
+    if reader is not writer:
+        await reader.dispose()
+
+def new_session() -> AsyncSession:
+    """Writer session, creating the engines first if needed."""
+    _ensure_engines()
+    return SessionLocal()
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with SessionLocal() as session:  # type: ignore
+    async with new_session() as session:
+        yield session
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Session bound to the query-only engine; use for GET routes that never commit."""
+    _ensure_engines()
+    async with ReadSessionLocal() as session:  # type: ignore
         yield session
 
-async def init_db() -> None:
-    from . import models  # noqa: F401
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-        # ensure room column exists (simple additive migration)
-        result = await conn.exec_driver_sql("PRAGMA table_info(temperature_readings)")
-        cols = [row[1] for row in result.fetchall()]  # second element is name
-        if "room" not in cols:
-            await conn.exec_driver_sql("ALTER TABLE temperature_readings ADD COLUMN room TEXT NOT NULL DEFAULT 'default'")
+async def init_db() -> list[int]:
+    """Bring the schema up to date; returns the versions of the migrations that were applied."""
+    from . import migrations
+
+    async with get_engine().connect() as conn:
+        if await conn.run_sync(migrations.current_version) >= migrations.LATEST_VERSION:
+            return []
+        # take the write lock before re-reading the version: workers booting together queue up
+        # here (busy_timeout) and all but the first find the schema already stamped
+        await conn.exec_driver_sql("BEGIN IMMEDIATE")
+        applied = await conn.run_sync(migrations.upgrade)
+        await conn.commit()
+        return applied
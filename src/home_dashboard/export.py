@@ -0,0 +1,102 @@
+"""Streaming export of raw temperature history.
+
+Rows are read through a server-side cursor in ``EXPORT_CHUNK_ROWS`` partitions and encoded
+chunk by chunk, so memory stays flat however long the requested range is.  ``npy`` writes a
+NumPy structured array (``id``, ``recorded_at`` as ``datetime64[us]``, ``value_c``, ``room``
+as fixed-width UTF-8 bytes) that ``numpy.load`` reads directly; the server itself does not
+need NumPy.  The whole export runs in one read transaction, so the row count written into
+the ``npy`` header matches the rows that follow even while sensors keep writing.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+import re
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable
+from urllib.parse import quote
+
+from pydantic import TypeAdapter
+from sqlalchemy import LargeBinary, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, models
+from .payloads import TemperatureRow
+
+EXPORT_CHUNK_ROWS = int(os.getenv("HOME_DASHBOARD_EXPORT_CHUNK_ROWS", "5000"))
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "npy": "application/octet-stream",
+}
+
+_row_adapter = TypeAdapter(TemperatureRow)
+_EPOCH = datetime(1970, 1, 1)
+
+def _epoch_us(value: datetime) -> int:
+    # SQLite hands back naive UTC datetimes
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+def content_disposition(filename: str) -> str:
+    """Attachment header with an ASCII ``filename`` fallback and the exact name as RFC 5987 ``filename*``."""
+    fallback = re.sub(r"[^A-Za-z0-9._-]", "_", filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+def npy_header(dtype: list[tuple[str, str]], rows: int) -> bytes:
+    """NPY format 1.0 preamble for a 1-d structured array of ``rows`` records."""
+    header = repr({"descr": dtype, "fortran_order": False, "shape": (rows,)}).encode("latin1")
+    # magic (6) + version (2) + length (2) + header, padded with spaces to a multiple of 64
+    header += b" " * (-(10 + len(header) + 1) % 64) + b"\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header
+
+def _encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows((row.id, row.recorded_at.isoformat(), row.room, repr(row.value_c)) for row in rows)
+    return buffer.getvalue().encode()
+
+def _encode_ndjson(rows) -> bytes:
+    return b"".join(_row_adapter.dump_json(row._asdict()) + b"\n" for row in rows)
+
+async def stream(
+    session_factory: Callable[[], AsyncSession],
+    fmt: str,
+    room: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> AsyncIterator[bytes]:
+    reading = models.TemperatureReading
+    filters = crud.temperature_filters(room, start, end)
+    # the session belongs to the generator: request-scoped dependencies are closed before a
+    # StreamingResponse body has been sent
+    async with session_factory() as session:
+        conn = await session.connection()
+        # SELECTs alone do not open a transaction in pysqlite; pin one snapshot for the whole export
+        await conn.exec_driver_sql("BEGIN")
+        if fmt == "npy":
+            count, room_bytes = (await session.execute(
+                select(func.count(), func.max(func.length(cast(reading.room, LargeBinary)))).where(*filters)
+            )).one()
+            width = max(room_bytes or 0, 1)
+            record = struct.Struct(f"<qqd{width}s")
+            yield npy_header(
+                [("id", "<i8"), ("recorded_at", "<M8[us]"), ("value_c", "<f8"), ("room", f"|S{width}")], count
+            )
+        elif fmt == "csv":
+            yield b"id,recorded_at,room,value_c\n"
+        stmt = select(*crud.READING_COLUMNS).where(*filters).order_by(reading.recorded_at, reading.id)
+        result = await session.stream(stmt, execution_options={"yield_per": EXPORT_CHUNK_ROWS})
+        async for rows in result.partitions():
+            if fmt == "npy":
+                yield b"".join(
+                    record.pack(row.id, _epoch_us(row.recorded_at), row.value_c, row.room.encode()) for row in rows
+                )
+            elif fmt == "csv":
+                yield _encode_csv(rows)
+            else:
+                yield _encode_ndjson(rows)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, models
+from .writes import WriteCoordinator
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ("commit", "enqueue")
+
+class BufferFull(Exception):
+    """Raised when the write-behind queue cannot take another reading (full or shutting down)."""
+
+@dataclass
+class WriteBehindSettings:
+    enabled: bool = False
+    flush_rows: int = 500
+    flush_ms: int = 50
+    durability: str = "commit"
+    max_queue: int = 10_000
+
+    @classmethod
+    def from_env(cls) -> WriteBehindSettings:
+        durability = os.getenv("HOME_DASHBOARD_TEMP_DURABILITY", "commit").lower()
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"HOME_DASHBOARD_TEMP_DURABILITY must be one of {DURABILITY_MODES}, got {durability!r}")
+        return cls(
+            enabled=os.getenv("HOME_DASHBOARD_TEMP_WRITE_BEHIND", "false").lower() in {"1", "true", "yes"},
+            flush_rows=int(os.getenv("HOME_DASHBOARD_TEMP_FLUSH_ROWS", "500")),
+            flush_ms=int(os.getenv("HOME_DASHBOARD_TEMP_FLUSH_MS", "50")),
+            durability=durability,
+            max_queue=int(os.getenv("HOME_DASHBOARD_TEMP_QUEUE_MAX", "10000")),
+        )
+
+_STOP = object()
+
+class TemperatureWriteBuffer:
+    """Coalesce single temperature POSTs into group commits.
+
+    A single writer task drains a bounded queue and commits whatever arrived within
+    ``flush_ms`` (or as soon as ``flush_rows`` are pending) in one transaction.  With
+    ``durability="commit"`` callers wait for their group commit and get the persisted row
+    back; with ``durability="enqueue"`` they are acknowledged as soon as the reading is queued
+    and a failed flush is only logged.  Flushes go through the app's :class:`WriteCoordinator`, so
+    a busy database is retried like any other write instead of dropping the group.
+    """
+
+    def __init__(
+        self,
+        writer: WriteCoordinator,
+        flush_rows: int = 500,
+        flush_ms: int = 50,
+        durability: str = "commit",
+        max_queue: int = 10_000,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}")
+        self._writer = writer
+        self.flush_rows = max(1, flush_rows)
+        self.flush_ms = max(0, flush_ms)
+        self.durability = durability
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queue))
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.failed_rows = 0
+
+    @classmethod
+    def from_settings(cls, writer: WriteCoordinator, settings: WriteBehindSettings) -> TemperatureWriteBuffer:
+        return cls(writer, settings.flush_rows, settings.flush_ms, settings.durability, settings.max_queue)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="temperature-write-behind")
+
+    async def submit(self, value_c: float, room: str | None, recorded_at: datetime | None = None) -> models.TemperatureReading | None:
+        """Queue one reading; returns the committed row in ``commit`` mode, ``None`` in ``enqueue`` mode."""
+        if self._closed:
+            raise BufferFull("write-behind buffer is shutting down")
+        future = asyncio.get_running_loop().create_future() if self.durability == "commit" else None
+        entry = (value_c, room, recorded_at or datetime.now(timezone.utc), future)
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            raise BufferFull("write-behind queue is full") from None
+        if future is None:
+            return None
+        return await future
+
+    async def stop(self) -> None:
+        """Stop accepting readings, flush everything already queued and wait for the writer."""
+        self._closed = True
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is _STOP:
+                break
+            batch = [entry]
+            deadline = loop.time() + self.flush_ms / 1000
+            while len(batch) < self.flush_rows:
+                try:
+                    entry = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple]) -> None:
+        rows = [(v, room, at) for v, room, at, _ in batch]
+
+        async def write(session: AsyncSession) -> list[models.TemperatureReading]:
+            return await crud.add_temperature_readings(session, rows)
+
+        try:
+            readings = await self._writer.run(write)
+        except Exception as exc:
+            self.failed_rows += len(batch)
+            logger.exception("write-behind flush of %d temperature readings failed", len(batch))
+            for *_, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+        self.flushes += 1
+        self.flushed_rows += len(batch)
+        for reading, (*_, future) in zip(readings, batch):
+            if future is not None and not future.done():
+                future.set_result(reading)
@@ -1,21 +1,58 @@
 from __future__ import annotations
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Header, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 import os
+import time
+from datetime import date
 from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import AsyncSession
-from .db import get_session, init_db, SessionLocal
-from . import crud, schemas
-from .routers import appliances, temperature, tasks
+from .db import dispose_engines, get_engine, get_read_engine, get_read_session, init_db, new_session, SessionLocal
+from . import cache, changes, crud, ingest, metrics, migrations, payloads, recent, retention, schemas, startup, writes
+from .routers import admin, appliances, calendar, changes as changes_router, metrics as metrics_router, stream, temperature, tasks
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
+    report = startup.StartupReport.begin(_IMPORTED)
+    with report.phase("engine"):
+        get_engine()
+        get_read_engine()
+    with report.phase("migrate"):
+        report.migrations_applied = await init_db()
+        report.schema_version = migrations.LATEST_VERSION
     auto_seed = os.getenv("HOME_DASHBOARD_AUTO_SEED_DEFAULTS", "true").lower() in {"1","true","yes"}
-    async with SessionLocal() as session:  # type: ignore
-        await crud.ensure_seed_defaults(session, auto_seed)
-        await session.commit()
-    yield
+    with report.phase("seed"):
+        async with SessionLocal() as session:  # type: ignore
+            report.seeded = await crud.ensure_seed_defaults(session, auto_seed)
+            await session.commit()
+    # opt-in in-memory latest readings per room, warmed before any write can be accepted
+    recent.readings.reset(recent.capacity_from_env())
+    if recent.readings.enabled:
+        with report.phase("recent"):
+            async with SessionLocal() as session:  # type: ignore
+                recent.readings.load(await crud.recent_temperatures_per_room(session, recent.readings.capacity))
+    # opt-in write-behind ingestion for single-reading POSTs
+    buffer = None
+    write_behind = ingest.WriteBehindSettings.from_env()
+    if write_behind.enabled:
+        buffer = ingest.TemperatureWriteBuffer.from_settings(app.state.writer, write_behind)
+        await buffer.start()
+    app.state.temperature_buffer = buffer
+    # raw temperature retention (no-op unless a policy is configured)
+    retention_worker = retention.RetentionWorker(app.state.writer, retention.RetentionPolicy.from_env())
+    await retention_worker.start()
+    app.state.retention = retention_worker
+    report.ready()
+    app.state.startup = report
+    try:
+        yield
+    finally:
+        await retention_worker.stop()
+        if buffer is not None:
+            await buffer.stop()
+        app.state.temperature_buffer = None
+        await app.state.writer.stop()
+        recent.readings.reset()
+        await dispose_engines()
 
 def create_app() -> FastAPI:
     app = FastAPI(title="API Домашньої панелі", lifespan=lifespan)
@@ -31,26 +68,57 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor"],
     )
 
     app.include_router(appliances.router)
     app.include_router(temperature.router)
     app.include_router(tasks.router)
+    app.include_router(calendar.router)
+    app.include_router(changes_router.router)
+    app.include_router(admin.router)
+    app.include_router(stream.router)
 
-    @app.get("/api/dashboard", response_model=schemas.DashboardData)
-    async def dashboard(session: AsyncSession = Depends(get_session)):
-        due = await crud.list_due_tasks(session)
-        temps = await crud.recent_temperatures(session, limit=200)
-        grouped: dict[str, list[schemas.TemperatureReadingOut]] = {}
-        for r in temps:
-            out = schemas.TemperatureReadingOut.model_validate(r)
-            grouped.setdefault(out.room, []).append(out)
-        return schemas.DashboardData(
-            due_tasks=[schemas.CleaningTaskWithApplianceOut.model_validate(t) for t in due],
-            recent_temps=[schemas.TemperatureReadingOut.model_validate(r) for r in temps],
-            recent_temps_by_room=grouped,
+    # opt-in instrumentation; when disabled neither the middleware nor the engine hooks exist
+    metrics_settings = metrics.MetricsSettings.from_env()
+    metrics.install(app, metrics_settings)
+    if metrics_settings.enabled:
+        app.include_router(metrics_router.router)
+
+    app.state.dashboard_cache = cache.ResponseCache.from_env()
+    # every router mutation goes through here (BEGIN IMMEDIATE, busy retry, optional single writer)
+    app.state.writer = writes.WriteCoordinator(new_session, writes.WriteSettings.from_env())
+
+    @app.get("/api/dashboard", response_model=schemas.DashboardData, responses={304: {"description": "Not modified"}})
+    async def dashboard(
+        per_room_limit: int | None = Query(default=None, ge=1, le=1000),
+        if_none_match: str | None = Header(default=None),
+        session: AsyncSession = Depends(get_read_session),
+    ):
+        # due tasks depend on today's date, so it is part of the cache key alongside the data versions;
+        # the change-log head catches commits made by other worker processes
+        dashboard_cache: cache.ResponseCache = app.state.dashboard_cache
+        etag = dashboard_cache.etag(
+            "dashboard", date.today().isoformat(), per_room_limit, shared_version=await changes.head(session)
         )
+        if cache.etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        body = dashboard_cache.get(etag)
+        if body is None:
+            body = await _build_dashboard(session, per_room_limit)
+            dashboard_cache.put(etag, body)
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    async def _build_dashboard(session: AsyncSession, per_room_limit: int | None) -> bytes:
+        due = await crud.list_due_tasks(session)
+        if per_room_limit:
+            # every room gets its own latest N instead of sharing a global top 200
+            temps = sorted(await crud.recent_temperatures_per_room(session, per_room_limit), key=lambda r: r.recorded_at)
+        else:
+            temps = await crud.recent_temperatures(session, limit=200)
+        return payloads.dashboard(due, temps)
 
     return app
 
 app = create_app()
+_IMPORTED = time.perf_counter()
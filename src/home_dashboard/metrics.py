@@ -0,0 +1,280 @@
+"""Opt-in request and SQL instrumentation exposed in Prometheus text format.
+
+With ``HOME_DASHBOARD_METRICS=true`` :func:`install` adds an ASGI middleware that records
+per-route latency and status counts, and hooks both engines so every statement is counted
+and timed globally and against the request that issued it (via a context variable), which
+makes N+1 patterns show up in ``home_dashboard_http_request_queries``.  Pool and SQLite busy
+statistics are read at scrape time.  ``HOME_DASHBOARD_SLOW_REQUEST_MS`` additionally logs
+requests slower than the threshold together with the SQL they ran.  When neither is set
+nothing is installed, so the request path is untouched.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .writes import is_busy_error
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+# statements kept per request for the slow log, and characters kept per statement
+SLOW_LOG_STATEMENTS = 20
+SLOW_LOG_STATEMENT_CHARS = 300
+
+@dataclass
+class MetricsSettings:
+    enabled: bool = False
+    slow_request_ms: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> MetricsSettings:
+        return cls(
+            enabled=os.getenv("HOME_DASHBOARD_METRICS", "false").lower() in {"1", "true", "yes"},
+            slow_request_ms=float(os.getenv("HOME_DASHBOARD_SLOW_REQUEST_MS", "0")),
+        )
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        out = []
+        for bound, count in zip((*map(_format_number, self.buckets), "+Inf"), self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    sql_s: float = 0.0
+    statements: list[str] | None = None
+
+_current: ContextVar[RequestStats | None] = ContextVar("home_dashboard_request_stats", default=None)
+
+@dataclass
+class Registry:
+    requests: dict[tuple[str, str, int], int] = field(default_factory=lambda: defaultdict(int))
+    latency: dict[tuple[str, str], Histogram] = field(default_factory=dict)
+    request_queries: dict[tuple[str, str], Histogram] = field(default_factory=dict)
+    request_sql_s: dict[tuple[str, str], float] = field(default_factory=lambda: defaultdict(float))
+    queries: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    sql_s: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    busy_errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    slow_requests: int = 0
+
+    def observe_request(self, method: str, route: str, status: int, elapsed_s: float, stats: RequestStats) -> None:
+        key = (method, route)
+        self.requests[(method, route, status)] += 1
+        if key not in self.latency:
+            self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.request_queries[key] = Histogram(QUERY_BUCKETS)
+        self.latency[key].observe(elapsed_s)
+        self.request_queries[key].observe(stats.queries)
+        self.request_sql_s[key] += stats.sql_s
+
+registry = Registry()
+
+def reset() -> None:
+    global registry
+    registry = Registry()
+
+# --- SQL hooks -------------------------------------------------------------------------
+
+_instrumented: dict[str, AsyncEngine] = {}
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Count and time statements on ``engine`` under the ``engine=name`` label (idempotent)."""
+    if _instrumented.get(name) is engine:
+        return
+    _instrumented[name] = engine
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+        conn.info.setdefault("home_dashboard.query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+        elapsed = time.perf_counter() - conn.info["home_dashboard.query_start"].pop()
+        registry.queries[name] += 1
+        registry.sql_s[name] += elapsed
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_s += elapsed
+            if stats.statements is not None and len(stats.statements) < SLOW_LOG_STATEMENTS:
+                stats.statements.append(f"{elapsed * 1000:.2f}ms {statement[:SLOW_LOG_STATEMENT_CHARS]}")
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(context) -> None:
+        starts = context.connection.info.get("home_dashboard.query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        if is_busy_error(context.original_exception):
+            registry.busy_errors[name] += 1
+
+# --- middleware -----------------------------------------------------------------------------
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses are timed until their last chunk."""
+
+    def __init__(self, app, slow_request_ms: float = 0.0) -> None:
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(statements=[] if self.slow_request_ms else None)
+        token = _current.set(stats)
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            # the route template keeps label cardinality bounded (/api/appliances/{appliance_id})
+            route = getattr(scope.get("route"), "path", "unmatched")
+            registry.observe_request(scope["method"], route, status, elapsed, stats)
+            if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+                registry.slow_requests += 1
+                logger.warning(
+                    "slow request %s %s -> %d in %.1fms (%d queries, %.1fms SQL)\n%s",
+                    scope["method"], scope["path"], status, elapsed * 1000, stats.queries, stats.sql_s * 1000,
+                    "\n".join(stats.statements or ()),
+                )
+
+def install(app: FastAPI, settings: MetricsSettings) -> bool:
+    """Wire instrumentation into ``app``; returns False (and does nothing) when disabled."""
+    if not (settings.enabled or settings.slow_request_ms):
+        return False
+    from .db import on_engines_created
+
+    def _instrument(writer: AsyncEngine, reader: AsyncEngine) -> None:
+        instrument_engine(writer, "writer")
+        if reader is not writer:
+            instrument_engine(reader, "reader")
+
+    # engines are created lazily in the lifespan; hook them whenever that happens
+    on_engines_created(_instrument)
+    app.add_middleware(MetricsMiddleware, slow_request_ms=settings.slow_request_ms)
+    return True
+
+# --- exposition -----------------------------------------------------------------------------
+
+def _format_number(value: float) -> str:
+    return str(value)
+
+def _labels(**labels: object) -> str:
+    def escape(value: object) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+def _family(lines: list[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+def _histogram(lines: list[str], name: str, histograms: dict[tuple[str, str], Histogram]) -> None:
+    for (method, route), histogram in sorted(histograms.items()):
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {count}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {histogram.count}")
+
+def render(app: FastAPI) -> str:
+    from . import broadcast, recent
+
+    reg = registry
+    lines: list[str] = []
+    _family(lines, "home_dashboard_http_requests_total", "counter", "HTTP requests by route template and status.")
+    for (method, route, status), count in sorted(reg.requests.items()):
+        lines.append(f"home_dashboard_http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+    _family(lines, "home_dashboard_http_request_duration_seconds", "histogram", "HTTP request latency, including streamed bodies.")
+    _histogram(lines, "home_dashboard_http_request_duration_seconds", reg.latency)
+    _family(lines, "home_dashboard_http_request_queries", "histogram", "SQL statements issued per HTTP request.")
+    _histogram(lines, "home_dashboard_http_request_queries", reg.request_queries)
+    _family(lines, "home_dashboard_http_request_sql_seconds_total", "counter", "Time spent in SQL by requests of a route.")
+    for (method, route), seconds in sorted(reg.request_sql_s.items()):
+        lines.append(f"home_dashboard_http_request_sql_seconds_total{_labels(method=method, route=route)} {seconds}")
+    _family(lines, "home_dashboard_http_slow_requests_total", "counter", "Requests over HOME_DASHBOARD_SLOW_REQUEST_MS.")
+    lines.append(f"home_dashboard_http_slow_requests_total {reg.slow_requests}")
+
+    _family(lines, "home_dashboard_db_queries_total", "counter", "SQL statements executed per engine.")
+    for name in _instrumented:
+        lines.append(f"home_dashboard_db_queries_total{_labels(engine=name)} {reg.queries[name]}")
+    _family(lines, "home_dashboard_db_query_seconds_total", "counter", "Time spent executing SQL per engine, including busy waits.")
+    for name in _instrumented:
+        lines.append(f"home_dashboard_db_query_seconds_total{_labels(engine=name)} {reg.sql_s[name]}")
+    _family(lines, "home_dashboard_db_busy_errors_total", "counter", "Statements that failed with SQLITE_BUSY/locked.")
+    for name in _instrumented:
+        lines.append(f"home_dashboard_db_busy_errors_total{_labels(engine=name)} {reg.busy_errors[name]}")
+    pool_gauges = (
+        ("home_dashboard_db_pool_size", "size", "Configured pool size."),
+        ("home_dashboard_db_pool_checked_out", "checkedout", "Connections currently checked out."),
+        ("home_dashboard_db_pool_overflow", "overflow", "Connections opened beyond the pool size."),
+    )
+    for metric, attr, help_text in pool_gauges:
+        _family(lines, metric, "gauge", help_text)
+        for name, instrumented in _instrumented.items():
+            reader = getattr(instrumented.sync_engine.pool, attr, None)
+            if reader is not None:
+                lines.append(f"{metric}{_labels(engine=name)} {reader()}")
+
+    dashboard_cache = getattr(app.state, "dashboard_cache", None)
+    if dashboard_cache is not None:
+        _family(lines, "home_dashboard_dashboard_cache_hits_total", "counter", "Dashboard payloads served from cache.")
+        lines.append(f"home_dashboard_dashboard_cache_hits_total {dashboard_cache.hits}")
+        _family(lines, "home_dashboard_dashboard_cache_misses_total", "counter", "Dashboard payloads rebuilt.")
+        lines.append(f"home_dashboard_dashboard_cache_misses_total {dashboard_cache.misses}")
+    writer = getattr(app.state, "writer", None)
+    if writer is not None:
+        for metric, kind, value, help_text in (
+            ("home_dashboard_write_commits_total", "counter", writer.commits, "Write transactions committed."),
+            ("home_dashboard_write_busy_retries_total", "counter", writer.busy_retries, "Write transactions retried after SQLITE_BUSY."),
+            ("home_dashboard_write_busy_failures_total", "counter", writer.busy_failures, "Writes that stayed busy after all retries."),
+            ("home_dashboard_write_backoff_seconds_total", "counter", writer.backoff_s, "Time spent backing off before retries."),
+            ("home_dashboard_write_queue_depth", "gauge", writer.queue_depth, "Mutations waiting for the single writer."),
+        ):
+            _family(lines, metric, kind, help_text)
+            lines.append(f"{metric} {value}")
+    if recent.readings.enabled:
+        for metric, kind, value, help_text in (
+            ("home_dashboard_recent_readings_hits_total", "counter", recent.readings.hits, "Temperature reads answered from the in-memory rings."),
+            ("home_dashboard_recent_readings_misses_total", "counter", recent.readings.misses, "Temperature reads the rings could not answer exactly."),
+            ("home_dashboard_recent_readings_rooms", "gauge", len(recent.readings.rooms), "Rooms with an in-memory ring."),
+        ):
+            _family(lines, metric, kind, help_text)
+            lines.append(f"{metric} {value}")
+    _family(lines, "home_dashboard_stream_subscribers", "gauge", "Connected /api/stream clients.")
+    lines.append(f"home_dashboard_stream_subscribers {broadcast.broadcaster.subscriber_count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,102 @@
+"""Ordered, idempotent schema migrations tracked by a version row in ``app_meta``.
+
+:func:`upgrade` reads ``app_meta['schema_version']`` with a single query and returns at once
+when it is current, so a normal boot costs one SELECT instead of ``create_all`` plus PRAGMA
+introspection.  Older or fresh databases run every pending migration in order inside one
+transaction, then the version is stamped.  ``db.init_db`` opens that transaction with
+``BEGIN IMMEDIATE`` and only then reads the version, so workers racing on the first boot after
+an upgrade take turns and only the first one migrates.  A schema change to ``models`` needs a
+new entry here with the next version number.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import Connection, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
+
+from . import archive, models
+from .db import Base
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+def _create_tables(conn: Connection) -> None:
+    Base.metadata.create_all(conn)
+
+def _add_temperature_room(conn: Connection) -> None:
+    # databases from before rooms existed lack the column
+    cols = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(temperature_readings)")]
+    if "room" not in cols:
+        conn.exec_driver_sql("ALTER TABLE temperature_readings ADD COLUMN room TEXT NOT NULL DEFAULT 'default'")
+
+def _survivor(appliance_id: str) -> str:
+    return f"(SELECT MIN(s.id) FROM appliances s JOIN appliances a ON a.name = s.name WHERE a.id = {appliance_id})"
+
+def _merge_duplicate_appliances(conn: Connection) -> None:
+    # names were not unique before ux_appliances_name: the oldest row of each name survives and
+    # takes over the history of the others, but only one open task per appliance is kept
+    losers = "appliance_id NOT IN (SELECT MIN(id) FROM appliances GROUP BY name) AND appliance_id IN (SELECT id FROM appliances)"
+    survivor = _survivor("cleaning_tasks.appliance_id")
+    # a duplicate's open task goes when the survivor has one, or another duplicate's is due earlier
+    conn.exec_driver_sql(
+        f"DELETE FROM cleaning_tasks WHERE completed = 0 AND {losers} AND EXISTS ("
+        " SELECT 1 FROM cleaning_tasks o WHERE o.completed = 0 AND o.id != cleaning_tasks.id"
+        f" AND {_survivor('o.appliance_id')} = {survivor}"
+        f" AND (o.appliance_id = {survivor} OR (o.due_date, o.id) < (cleaning_tasks.due_date, cleaning_tasks.id)))"
+    )
+    conn.exec_driver_sql(f"UPDATE cleaning_tasks SET appliance_id = {survivor} WHERE {losers}")
+    conn.exec_driver_sql("DELETE FROM appliances WHERE id NOT IN (SELECT MIN(id) FROM appliances GROUP BY name)")
+
+def _create_missing_indexes(conn: Connection) -> None:
+    _merge_duplicate_appliances(conn)
+    # create_all skips tables that already exist, including indexes added to them later
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+def _backfill_appliance_stats(conn: Connection) -> None:
+    Base.metadata.create_all(conn, tables=[models.ArchivedCleaningTask.__table__, models.ApplianceStats.__table__])
+    for stmt in archive.rebuild_statements():
+        conn.execute(stmt)
+
+def _create_change_log(conn: Connection) -> None:
+    Base.metadata.create_all(conn, tables=[models.ChangeLogEntry.__table__])
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "create tables", _create_tables),
+    Migration(2, "temperature_readings.room", _add_temperature_room),
+    Migration(3, "indexes added to existing tables, merging duplicate appliance names", _create_missing_indexes),
+    Migration(4, "cleaning_tasks_archive and backfilled appliance_stats", _backfill_appliance_stats),
+    Migration(5, "change_log", _create_change_log),
+)
+LATEST_VERSION = MIGRATIONS[-1].version
+
+def current_version(conn: Connection) -> int:
+    try:
+        value = conn.execute(select(models.AppMeta.value).where(models.AppMeta.key == SCHEMA_VERSION_KEY)).scalar()
+    except OperationalError:
+        # no app_meta table yet: a fresh database
+        return 0
+    return int(value) if value else 0
+
+def upgrade(conn: Connection) -> list[int]:
+    """Apply pending migrations; returns their versions (empty when the schema is current).
+
+    Callers sharing the database with other processes must hold its write lock already.
+    """
+    version = current_version(conn)
+    pending = [m for m in MIGRATIONS if m.version > version]
+    for migration in pending:
+        migration.apply(conn)
+    if pending:
+        stmt = sqlite_insert(models.AppMeta).values(key=SCHEMA_VERSION_KEY, value=str(LATEST_VERSION))
+        conn.execute(stmt.on_conflict_do_update(index_elements=["key"], set_={"value": stmt.excluded.value}))
+    return [m.version for m in pending]
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, Date, DateTime, Boolean, Float, String
-from datetime import datetime, date, timedelta, timezone
+from sqlalchemy import ForeignKey, Date, DateTime, Boolean, Float, Index, Integer, String, Text
+from datetime import datetime, date, timezone
 from .db import Base
 
 class Appliance(Base):
@@ -14,6 +14,12 @@ class Appliance(Base):
 
     tasks: Mapped[list[CleaningTask]] = relationship(back_populates="appliance", cascade="all, delete-orphan")
 
+    # names are unique (create_appliance is get-or-create by name); bulk upserts conflict on it
+    __table_args__ = (
+        Index("ux_appliances_name", "name", unique=True),
+        Index("ix_appliances_created_at", "created_at"),
+    )
+
 class CleaningTask(Base):
     __tablename__ = "cleaning_tasks"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -24,6 +30,34 @@ class CleaningTask(Base):
 
     appliance: Mapped[Appliance] = relationship(back_populates="tasks")
 
+    # due-task queries filter on completed and range-scan due_date; per-appliance listings seek by appliance
+    __table_args__ = (
+        Index("ix_cleaning_tasks_completed_due_date", "completed", "due_date"),
+        Index("ix_cleaning_tasks_appliance_due_date", "appliance_id", "due_date"),
+    )
+
+class ArchivedCleaningTask(Base):
+    """Completed task moved out of ``cleaning_tasks`` once older than the archive threshold (same id)."""
+    __tablename__ = "cleaning_tasks_archive"
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    appliance_id: Mapped[int] = mapped_column(ForeignKey("appliances.id", ondelete="CASCADE"))
+    due_date: Mapped[date]
+    completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (Index("ix_cleaning_tasks_archive_appliance_completed_at", "appliance_id", "completed_at"),)
+
+class ApplianceStats(Base):
+    """Completion counters per appliance, updated on every completion (see ``archive``)."""
+    __tablename__ = "appliance_stats"
+    appliance_id: Mapped[int] = mapped_column(ForeignKey("appliances.id", ondelete="CASCADE"), primary_key=True)
+    completions: Mapped[int] = mapped_column(Integer, default=0)
+    # lateness is completion date minus due date in days; negative when done early
+    total_lateness_days: Mapped[int] = mapped_column(Integer, default=0)
+    max_lateness_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    last_completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    archived_tasks: Mapped[int] = mapped_column(Integer, default=0)
+
 class TemperatureReading(Base):
     __tablename__ = "temperature_readings"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -31,6 +65,33 @@ class TemperatureReading(Base):
     value_c: Mapped[float] = mapped_column(Float)
     room: Mapped[str] = mapped_column(String, default="default", index=True)
 
+    # per-room "latest N" lookups seek this index instead of sorting the whole table
+    __table_args__ = (Index("ix_temperature_readings_room_recorded_at", "room", "recorded_at"),)
+
+class TemperatureRollup(Base):
+    """Pre-aggregated readings per (resolution, room, bucket); bucket_start is UTC epoch seconds."""
+    __tablename__ = "temperature_rollups"
+    resolution: Mapped[str] = mapped_column(String, primary_key=True)
+    room: Mapped[str] = mapped_column(String, primary_key=True)
+    bucket_start: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    sum_c: Mapped[float] = mapped_column(Float, default=0.0)
+    min_c: Mapped[float] = mapped_column(Float)
+    max_c: Mapped[float] = mapped_column(Float)
+
+class ChangeLogEntry(Base):
+    """One committed change, in commit order; ``id`` is the sync cursor clients pass as ``since``."""
+    __tablename__ = "change_log"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String)
+    entity_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    room: Mapped[str | None] = mapped_column(String, nullable=True)
+    data: Mapped[str] = mapped_column(Text)  # JSON
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
+
+    # AUTOINCREMENT: ids are never reused, even after compaction empties the table
+    __table_args__ = {"sqlite_autoincrement": True}
+
 class AppMeta(Base):
     __tablename__ = "app_meta"
     key: Mapped[str] = mapped_column(primary_key=True)
@@ -40,56 +101,8 @@ class AppMeta(Base):
 async def ensure_future_task(session, appliance: Appliance) -> CleaningTask | None:
     """Ensure there is one upcoming incomplete task for the appliance.
 
-    Previous logic could produce a new task with the same due_date if the base date
-    calculation matched an existing task's due date (e.g., rapid re-completion or
-    overlapping scheduling). We now compute the next due date strictly after any
-    existing task due dates or the last completion date.
+    Thin wrapper kept for callers of the old helper; the logic lives in ``scheduling``, which
+    gathers all inputs with one grouped query instead of three separate SELECTs.
     """
-    if not appliance.cleaning_interval_days:
-        return None
-    from sqlalchemy import select
-    # Gather all incomplete tasks ordered by due date
-    result = await session.execute(
-        select(CleaningTask).where(
-            CleaningTask.appliance_id == appliance.id,
-            CleaningTask.completed == False  # noqa: E712
-        ).order_by(CleaningTask.due_date)
-    )
-    incomplete = result.scalars().all()
-    today = date.today()
-    # If there is a future (>= today) incomplete task, reuse it
-    future_incomplete = [t for t in incomplete if t.due_date >= today]
-    if future_incomplete:
-        return future_incomplete[0]
-
-    # Determine a monotonically increasing base date
-    last_completed_result = await session.execute(
-        select(CleaningTask).where(
-            CleaningTask.appliance_id == appliance.id,
-            CleaningTask.completed == True  # noqa: E712
-        ).order_by(CleaningTask.completed_at.desc())
-    )
-    last_completed = last_completed_result.scalars().first()
-
-    # Consider latest due date of any task (completed or not) to avoid duplicates
-    any_tasks_result = await session.execute(
-        select(CleaningTask).where(CleaningTask.appliance_id == appliance.id).order_by(CleaningTask.due_date.desc())
-    )
-    latest_task = any_tasks_result.scalars().first()
-
-    candidates: list[date] = []
-    if last_completed and last_completed.completed_at:
-        candidates.append(last_completed.completed_at.date())
-    if latest_task:
-        candidates.append(latest_task.due_date)
-    if not candidates:
-        candidates.append(appliance.created_at.date())
-
-    base_date = max(candidates)
-    # Next due must be strictly after base_date
-    due = base_date + timedelta(days=appliance.cleaning_interval_days)
-
-    new_task = CleaningTask(appliance_id=appliance.id, due_date=due)
-    session.add(new_task)
-    await session.flush()
-    return new_task
+    from .scheduling import ensure_future_task as _ensure_future_task
+    return await _ensure_future_task(session, appliance)
@@ -0,0 +1,49 @@
+"""Opaque keyset cursors.
+
+A cursor encodes the sort key of the last row of a page; the next page is fetched with a
+``(key...) > (cursor...)`` predicate, which is an index seek no matter how deep the client pages.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Callable, Sequence, TypeVar
+
+from fastapi import HTTPException
+
+T = TypeVar("T")
+
+# list endpoints keep returning bare JSON arrays; the cursor for the next page travels in a header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*values: object) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str, *types: type) -> tuple:
+    """Decode ``token`` into a tuple converted to ``types``; malformed cursors raise HTTP 400."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor arity mismatch")
+        return tuple(_convert(value, type_) for value, type_ in zip(values, types))
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(400, "Invalid cursor") from exc
+
+def _convert(value: object, type_: type) -> object:
+    if type_ is datetime:
+        return datetime.fromisoformat(value)  # type: ignore[arg-type]
+    if type_ is date:
+        return date.fromisoformat(value)  # type: ignore[arg-type]
+    if not isinstance(value, type_):
+        raise TypeError(f"expected {type_.__name__}")
+    return value
+
+def split_page(rows: Sequence[T], limit: int | None, key: Callable[[T], tuple]) -> tuple[list[T], str | None]:
+    """Trim a ``limit + 1`` fetch to ``limit`` rows and build the cursor for the following page."""
+    if limit is None or len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    return page, encode_cursor(*key(page[-1]))
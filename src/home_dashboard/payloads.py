@@ -0,0 +1,152 @@
+"""Pre-rendered JSON for the hot read endpoints.
+
+``crud`` read paths return Core rows; here they become plain dicts and are serialized in one
+``TypeAdapter.dump_json`` call per payload, skipping per-row model validation.  The TypedDicts
+mirror the ``*Out`` schemas field for field, so the bytes match what ``response_model`` would
+have produced and the schemas stay the documented contract.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Iterable
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+# pydantic builds schemas from typing_extensions.TypedDict on every supported Python
+from typing_extensions import TypedDict
+
+from .pagination import NEXT_CURSOR_HEADER
+
+class ApplianceRow(TypedDict):
+    id: int
+    name: str
+    cleaning_interval_days: int | None
+    created_at: datetime
+
+class TaskRow(TypedDict):
+    id: int
+    appliance_id: int
+    due_date: date
+    completed: bool
+    completed_at: datetime | None
+
+class ApplianceOverviewRow(TypedDict):
+    id: int
+    name: str
+    cleaning_interval_days: int | None
+    created_at: datetime
+    next_task_id: int | None
+    next_due_date: date | None
+    overdue: bool
+    last_completed_at: datetime | None
+    task_count: int
+    open_task_count: int
+    overdue_task_count: int
+
+class DueTaskRow(TypedDict):
+    id: int
+    due_date: date
+    completed: bool
+    completed_at: datetime | None
+    appliance: ApplianceRow
+
+class DueTasksPage(TypedDict):
+    items: list[DueTaskRow]
+    next_cursor: str | None
+
+class CalendarEntry(TypedDict):
+    due_date: date
+    appliance_id: int
+    appliance_name: str
+    scheduled: bool
+
+class ChangeHead(TypedDict):
+    id: int
+    kind: str
+    entity_id: int | None
+    room: str | None
+    created_at: datetime
+
+class TemperatureRow(TypedDict):
+    id: int
+    recorded_at: datetime
+    value_c: float
+    room: str
+
+class Dashboard(TypedDict):
+    due_tasks: list[DueTaskRow]
+    recent_temps: list[TemperatureRow]
+    recent_temps_by_room: dict[str, list[TemperatureRow]]
+
+_appliances = TypeAdapter(list[ApplianceRow])
+_appliance_overview = TypeAdapter(list[ApplianceOverviewRow])
+_tasks = TypeAdapter(list[TaskRow])
+_due_tasks_page = TypeAdapter(DueTasksPage)
+_calendar = TypeAdapter(list[CalendarEntry])
+_change_head = TypeAdapter(ChangeHead)
+_temperatures = TypeAdapter(list[TemperatureRow])
+_dashboard = TypeAdapter(Dashboard)
+
+def json_response(body: bytes, next_cursor: str | None = None, headers: dict[str, str] | None = None) -> Response:
+    headers = dict(headers or {})
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return Response(body, media_type="application/json", headers=headers)
+
+def _due_tasks(rows: Iterable[Row]) -> list[DueTaskRow]:
+    return [
+        {
+            "id": row.id,
+            "due_date": row.due_date,
+            "completed": row.completed,
+            "completed_at": row.completed_at,
+            "appliance": {
+                "id": row.appliance_id,
+                "name": row.appliance_name,
+                "cleaning_interval_days": row.appliance_cleaning_interval_days,
+                "created_at": row.appliance_created_at,
+            },
+        }
+        for row in rows
+    ]
+
+def appliances(rows: Iterable[Row]) -> bytes:
+    return _appliances.dump_json([row._asdict() for row in rows])
+
+def appliance_overview(rows: Iterable[Row]) -> bytes:
+    # the earliest open task is overdue exactly when any open task is
+    return _appliance_overview.dump_json([{**row._asdict(), "overdue": row.overdue_task_count > 0} for row in rows])
+
+def tasks(rows: Iterable[Row]) -> bytes:
+    return _tasks.dump_json([row._asdict() for row in rows])
+
+def temperatures(rows: Iterable[Row]) -> bytes:
+    return _temperatures.dump_json([row._asdict() for row in rows])
+
+def calendar(entries: Iterable[tuple[date, int, bool]], names: dict[int, str]) -> bytes:
+    return _calendar.dump_json([
+        {"due_date": due, "appliance_id": appliance_id, "appliance_name": names[appliance_id], "scheduled": stored}
+        for due, appliance_id, stored in entries
+    ])
+
+def changes_page(rows: Iterable[Row], next_cursor: int, has_more: bool, resync_required: bool) -> bytes:
+    # ``data`` is stored as JSON text and spliced in as is instead of being parsed and re-encoded
+    entries = b",".join(
+        _change_head.dump_json({"id": row.id, "kind": row.kind, "entity_id": row.entity_id, "room": row.room, "created_at": row.created_at})[:-1]
+        + b',"data":' + row.data.encode() + b"}"
+        for row in rows
+    )
+    tail = f'],"next":{int(next_cursor)},"has_more":{str(has_more).lower()},"resync_required":{str(resync_required).lower()}}}'
+    return b'{"changes":[' + entries + tail.encode()
+
+def due_tasks_page(rows: Iterable[Row], next_cursor: str | None) -> bytes:
+    return _due_tasks_page.dump_json({"items": _due_tasks(rows), "next_cursor": next_cursor})
+
+def dashboard(due_rows: Iterable[Row], temperature_rows: Iterable[Row]) -> bytes:
+    # each reading dict is built once and referenced from both the flat and the per-room list
+    temps = [row._asdict() for row in temperature_rows]
+    by_room: dict[str, list] = {}
+    for reading in temps:
+        by_room.setdefault(reading["room"], []).append(reading)
+    return _dashboard.dump_json({"due_tasks": _due_tasks(due_rows), "recent_temps": temps, "recent_temps_by_room": by_room})
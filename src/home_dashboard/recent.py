@@ -0,0 +1,236 @@
+"""In-process cache of the latest readings per room, for zero-query hot reads.
+
+Opt in with ``HOME_DASHBOARD_TEMP_CACHE_ROWS=N``: the lifespan warms one ring per room with
+its newest N readings (one query), and from then on ``crud.recent_temperatures``,
+``recent_temperatures_per_room`` and unfiltered ``list_temperatures`` pages are answered
+from memory whenever the rings can answer exactly.  A ring stores ids, timestamps (epoch
+microseconds) and values in three preallocated typed arrays, ~24 bytes per reading.
+
+Write paths in ``crud`` (and the retention worker) queue their changes on the session like
+``broadcast`` events; they reach the rings only once that session commits.  Each process
+only sees its own writes, so the cache is for single-worker deployments.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+from array import array
+from bisect import insort
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_PENDING_KEY = "home_dashboard.pending_recent"
+_EPOCH = datetime(1970, 1, 1)
+
+class CachedReading(NamedTuple):
+    """Same fields and attribute access as the ``crud.READING_COLUMNS`` rows it stands in for."""
+    id: int
+    recorded_at: datetime
+    value_c: float
+    room: str
+
+def epoch_us(value: datetime) -> int:
+    # SQLite hands back naive UTC datetimes; freshly written ones are aware
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+class RoomRing:
+    """The newest ``capacity`` readings of one room, ordered by (recorded_at, id)."""
+
+    def __init__(self, room: str, capacity: int):
+        self.room = room
+        self.capacity = capacity
+        self._ids = array("q", bytes(8 * capacity))
+        self._us = array("q", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._head = 0  # slot of the oldest reading
+        self.size = 0
+        # True while the ring holds every reading of the room (nothing pushed out by capacity)
+        self.complete = True
+        # evicted during a purge that has not finished yet
+        self._evicted = False
+
+    def _slot(self, i: int) -> int:
+        return (self._head + i) % self.capacity
+
+    def _key(self, i: int) -> tuple[int, int]:
+        slot = self._slot(i)
+        return self._us[slot], self._ids[slot]
+
+    def add(self, reading_id: int, us: int, value_c: float) -> None:
+        if self.size and (us, reading_id) < self._key(self.size - 1):
+            self._insert_late(reading_id, us, value_c)
+            return
+        if self.size < self.capacity:
+            slot = self._slot(self.size)
+            self.size += 1
+        else:
+            slot = self._head
+            self._head = (self._head + 1) % self.capacity
+            self.complete = False
+        self._ids[slot], self._us[slot], self._values[slot] = reading_id, us, value_c
+
+    def _insert_late(self, reading_id: int, us: int, value_c: float) -> None:
+        # a back-dated reading: rare, so re-laying the ring out is fine
+        if self.size == self.capacity and (us, reading_id) < self._key(0):
+            self.complete = False
+            return
+        entries = [(u, i, v) for i, u, v in self._entries()]
+        insort(entries, (us, reading_id, value_c))
+        self._reload(entries)
+
+    def _entries(self) -> Iterator[tuple[int, int, float]]:
+        for i in range(self.size):
+            slot = self._slot(i)
+            yield self._ids[slot], self._us[slot], self._values[slot]
+
+    def _reload(self, entries: list[tuple[int, int, float]]) -> None:
+        if len(entries) > self.capacity:
+            entries = entries[-self.capacity:]
+            self.complete = False
+        self._head, self.size = 0, len(entries)
+        for slot, (us, reading_id, value_c) in enumerate(entries):
+            self._ids[slot], self._us[slot], self._values[slot] = reading_id, us, value_c
+
+    def evict_before(self, us: int, purged: bool = True) -> None:
+        """Drop readings older than ``us`` as retention deletes them.
+
+        ``purged`` is False for all but the last batch of a purge: rows the ring had pushed out
+        may still be in the database until then, so the ring cannot become complete yet.
+        """
+        while self.size and self._us[self._head] < us:
+            self._head = (self._head + 1) % self.capacity
+            self.size -= 1
+            self._evicted = True
+        if purged and self._evicted:
+            # whatever the ring had pushed out was older still, so it is gone from the database too
+            self.complete = True
+            self._evicted = False
+
+    def can_serve(self, n: int) -> bool:
+        return self.complete or n <= self.size
+
+    def newest(self, n: int) -> Iterator[CachedReading]:
+        """Up to ``n`` readings, newest first."""
+        for i in range(self.size - 1, max(self.size - n, 0) - 1, -1):
+            slot = self._slot(i)
+            yield CachedReading(
+                self._ids[slot], _EPOCH + timedelta(microseconds=self._us[slot]), self._values[slot], self.room
+            )
+
+class RecentReadings:
+    def __init__(self, capacity: int = 0):
+        self.capacity = capacity
+        self.ready = False
+        self.rooms: dict[str, RoomRing] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def reset(self, capacity: int | None = None) -> None:
+        if capacity is not None:
+            self.capacity = capacity
+        self.ready = False
+        self.rooms = {}
+
+    def load(self, rows: Iterable) -> None:
+        """Warm from ``crud.recent_temperatures_per_room(session, capacity)`` rows."""
+        self.rooms = {}
+        for row in rows:
+            self._ring(row.room).add(row.id, epoch_us(row.recorded_at), row.value_c)
+        for ring in self.rooms.values():
+            # a full ring may have older rows in the database
+            ring.complete = ring.size < self.capacity
+        self.ready = True
+
+    def _ring(self, room: str) -> RoomRing:
+        ring = self.rooms.get(room)
+        if ring is None:
+            ring = self.rooms[room] = RoomRing(room, self.capacity)
+        return ring
+
+    # -- reads; None means "ask the database" --
+
+    def _served(self, ok: bool) -> bool:
+        if ok:
+            self.hits += 1
+        elif self.ready:
+            self.misses += 1
+        return ok
+
+    def latest(self, limit: int) -> list[CachedReading] | None:
+        """Newest ``limit`` readings across rooms, in chronological order."""
+        if not self._served(self.ready and all(ring.can_serve(limit) for ring in self.rooms.values())):
+            return None
+        merged = heapq.merge(*(ring.newest(limit) for ring in self.rooms.values()), key=lambda r: (r.recorded_at, r.id), reverse=True)
+        return list(itertools.islice(merged, limit))[::-1]
+
+    def latest_per_room(self, per_room: int) -> list[CachedReading] | None:
+        """Newest ``per_room`` readings of every room, ordered by (room, recorded_at, id)."""
+        if not self._served(self.ready and all(ring.can_serve(per_room) for ring in self.rooms.values())):
+            return None
+        return [r for room in sorted(self.rooms) for r in reversed(list(self.rooms[room].newest(per_room)))]
+
+    def room_page(self, room: str, limit: int) -> list[CachedReading] | None:
+        """Newest ``limit`` readings of one room, newest first."""
+        ring = self.rooms.get(room)
+        if not self._served(self.ready and (ring is None or ring.can_serve(limit))):
+            return None
+        return list(ring.newest(limit)) if ring is not None else []
+
+    # -- changes, applied after commit --
+
+    def apply(self, op: tuple) -> None:
+        if not self.ready:
+            return
+        kind = op[0]
+        if kind == "add":
+            for room, reading_id, recorded_at, value_c in op[1]:
+                self._ring(room).add(reading_id, epoch_us(recorded_at), value_c)
+        elif kind == "clear":
+            if op[1] is None:
+                self.rooms = {}
+            else:
+                self.rooms.pop(op[1], None)
+        elif kind == "evict":
+            ring = self.rooms.get(op[1])
+            if ring is not None:
+                ring.evict_before(epoch_us(op[2]), op[3])
+
+readings = RecentReadings()
+
+def capacity_from_env() -> int:
+    return int(os.getenv("HOME_DASHBOARD_TEMP_CACHE_ROWS", "0"))
+
+def _queue(session: AsyncSession | Session, op: tuple) -> None:
+    if readings.enabled:
+        session.info.setdefault(_PENDING_KEY, []).append(op)
+
+def added_after_commit(session: AsyncSession | Session, rows: Iterable[tuple[str, int, datetime, float]]) -> None:
+    """Queue ``(room, id, recorded_at, value_c)`` readings for the rings."""
+    _queue(session, ("add", list(rows)))
+
+def cleared_after_commit(session: AsyncSession | Session, room: str | None) -> None:
+    _queue(session, ("clear", room))
+
+def evicted_after_commit(session: AsyncSession | Session, room: str, cutoff: datetime, purged: bool = True) -> None:
+    """Queue an eviction; ``purged`` marks the batch after which no row older than ``cutoff`` is left."""
+    _queue(session, ("evict", room, cutoff, purged))
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session) -> None:
+    for op in session.info.pop(_PENDING_KEY, ()):
+        readings.apply(op)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import archive, cache, changes, models, recent, rollups
+from .writes import WriteCoordinator
+
+logger = logging.getLogger(__name__)
+
+def _parse_room_days(raw: str) -> dict[str, int]:
+    """Parse ``"office=7,garage=90"`` into ``{"office": 7, "garage": 90}``."""
+    rooms: dict[str, int] = {}
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        room, _, days = item.partition("=")
+        rooms[room.strip()] = int(days)
+    return rooms
+
+@dataclass
+class RetentionPolicy:
+    default_days: int | None = None
+    room_days: dict[str, int] = field(default_factory=dict)
+    interval_s: float = 3600.0
+    batch_size: int = 1000
+    pause_ms: int = 10
+    # fine-grained rollups can be compacted too; hour/day buckets are kept forever
+    minute_rollup_days: int | None = None
+    vacuum_pages: int = 256
+    # completed tasks older than this move to cleaning_tasks_archive
+    task_archive_days: int | None = None
+    # /api/changes entries older than this are compacted; clients further behind must resync
+    change_log_hours: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            self.default_days is not None
+            or bool(self.room_days)
+            or self.task_archive_days is not None
+            or self.change_log_hours is not None
+        )
+
+    def days_for(self, room: str) -> int | None:
+        return self.room_days.get(room, self.default_days)
+
+    @classmethod
+    def from_env(cls) -> RetentionPolicy:
+        default_days = os.getenv("HOME_DASHBOARD_RETENTION_DAYS")
+        minute_days = os.getenv("HOME_DASHBOARD_RETENTION_MINUTE_ROLLUP_DAYS")
+        archive_days = os.getenv("HOME_DASHBOARD_TASK_ARCHIVE_DAYS")
+        # the change log is always compacted unless explicitly switched off with 0
+        change_log_hours = float(os.getenv("HOME_DASHBOARD_CHANGE_LOG_HOURS", "24"))
+        return cls(
+            default_days=int(default_days) if default_days else None,
+            room_days=_parse_room_days(os.getenv("HOME_DASHBOARD_RETENTION_ROOM_DAYS", "")),
+            interval_s=float(os.getenv("HOME_DASHBOARD_RETENTION_INTERVAL_S", "3600")),
+            batch_size=int(os.getenv("HOME_DASHBOARD_RETENTION_BATCH", "1000")),
+            pause_ms=int(os.getenv("HOME_DASHBOARD_RETENTION_PAUSE_MS", "10")),
+            minute_rollup_days=int(minute_days) if minute_days else None,
+            vacuum_pages=int(os.getenv("HOME_DASHBOARD_RETENTION_VACUUM_PAGES", "256")),
+            task_archive_days=int(archive_days) if archive_days else None,
+            change_log_hours=change_log_hours or None,
+        )
+
+@dataclass
+class RetentionStatus:
+    runs: int = 0
+    running: bool = False
+    last_started_at: datetime | None = None
+    last_duration_ms: float | None = None
+    last_rows_purged: int = 0
+    last_rows_purged_by_room: dict[str, int] = field(default_factory=dict)
+    last_rollups_purged: int = 0
+    last_tasks_archived: int = 0
+    last_changes_compacted: int = 0
+    last_pages_vacuumed: int = 0
+    total_rows_purged: int = 0
+    total_duration_ms: float = 0.0
+    last_error: str | None = None
+
+class RetentionWorker:
+    """Enforce the retention policy in small transactions from a background task.
+
+    Each chunk of at most ``batch_size`` expired rows is deleted and committed on its own, with
+    a short pause in between, so ingestion and dashboard reads are never blocked for long.  Raw
+    rows are already summarized by the incrementally maintained rollups, which retention keeps.
+    Every transaction goes through the app's :class:`WriteCoordinator` (``BEGIN IMMEDIATE`` and
+    busy retry), like router mutations.
+    """
+
+    def __init__(self, writer: WriteCoordinator, policy: RetentionPolicy):
+        self._writer = writer
+        self.policy = policy
+        self.status = RetentionStatus()
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        if self._task is None and self.policy.enabled:
+            self._task = asyncio.create_task(self._loop(), name="temperature-retention")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("temperature retention run failed")
+            await asyncio.sleep(self.policy.interval_s)
+
+    async def run_once(self) -> RetentionStatus:
+        async with self._lock:
+            status = self.status
+            status.running = True
+            status.last_started_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            by_room: dict[str, int] = {}
+            try:
+                status.last_error = None
+                for room in await self._rooms():
+                    days = self.policy.days_for(room)
+                    if days is None:
+                        continue
+                    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+                    purged = await self._purge_room(room, cutoff)
+                    if purged:
+                        by_room[room] = purged
+                status.last_rollups_purged = await self._compact_minute_rollups()
+                status.last_tasks_archived = await self._archive_tasks()
+                status.last_changes_compacted = await self._compact_change_log()
+                status.last_pages_vacuumed = await self._incremental_vacuum()
+            except Exception as exc:
+                status.last_error = repr(exc)
+                raise
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                status.running = False
+                status.runs += 1
+                status.last_duration_ms = elapsed_ms
+                status.total_duration_ms += elapsed_ms
+                status.last_rows_purged_by_room = by_room
+                status.last_rows_purged = sum(by_room.values())
+                status.total_rows_purged += status.last_rows_purged
+            return status
+
+    async def _pause(self) -> None:
+        await asyncio.sleep(self.policy.pause_ms / 1000)
+
+    async def _rooms(self) -> list[str]:
+        async with self._writer.session_factory() as session:
+            result = await session.execute(select(models.TemperatureReading.room).distinct())
+            return list(result.scalars().all())
+
+    async def _purge_room(self, room: str, cutoff: datetime) -> int:
+        reading = models.TemperatureReading
+        expired = (
+            select(reading.id)
+            .where(reading.room == room, reading.recorded_at < cutoff)
+            .limit(self.policy.batch_size)
+            .scalar_subquery()
+        )
+
+        async def purge_batch(session: AsyncSession) -> int:
+            result = await session.execute(delete(reading).where(reading.id.in_(expired)))
+            deleted = result.rowcount or 0
+            # a short batch is the last one: only then is every expired row gone
+            recent.evicted_after_commit(session, room, cutoff, purged=deleted < self.policy.batch_size)
+            if deleted:
+                cache.mark_changed(session)
+                changes.record(session, "temperature.purged", {"room": room, "before": cutoff}, room=room)
+            return deleted
+
+        purged = 0
+        while True:
+            deleted = await self._writer.run(purge_batch)
+            purged += deleted
+            if deleted < self.policy.batch_size:
+                return purged
+            await self._pause()
+
+    async def _compact_minute_rollups(self) -> int:
+        if self.policy.minute_rollup_days is None:
+            return 0
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.policy.minute_rollup_days)
+        table = models.TemperatureRollup
+
+        async def compact(session: AsyncSession) -> int:
+            result = await session.execute(
+                delete(table).where(
+                    table.resolution == "minute",
+                    table.bucket_start < rollups.bucket_start(cutoff, "minute"),
+                )
+            )
+            return result.rowcount or 0
+
+        return await self._writer.run(compact)
+
+    async def _archive_tasks(self) -> int:
+        if self.policy.task_archive_days is None:
+            return 0
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.policy.task_archive_days)
+        moved = 0
+        while True:
+            count = await self._writer.run(lambda session: archive.archive_completed(session, cutoff, self.policy.batch_size))
+            moved += count
+            if count < self.policy.batch_size:
+                return moved
+            await self._pause()
+
+    async def _compact_change_log(self) -> int:
+        if self.policy.change_log_hours is None:
+            return 0
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.policy.change_log_hours)
+        return await self._writer.run(lambda session: changes.compact(session, cutoff))
+
+    async def _incremental_vacuum(self) -> int:
+        """Return freed pages to the filesystem when the database uses auto_vacuum=INCREMENTAL."""
+        freed = 0
+        while True:
+            # executescript commits on its own, so this stays outside the coordinator's transactions
+            async with self._writer.session_factory() as session:
+                conn = await session.connection()
+                if (await conn.exec_driver_sql("PRAGMA auto_vacuum")).scalar() != 2:
+                    return freed
+                free = (await conn.exec_driver_sql("PRAGMA freelist_count")).scalar() or 0
+                if not free:
+                    return freed
+                step = min(free, self.policy.vacuum_pages)
+                # a plain execute() frees a single page per step; executescript runs the pragma to completion
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(step)})")
+            freed += step
+            await self._pause()
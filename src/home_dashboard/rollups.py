@@ -0,0 +1,138 @@
+"""Incrementally maintained per-room temperature rollups.
+
+Every insert path in ``crud`` folds new readings into minute/hour/day buckets holding
+count/sum/min/max, so long-range charts read a handful of pre-aggregated rows instead of
+scanning ``temperature_readings``.  ``python -m home_dashboard.rollups backfill`` rebuilds
+the buckets from the raw table (e.g. after upgrading an existing database).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+RESOLUTIONS: dict[str, int] = {"minute": 60, "hour": 3600, "day": 86400}
+
+# 6 bound parameters per rollup row
+_UPSERT_CHUNK = 1000
+
+def bucket_start(recorded_at: datetime, resolution: str) -> int:
+    if recorded_at.tzinfo is None:
+        recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+    step = RESOLUTIONS[resolution]
+    return int(recorded_at.timestamp()) // step * step
+
+def aggregate(readings: Iterable[tuple[str, datetime, float]]) -> list[dict]:
+    """Fold (room, recorded_at, value_c) tuples into one partial bucket per (resolution, room, bucket)."""
+    buckets: dict[tuple[str, str, int], list[float]] = {}
+    for room, recorded_at, value_c in readings:
+        for resolution in RESOLUTIONS:
+            key = (resolution, room, bucket_start(recorded_at, resolution))
+            acc = buckets.get(key)
+            if acc is None:
+                buckets[key] = [1, value_c, value_c, value_c]
+            else:
+                acc[0] += 1
+                acc[1] += value_c
+                if value_c < acc[2]:
+                    acc[2] = value_c
+                if value_c > acc[3]:
+                    acc[3] = value_c
+    return [
+        {"resolution": res, "room": room, "bucket_start": start, "count": c, "sum_c": s, "min_c": lo, "max_c": hi}
+        for (res, room, start), (c, s, lo, hi) in buckets.items()
+    ]
+
+async def apply(session: AsyncSession, readings: Iterable[tuple[str, datetime, float]]) -> None:
+    """Merge new readings into the rollup table with one upsert per chunk of buckets."""
+    rows = aggregate(readings)
+    table = models.TemperatureRollup
+    for start in range(0, len(rows), _UPSERT_CHUNK):
+        stmt = sqlite_insert(table).values(rows[start:start + _UPSERT_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.resolution, table.room, table.bucket_start],
+            set_={
+                "count": table.count + stmt.excluded.count,
+                "sum_c": table.sum_c + stmt.excluded.sum_c,
+                "min_c": func.min(table.min_c, stmt.excluded.min_c),
+                "max_c": func.max(table.max_c, stmt.excluded.max_c),
+            },
+        )
+        await session.execute(stmt)
+
+async def clear(session: AsyncSession, room: str | None) -> None:
+    stmt = delete(models.TemperatureRollup)
+    if room:
+        stmt = stmt.where(models.TemperatureRollup.room == room)
+    await session.execute(stmt)
+
+async def backfill(session: AsyncSession, room: str | None = None) -> int:
+    """Rebuild rollups from raw readings entirely in SQL; returns the number of buckets written."""
+    await clear(session, room)
+    written = 0
+    for resolution, step in RESOLUTIONS.items():
+        result = await session.execute(
+            text(
+                "INSERT INTO temperature_rollups (resolution, room, bucket_start, count, sum_c, min_c, max_c) "
+                "SELECT :resolution, room, CAST(strftime('%s', recorded_at) AS INTEGER) / :step * :step AS bucket, "
+                "count(*), sum(value_c), min(value_c), max(value_c) "
+                "FROM temperature_readings "
+                "WHERE (:room IS NULL OR room = :room) "
+                "GROUP BY room, bucket"
+            ),
+            {"resolution": resolution, "step": step, "room": room},
+        )
+        written += result.rowcount or 0
+    return written
+
+async def query(
+    session: AsyncSession,
+    resolution: str,
+    room: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+):
+    table = models.TemperatureRollup
+    stmt = select(table).where(table.resolution == resolution)
+    if room:
+        stmt = stmt.where(table.room == room)
+    if start is not None:
+        stmt = stmt.where(table.bucket_start >= bucket_start(start, resolution))
+    if end is not None:
+        stmt = stmt.where(table.bucket_start < _epoch(end))
+    result = await session.execute(stmt.order_by(table.room, table.bucket_start))
+    return result.scalars().all()
+
+def _epoch(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+async def _backfill_command(room: str | None) -> int:
+    from .db import SessionLocal, init_db
+
+    await init_db()
+    async with SessionLocal() as session:  # type: ignore
+        written = await backfill(session, room)
+        await session.commit()
+    return written
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m home_dashboard.rollups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    backfill_cmd = sub.add_parser("backfill", help="rebuild rollups from temperature_readings")
+    backfill_cmd.add_argument("--room", default=None, help="only rebuild this room")
+    args = parser.parse_args(argv)
+    if args.command == "backfill":
+        written = asyncio.run(_backfill_command(args.room))
+        print(f"wrote {written} rollup buckets")
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,2 @@
-from . import appliances, temperature, tasks  # noqa: F401
+from . import admin, appliances, metrics, stream, temperature, tasks  # noqa: F401
 
@@ -0,0 +1,42 @@
+from __future__ import annotations
+from dataclasses import asdict
+from fastapi import APIRouter, HTTPException, Request
+from .. import retention, schemas
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+def _retention_out(worker: retention.RetentionWorker | None) -> schemas.RetentionStatusOut:
+    policy = worker.policy if worker else retention.RetentionPolicy.from_env()
+    status = worker.status if worker else retention.RetentionStatus()
+    return schemas.RetentionStatusOut(
+        policy=schemas.RetentionPolicyOut(
+            enabled=policy.enabled,
+            default_days=policy.default_days,
+            room_days=policy.room_days,
+            interval_s=policy.interval_s,
+            batch_size=policy.batch_size,
+            minute_rollup_days=policy.minute_rollup_days,
+            task_archive_days=policy.task_archive_days,
+            change_log_hours=policy.change_log_hours,
+        ),
+        **asdict(status),
+    )
+
+@router.get("/startup", response_model=schemas.StartupReportOut)
+async def startup_report(request: Request):
+    report = getattr(request.app.state, "startup", None)
+    if report is None:
+        raise HTTPException(404, "No startup report (lifespan has not run)")
+    return schemas.StartupReportOut(**asdict(report))
+
+@router.get("/retention", response_model=schemas.RetentionStatusOut)
+async def retention_status(request: Request):
+    return _retention_out(getattr(request.app.state, "retention", None))
+
+@router.post("/retention/run", response_model=schemas.RetentionStatusOut)
+async def run_retention(request: Request):
+    worker: retention.RetentionWorker | None = getattr(request.app.state, "retention", None)
+    if worker is None or not worker.policy.enabled:
+        raise HTTPException(409, "Retention policy not configured")
+    await worker.run_once()
+    return _retention_out(worker)
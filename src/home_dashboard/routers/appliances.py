@@ -1,51 +1,133 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException
+import csv
+import io
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..db import get_session
-from .. import crud
+from ..db import get_read_session
+from ..pagination import decode_cursor, split_page
+from .. import archive, crud, payloads, scheduling
+from ..writes import WriteCoordinator, get_writer
 from .. import schemas
 
 router = APIRouter(prefix="/api/appliances", tags=["appliances"])
 
+_bulk_adapter = TypeAdapter(list[schemas.ApplianceCreate])
+_bulk_openapi = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/ApplianceCreate"}}},
+            "text/csv": {"schema": {"type": "string", "description": "Header row: name,cleaning_interval_days"}},
+        },
+    }
+}
+
+def _parse_bulk(body: bytes, content_type: str) -> list[schemas.ApplianceCreate]:
+    try:
+        if content_type == "text/csv":
+            rows = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            return _bulk_adapter.validate_python([
+                {"name": (row.get("name") or "").strip(), "cleaning_interval_days": (row.get("cleaning_interval_days") or "").strip() or None}
+                for row in rows
+            ])
+        return _bulk_adapter.validate_json(body)
+    except ValidationError as exc:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in exc.errors(include_url=False)])
+
 @router.get("/", response_model=list[schemas.ApplianceOut])
-async def list_appliances(session: AsyncSession = Depends(get_session)):
-    return await crud.list_appliances(session)
+async def list_appliances(
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Newest first; without ``limit`` every appliance is returned."""
+    before = decode_cursor(cursor, datetime, int) if cursor else None
+    rows = await crud.list_appliances(session, limit=limit + 1 if limit else None, before=before)
+    rows, next_cursor = split_page(rows, limit, lambda a: (a.created_at, a.id))
+    return payloads.json_response(payloads.appliances(rows), next_cursor)
+
+@router.get("/overview", response_model=list[schemas.ApplianceOverviewOut])
+async def appliance_overview(
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Appliances (newest first) with next due task, overdue flag, last completion and task counts."""
+    before = decode_cursor(cursor, datetime, int) if cursor else None
+    rows = await crud.appliance_overview(session, limit=limit + 1 if limit else None, before=before)
+    rows, next_cursor = split_page(rows, limit, lambda a: (a.created_at, a.id))
+    return payloads.json_response(payloads.appliance_overview(rows), next_cursor)
 
 @router.post("/", response_model=schemas.ApplianceOut, status_code=201)
-async def create_appliance(payload: schemas.ApplianceCreate, session: AsyncSession = Depends(get_session)):
-    appliance = await crud.create_appliance(session, payload.name, payload.cleaning_interval_days)
-    await session.commit()
-    return appliance
+async def create_appliance(payload: schemas.ApplianceCreate, writer: WriteCoordinator = Depends(get_writer)):
+    return await writer.run(lambda session: crud.create_appliance(session, payload.name, payload.cleaning_interval_days))
+
+@router.post("/bulk", response_model=schemas.BulkUpsertAppliancesResult, openapi_extra=_bulk_openapi)
+async def bulk_upsert(request: Request, writer: WriteCoordinator = Depends(get_writer)):
+    """Create or update appliances by name from a JSON array or a CSV upload."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    items = _parse_bulk(await request.body(), content_type)
+    return await writer.run(lambda session: crud.upsert_appliances(session, items))
 
 @router.get("/{appliance_id}", response_model=schemas.ApplianceOut)
-async def get_appliance(appliance_id: int, session: AsyncSession = Depends(get_session)):
+async def get_appliance(appliance_id: int, session: AsyncSession = Depends(get_read_session)):
     appliance = await crud.get_appliance(session, appliance_id)
     if not appliance:
         raise HTTPException(404, "Not found")
     return appliance
 
 @router.patch("/{appliance_id}/interval", response_model=schemas.ApplianceOut)
-async def update_interval(appliance_id: int, payload: schemas.ApplianceIntervalUpdate, session: AsyncSession = Depends(get_session)):
-    appliance = await crud.update_appliance_interval(session, appliance_id, payload.cleaning_interval_days)
+async def update_interval(appliance_id: int, payload: schemas.ApplianceIntervalUpdate, writer: WriteCoordinator = Depends(get_writer)):
+    appliance = await writer.run(lambda session: crud.update_appliance_interval(session, appliance_id, payload.cleaning_interval_days))
     if not appliance:
         raise HTTPException(404, "Not found")
-    await session.commit()
     return appliance
 
 @router.post("/bulk-delete", response_model=schemas.BulkDeleteAppliancesResult)
-async def bulk_delete(payload: schemas.BulkDeleteAppliancesRequest, session: AsyncSession = Depends(get_session)):
-    deleted = 0
-    for id_ in set(payload.ids):
-        appliance = await crud.get_appliance(session, id_)
-        if appliance:
-            await session.delete(appliance)
-            deleted += 1
-    await session.commit()
+async def bulk_delete(payload: schemas.BulkDeleteAppliancesRequest, writer: WriteCoordinator = Depends(get_writer)):
+    deleted = await writer.run(lambda session: crud.delete_appliances(session, payload.ids))
     return schemas.BulkDeleteAppliancesResult(deleted=deleted)
 
+@router.post("/reschedule", response_model=schemas.RescheduleResult)
+async def reschedule(payload: schemas.RescheduleRequest | None = None, writer: WriteCoordinator = Depends(get_writer)):
+    """Re-plan the next task of every appliance (or of ``appliance_ids``) in one transaction."""
+    return await writer.run(lambda session: scheduling.reschedule(session, payload.appliance_ids if payload else None))
+
+@router.get("/{appliance_id}/stats", response_model=schemas.ApplianceStatsOut)
+async def appliance_stats(appliance_id: int, session: AsyncSession = Depends(get_read_session)):
+    """Completion history from the maintained counters (archived tasks included)."""
+    stats = await archive.get_stats(session, appliance_id)
+    if stats is None:
+        if not await crud.appliance_exists(session, appliance_id):
+            raise HTTPException(404, "Not found")
+        return schemas.ApplianceStatsOut(
+            appliance_id=appliance_id, completions=0, avg_lateness_days=None,
+            max_lateness_days=None, last_completed_at=None, archived_tasks=0,
+        )
+    return schemas.ApplianceStatsOut(
+        appliance_id=appliance_id,
+        completions=stats.completions,
+        avg_lateness_days=stats.total_lateness_days / stats.completions if stats.completions else None,
+        max_lateness_days=stats.max_lateness_days,
+        last_completed_at=stats.last_completed_at,
+        archived_tasks=stats.archived_tasks,
+    )
+
 @router.get("/{appliance_id}/tasks", response_model=list[schemas.CleaningTaskOut])
-async def tasks_for_appliance(appliance_id: int, session: AsyncSession = Depends(get_session)):
-    appliance = await crud.get_appliance(session, appliance_id)
-    if not appliance:
+async def tasks_for_appliance(
+    appliance_id: int,
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Tasks by due date; without ``limit`` the full history is returned."""
+    after = decode_cursor(cursor, date, int) if cursor else None
+    rows = await crud.list_tasks_for_appliance(session, appliance_id, limit=limit + 1 if limit else None, after=after)
+    # only an empty page needs telling an unknown appliance from one without (further) tasks
+    if not rows and not await crud.appliance_exists(session, appliance_id):
         raise HTTPException(404, "Not found")
-    return await crud.list_tasks_for_appliance(session, appliance_id)
+    rows, next_cursor = split_page(rows, limit, lambda t: (t.due_date, t.id))
+    return payloads.json_response(payloads.tasks(rows), next_cursor)
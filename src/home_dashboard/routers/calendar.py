@@ -0,0 +1,41 @@
+from __future__ import annotations
+from datetime import date, timedelta
+from itertools import dropwhile, islice
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db import get_read_session
+from ..pagination import decode_cursor, split_page
+from .. import crud, payloads, scheduling, schemas
+
+router = APIRouter(prefix="/api/calendar", tags=["calendar"])
+
+DEFAULT_WINDOW_DAYS = 90
+
+@router.get("", response_model=list[schemas.CalendarEntryOut])
+async def calendar(
+    start: date | None = None,
+    end: date | None = None,
+    appliance_id: int | None = None,
+    limit: int = Query(default=1000, ge=1, le=10_000),
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Projected due dates of every scheduled appliance in [start, end], ordered by (due_date, appliance_id).
+
+    Defaults to the next 90 days; ``appliance_id`` narrows it to one appliance. Nothing is written: only each appliance's next task is stored,
+    later occurrences are computed from its interval.
+    """
+    start = start or date.today()
+    end = end or start + timedelta(days=DEFAULT_WINDOW_DAYS)
+    if end < start:
+        raise HTTPException(422, "end must not be before start")
+    states = await scheduling.load_states(session, None if appliance_id is None else [appliance_id])
+    if appliance_id is not None and not states:
+        raise HTTPException(404, "Not found")
+    names = await crud.appliance_names(session, appliance_id)
+    entries = scheduling.project(states.values(), start, end)
+    if cursor:
+        after = decode_cursor(cursor, date, int)
+        entries = dropwhile(lambda e: e[:2] <= after, scheduling.project(states.values(), max(start, after[0]), end))
+    page, next_cursor = split_page(list(islice(entries, limit + 1)), limit, lambda e: e[:2])
+    return payloads.json_response(payloads.calendar(page, names), next_cursor)
@@ -0,0 +1,21 @@
+from __future__ import annotations
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db import get_read_session
+from .. import changes, payloads, schemas
+
+router = APIRouter(prefix="/api/changes", tags=["changes"])
+
+@router.get("", response_model=schemas.ChangesPage)
+async def list_changes(
+    since: int | None = Query(default=None, ge=0, description="``next`` of the previous call; omit for the current position"),
+    limit: int = Query(default=500, ge=1, le=5000),
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Changes committed after ``since``, oldest first.
+
+    Without ``since`` (or when it is too old) the response only carries ``resync_required`` and
+    the cursor to continue from after reloading the full endpoints.
+    """
+    page = await changes.since(session, since, limit)
+    return payloads.json_response(payloads.changes_page(page.changes, page.next, page.has_more, page.resync_required))
@@ -0,0 +1,12 @@
+from __future__ import annotations
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from .. import metrics
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("", response_class=PlainTextResponse)
+async def prometheus(request: Request):
+    return PlainTextResponse(metrics.render(request.app), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+import os
+from typing import AsyncIterator
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from .. import broadcast
+
+router = APIRouter(prefix="/api", tags=["stream"])
+
+HEARTBEAT_S = float(os.getenv("HOME_DASHBOARD_STREAM_HEARTBEAT_S", "15"))
+CLIENT_QUEUE = int(os.getenv("HOME_DASHBOARD_STREAM_QUEUE", "100"))
+
+async def event_stream(
+    request: Request,
+    hub: broadcast.Broadcaster,
+    rooms: list[str] | None = None,
+    heartbeat_s: float = HEARTBEAT_S,
+) -> AsyncIterator[str]:
+    # subscribe inside the generator so the finally block always pairs with it
+    sub = hub.subscribe(rooms, max_queue=CLIENT_QUEUE)
+    try:
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            event = await sub.get(timeout=heartbeat_s)
+            if event is None:
+                # comment line keeps proxies from closing an idle connection
+                yield ": ping\n\n"
+                continue
+            dropped = sub.take_dropped()
+            if dropped:
+                # the client missed updates and should refetch /api/dashboard
+                yield broadcast.Event("lagged", {"dropped": dropped}).to_sse()
+            yield event.to_sse()
+    finally:
+        hub.unsubscribe(sub)
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream(request: Request, rooms: str | None = Query(default=None, description="Comma-separated room filter")):
+    """Server-Sent Events feed of temperature and task changes."""
+    selected = [r.strip() for r in rooms.split(",") if r.strip()] if rooms else None
+    return StreamingResponse(
+        event_stream(request, broadcast.broadcaster, selected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
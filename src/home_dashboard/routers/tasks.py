@@ -1,16 +1,39 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..db import get_session
-from .. import crud, schemas
+from ..db import get_read_session
+from ..pagination import decode_cursor, split_page
+from .. import crud, payloads, schemas
+from ..writes import WriteCoordinator, get_writer
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
+@router.get("/due", response_model=schemas.DueTasksPage)
+async def due_tasks(
+    horizon_days: int | None = Query(default=None, ge=0, le=3650),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_read_session),
+):
+    after = decode_cursor(cursor, date, int) if cursor else None
+    tasks = await crud.list_due_tasks(session, horizon_days, limit=limit + 1, after=after)
+    tasks, next_cursor = split_page(tasks, limit, lambda t: (t.due_date, t.id))
+    return payloads.json_response(payloads.due_tasks_page(tasks, next_cursor))
+
+@router.patch("/bulk", response_model=schemas.BulkTaskCompleteResult)
+async def update_tasks(payload: schemas.BulkTaskCompleteRequest, writer: WriteCoordinator = Depends(get_writer)):
+    """Complete (or reopen) many tasks in one transaction; a later entry for the same task wins."""
+    updates = {item.task_id: item.completed for item in payload.tasks}
+    updated, created = await writer.run(lambda session: crud.complete_tasks(session, updates))
+    found = {task.id for task in updated}
+    return schemas.BulkTaskCompleteResult(
+        updated=updated, created=created, missing=[task_id for task_id in updates if task_id not in found]
+    )
+
 @router.patch("/{task_id}", response_model=schemas.CleaningTaskOut)
-async def update_task(task_id: int, payload: schemas.CleaningTaskComplete, session: AsyncSession = Depends(get_session)):
-    task = await crud.complete_task(session, task_id, payload.completed)
+async def update_task(task_id: int, payload: schemas.CleaningTaskComplete, writer: WriteCoordinator = Depends(get_writer)):
+    task = await writer.run(lambda session: crud.complete_task(session, task_id, payload.completed))
     if not task:
         raise HTTPException(404, "Not found")
-    await session.commit()
     return task
-
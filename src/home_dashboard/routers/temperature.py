@@ -1,23 +1,227 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends
+from typing import AsyncIterator, Literal
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..db import get_session
-from .. import crud, schemas
+from ..db import ReadSessionLocal, get_read_session
+from ..pagination import decode_cursor, split_page
+from .. import crud, export, ingest, payloads, rollups, schemas, stats
+from ..writes import WriteCoordinator, get_writer
 
 router = APIRouter(prefix="/api/temperature", tags=["temperature"])
 
-@router.post("/", response_model=schemas.TemperatureReadingOut, status_code=201)
-async def add_temperature(payload: schemas.TemperatureReadingCreate, session: AsyncSession = Depends(get_session)):
-    reading = await crud.add_temperature(session, payload.value_c, payload.room)
-    await session.commit()
-    return reading
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+_batch_adapter = TypeAdapter(list[schemas.TemperatureReadingCreate])
+_item_adapter = TypeAdapter(schemas.TemperatureReadingCreate)
+_batch_openapi = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "array", "items": {"$ref": "#/components/schemas/TemperatureReadingCreate"}}
+            },
+            "application/x-ndjson": {"schema": {"type": "string", "description": "One TemperatureReadingCreate per line"}},
+        },
+    }
+}
+
+def _validation_error(exc: ValidationError, index: int | None = None) -> list[dict]:
+    errors = []
+    for err in exc.errors(include_url=False):
+        loc = list(err["loc"])
+        if index is not None:
+            loc.insert(0, index)
+        errors.append({**err, "loc": ("body", *loc)})
+    return errors
+
+def _validate_chunk(raw: bytes) -> list[schemas.TemperatureReadingCreate]:
+    try:
+        return _batch_adapter.validate_json(raw)
+    except ValidationError as exc:
+        raise RequestValidationError(_validation_error(exc))
+
+def _validate_lines(lines: list[tuple[int, bytes]]) -> list[schemas.TemperatureReadingCreate]:
+    """Each NDJSON line must hold exactly one reading; errors are located by zero-based line index."""
+    items, errors = [], []
+    for index, line in lines:
+        try:
+            items.append(_item_adapter.validate_json(line))
+        except ValidationError as exc:
+            errors += _validation_error(exc, index)
+    if errors:
+        raise RequestValidationError(errors)
+    return items
+
+async def _ndjson_lines(request: Request, size: int) -> AsyncIterator[list[tuple[int, bytes]]]:
+    pending = b""
+    index = 0
+    lines: list[tuple[int, bytes]] = []
+    async for part in request.stream():
+        pending += part
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            if line.strip():
+                lines.append((index, line))
+            index += 1
+            if len(lines) >= size:
+                yield lines
+                lines = []
+    if pending.strip():
+        lines.append((index, pending))
+    if lines:
+        yield lines
+
+async def _batch_chunks(request: Request, size: int) -> AsyncIterator[list[schemas.TemperatureReadingCreate]]:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        async for lines in _ndjson_lines(request, size):
+            yield _validate_lines(lines)
+        return
+    items = _validate_chunk(await request.body())
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+@router.post(
+    "/",
+    response_model=schemas.TemperatureReadingOut,
+    status_code=201,
+    responses={202: {"model": schemas.TemperatureReadingQueued}, 429: {"description": "Write-behind queue full"}},
+)
+async def add_temperature(payload: schemas.TemperatureReadingCreate, request: Request, writer: WriteCoordinator = Depends(get_writer)):
+    buffer: ingest.TemperatureWriteBuffer | None = getattr(request.app.state, "temperature_buffer", None)
+    if buffer is not None:
+        recorded_at = payload.recorded_at or datetime.now(timezone.utc)
+        try:
+            reading = await buffer.submit(payload.value_c, payload.room, recorded_at)
+        except ingest.BufferFull as exc:
+            raise HTTPException(429, str(exc), headers={"Retry-After": "1"})
+        if reading is None:
+            queued = schemas.TemperatureReadingQueued(value_c=payload.value_c, room=payload.room or "default", recorded_at=recorded_at)
+            return JSONResponse(jsonable_encoder(queued), status_code=202)
+        return reading
+    return await writer.run(lambda session: crud.add_temperature(session, payload.value_c, payload.room, payload.recorded_at))
+
+@router.post("/batch", response_model=schemas.TemperatureBatchResult, status_code=201, openapi_extra=_batch_openapi)
+async def add_temperature_batch(request: Request, writer: WriteCoordinator = Depends(get_writer)):
+    """Ingest a JSON array or an NDJSON stream of readings in one transaction.
+
+    The body is validated and inserted chunk by chunk, so NDJSON uploads are never held in
+    memory as a whole; any invalid item aborts the batch (422) and nothing is committed.
+    """
+    async def ingest_body(session: AsyncSession) -> schemas.TemperatureBatchResult:
+        inserted = chunks = 0
+        async for chunk in _batch_chunks(request, crud.TEMPERATURE_BATCH_CHUNK):
+            inserted += await crud.add_temperatures(session, chunk)
+            chunks += 1
+        return schemas.TemperatureBatchResult(inserted=inserted, chunks=chunks)
+
+    # the request body can only be read once, so a busy database is not retried here
+    return await writer.run(ingest_body, retries=0)
 
 @router.get("/", response_model=list[schemas.TemperatureReadingOut])
-async def recent(session: AsyncSession = Depends(get_session)):
-    return await crud.recent_temperatures(session)
+async def recent(
+    room: str | None = None,
+    per_room_limit: int | None = Query(default=None, ge=1, le=1000),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Latest readings in chronological order.
+
+    Pages walk back in time: pass the ``X-Next-Cursor`` header of one response as ``cursor``
+    to get the readings just before it.
+    """
+    if per_room_limit and not room and not (start or end or limit or cursor):
+        return payloads.json_response(payloads.temperatures(await crud.recent_temperatures_per_room(session, per_room_limit)))
+    page_size = limit or per_room_limit or 200
+    before = decode_cursor(cursor, datetime, int) if cursor else None
+    rows = await crud.list_temperatures(session, room, start, end, limit=page_size + 1, before=before)
+    rows, next_cursor = split_page(rows, page_size, lambda r: (r.recorded_at, r.id))
+    return payloads.json_response(payloads.temperatures(rows[::-1]), next_cursor)
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in export.MEDIA_TYPES.values()}}},
+)
+async def export_history(
+    fmt: Literal["csv", "ndjson", "npy"] = Query(default="csv", alias="format"),
+    room: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+):
+    """Stream raw readings oldest first; ``npy`` is a NumPy structured array for ``numpy.load``."""
+    filename = f"temperature-{room or 'all'}.{fmt}"
+    return StreamingResponse(
+        export.stream(ReadSessionLocal, fmt, room, start, end),
+        media_type=export.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": export.content_disposition(filename)},
+    )
+
+@router.get("/rollup", response_model=list[schemas.TemperatureRollupOut])
+async def rollup(
+    resolution: Literal["minute", "hour", "day"] = "hour",
+    room: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    session: AsyncSession = Depends(get_read_session),
+):
+    buckets = await rollups.query(session, resolution, room, start, end)
+    return [
+        schemas.TemperatureRollupOut(
+            room=b.room,
+            resolution=b.resolution,
+            bucket_start=datetime.fromtimestamp(b.bucket_start, timezone.utc),
+            count=b.count,
+            min_c=b.min_c,
+            max_c=b.max_c,
+            mean_c=b.sum_c / b.count,
+        )
+        for b in buckets
+    ]
+
+def _parse_percentiles(raw: str) -> list[float]:
+    try:
+        values = [float(item) for item in raw.split(",") if item.strip()]
+    except ValueError:
+        values = [-1.0]
+    if any(not 0 <= value <= 100 for value in values):
+        raise HTTPException(422, "percentiles must be comma-separated numbers between 0 and 100")
+    return values
+
+@router.get("/stats", response_model=list[schemas.TemperatureStatsOut])
+async def temperature_stats(
+    rooms: str | None = Query(default=None, description="Comma-separated rooms; all rooms when omitted"),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    bucket: Literal["minute", "hour", "day"] | None = None,
+    percentiles: str = Query(default="50,95,99", description="Comma-separated, e.g. 50,95,99.9; empty for none"),
+    session: AsyncSession = Depends(get_read_session),
+):
+    """count/min/max/mean/stddev and percentiles per room, or per room and time bucket."""
+    selected = [r.strip() for r in rooms.split(",") if r.strip()] if rooms else None
+    groups = await stats.compute(session, selected, start, end, bucket, _parse_percentiles(percentiles))
+    return [
+        schemas.TemperatureStatsOut(
+            room=g.room,
+            bucket_start=datetime.fromtimestamp(g.bucket_start, timezone.utc) if g.bucket_start is not None else None,
+            count=g.count,
+            min_c=g.min_c,
+            max_c=g.max_c,
+            mean_c=g.mean_c,
+            stddev_c=g.stddev_c,
+            percentiles={f"p{pct:g}": value for pct, value in g.percentiles.items()},
+        )
+        for g in groups
+    ]
 
 @router.delete("/", response_model=schemas.TemperatureClearResult)
-async def clear(room: str | None = None, session: AsyncSession = Depends(get_session)):
-    deleted = await crud.clear_temperatures(session, room)
-    await session.commit()
+async def clear(room: str | None = None, writer: WriteCoordinator = Depends(get_writer)):
+    deleted = await writer.run(lambda session: crud.clear_temperatures(session, room))
     return schemas.TemperatureClearResult(deleted=deleted)
@@ -0,0 +1,187 @@
+"""Next-due computation for appliances.
+
+Everything the scheduler needs about an appliance's tasks (earliest upcoming incomplete due
+date, last completion, latest due date of any task) is gathered with a single grouped query,
+for one appliance or thousands, and new tasks are written with set-based statements.
+
+Only the next task of each appliance is stored; :func:`project` extends the schedule
+arithmetically for calendar views without writing anything.
+"""
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, Sequence, TypeVar
+
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import cache, changes, models
+
+T = TypeVar("T")
+
+# keeps IN (...) lists and multi-row VALUES well below SQLite's bound-parameter limit
+CHUNK = 500
+
+@dataclass(frozen=True)
+class ScheduleState:
+    appliance_id: int
+    interval_days: int | None
+    created_at: datetime
+    upcoming_due: date | None
+    last_completed_at: datetime | None
+    latest_due: date | None
+
+    def next_due(self) -> date | None:
+        """Due date of the task to create, or None if the appliance is unscheduled or already has one.
+
+        The next due date is strictly after both the latest due date of any task and the last
+        completion, so re-completing quickly never produces duplicate due dates.
+        """
+        if not self.interval_days or self.upcoming_due is not None:
+            return None
+        candidates: list[date] = []
+        if self.last_completed_at:
+            candidates.append(self.last_completed_at.date())
+        if self.latest_due:
+            candidates.append(self.latest_due)
+        if not candidates:
+            candidates.append(self.created_at.date())
+        return max(candidates) + timedelta(days=self.interval_days)
+
+    def occurrences(self, start: date, end: date) -> Iterator[date]:
+        """Due dates in [start, end]: the upcoming task (stored or not yet created), then every interval."""
+        first = self.upcoming_due or self.next_due()
+        if first is None or not self.interval_days:
+            return
+        step = self.interval_days
+        if first < start:
+            # jump straight to the first occurrence inside the window
+            first += timedelta(days=-(-(start - first).days // step) * step)
+        due = first
+        while due <= end:
+            yield due
+            due += timedelta(days=step)
+
+@dataclass
+class RescheduleResult:
+    appliances: int = 0
+    deleted: int = 0
+    created: int = 0
+
+def chunks(items: Sequence[T]) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), CHUNK):
+        yield items[start:start + CHUNK]
+
+def _state_query(today: date):
+    task = models.CleaningTask
+    appliance = models.Appliance
+    stats = models.ApplianceStats
+    return (
+        select(
+            appliance.id,
+            appliance.cleaning_interval_days,
+            appliance.created_at,
+            func.min(case((and_(task.completed == False, task.due_date >= today), task.due_date))),  # noqa: E712
+            # stats also remember completions whose tasks were archived
+            func.coalesce(func.max(stats.last_completed_at), func.max(case((task.completed == True, task.completed_at)))),  # noqa: E712
+            func.max(task.due_date),
+        )
+        .outerjoin(task, task.appliance_id == appliance.id)
+        .outerjoin(stats, stats.appliance_id == appliance.id)
+        .group_by(appliance.id)
+    )
+
+async def load_states(session: AsyncSession, appliance_ids: Sequence[int] | None = None) -> dict[int, ScheduleState]:
+    """Scheduling inputs for the given appliances (all appliances when ``None``)."""
+    today = date.today()
+    stmt = _state_query(today)
+    batches = [stmt] if appliance_ids is None else [
+        stmt.where(models.Appliance.id.in_(chunk)) for chunk in chunks(list(appliance_ids))
+    ]
+    states: dict[int, ScheduleState] = {}
+    for batch in batches:
+        for row in (await session.execute(batch)).all():
+            states[row[0]] = ScheduleState(*row)
+    return states
+
+def project(states: Iterable[ScheduleState], start: date, end: date) -> Iterator[tuple[date, int, bool]]:
+    """Lazily merged ``(due_date, appliance_id, stored)`` occurrences of all appliances, in date order.
+
+    ``stored`` marks the occurrence backed by an existing incomplete task.  Each appliance
+    contributes a generator, so memory is one pending date per appliance however long the window.
+    """
+    def occurrences(state: ScheduleState) -> Iterator[tuple[date, int, bool]]:
+        for due in state.occurrences(start, end):
+            yield due, state.appliance_id, due == state.upcoming_due
+    # (due_date, appliance_id) is unique, so the merge never compares the flag
+    return heapq.merge(*(occurrences(state) for state in states))
+
+def task_payload(task) -> dict:
+    """Task fields as published to stream clients and the change log (ORM object or row)."""
+    return {
+        "id": task.id,
+        "appliance_id": task.appliance_id,
+        "due_date": task.due_date,
+        "completed": task.completed,
+        "completed_at": task.completed_at,
+    }
+
+def record_created(session: AsyncSession, tasks: Iterable) -> None:
+    for task in tasks:
+        changes.record(session, "task.created", task_payload(task), entity_id=task.id)
+
+async def insert_tasks(session: AsyncSession, due: dict[int, date]) -> list:
+    """Create one incomplete task per (appliance_id, due_date) with a multi-row INSERT ... RETURNING per chunk."""
+    task = models.CleaningTask
+    rows = [{"appliance_id": appliance_id, "due_date": due_date, "completed": False} for appliance_id, due_date in due.items()]
+    created = []
+    for start in range(0, len(rows), CHUNK):
+        stmt = insert(task).values(rows[start:start + CHUNK]).returning(
+            task.id, task.appliance_id, task.due_date, task.completed, task.completed_at
+        )
+        created.extend((await session.execute(stmt)).all())
+    record_created(session, created)
+    return created
+
+async def ensure_future_task(session: AsyncSession, appliance: models.Appliance) -> models.CleaningTask | None:
+    """Ensure the appliance has one upcoming incomplete task; returns the task if one was created."""
+    if not appliance.cleaning_interval_days:
+        return None
+    state = (await load_states(session, [appliance.id])).get(appliance.id)
+    due = state.next_due() if state else None
+    if due is None:
+        return None
+    new_task = models.CleaningTask(appliance_id=appliance.id, due_date=due)
+    session.add(new_task)
+    await session.flush()
+    record_created(session, [new_task])
+    return new_task
+
+async def reschedule(session: AsyncSession, appliance_ids: Sequence[int] | None = None) -> RescheduleResult:
+    """Drop every upcoming incomplete task and re-plan the next one for each appliance.
+
+    Overdue and completed tasks are kept, so history and missed chores stay visible.
+    """
+    task = models.CleaningTask
+    today = date.today()
+    result = RescheduleResult()
+    upcoming = delete(task).where(task.completed == False, task.due_date >= today).returning(task.id)  # noqa: E712
+    if appliance_ids is None:
+        deleted = list((await session.execute(upcoming)).scalars())
+    else:
+        ids = sorted(set(appliance_ids))
+        deleted = []
+        for chunk in chunks(ids):
+            deleted.extend((await session.execute(upcoming.where(task.appliance_id.in_(chunk)))).scalars())
+    result.deleted = len(deleted)
+    for task_id in deleted:
+        changes.record(session, "task.deleted", {"id": task_id}, entity_id=task_id)
+    states = await load_states(session, None if appliance_ids is None else ids)
+    result.appliances = len(states)
+    due = {appliance_id: d for appliance_id, state in states.items() if (d := state.next_due()) is not None}
+    result.created = len(await insert_tasks(session, due))
+    if result.deleted or result.created:
+        cache.mark_changed(session)
+    return result
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import date, datetime
+from typing import Any
 
 class ApplianceCreate(BaseModel):
     name: str = Field(min_length=1)
@@ -13,6 +14,23 @@ class ApplianceOut(BaseModel):
     cleaning_interval_days: int | None
     created_at: datetime
 
+class ApplianceOverviewOut(ApplianceOut):
+    next_task_id: int | None
+    next_due_date: date | None = Field(description="Due date of the earliest incomplete task")
+    overdue: bool
+    last_completed_at: datetime | None
+    task_count: int
+    open_task_count: int
+    overdue_task_count: int
+
+class ApplianceStatsOut(BaseModel):
+    appliance_id: int
+    completions: int
+    avg_lateness_days: float | None = Field(description="Mean of completion date minus due date; negative when early")
+    max_lateness_days: int | None
+    last_completed_at: datetime | None
+    archived_tasks: int
+
 class CleaningTaskOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: int
@@ -29,12 +47,41 @@ class CleaningTaskWithApplianceOut(BaseModel):
     completed_at: datetime | None
     appliance: ApplianceOut
 
+class DueTasksPage(BaseModel):
+    items: list[CleaningTaskWithApplianceOut]
+    next_cursor: str | None
+
+class CalendarEntryOut(BaseModel):
+    due_date: date
+    appliance_id: int
+    appliance_name: str
+    scheduled: bool = Field(description="An incomplete task already exists for this date; otherwise projected")
+
 class CleaningTaskComplete(BaseModel):
     completed: bool
 
+class TaskCompletion(BaseModel):
+    task_id: int
+    completed: bool
+
+class BulkTaskCompleteRequest(BaseModel):
+    tasks: list[TaskCompletion] = Field(min_length=1, max_length=10_000)
+
+class BulkTaskCompleteResult(BaseModel):
+    updated: list[CleaningTaskOut]
+    created: list[CleaningTaskOut] = Field(description="Follow-up tasks scheduled for completed chores")
+    missing: list[int] = Field(description="Requested task ids that do not exist")
+
 class TemperatureReadingCreate(BaseModel):
     value_c: float
     room: str | None = Field(default=None, min_length=1)
+    recorded_at: datetime | None = None
+
+class TemperatureReadingQueued(BaseModel):
+    queued: bool = True
+    value_c: float
+    room: str
+    recorded_at: datetime
 
 class TemperatureReadingOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -48,14 +95,99 @@ class DashboardData(BaseModel):
     recent_temps: list[TemperatureReadingOut]
     recent_temps_by_room: dict[str, list[TemperatureReadingOut]]
 
+class ChangeOut(BaseModel):
+    id: int
+    kind: str
+    entity_id: int | None
+    room: str | None
+    created_at: datetime
+    data: dict[str, Any]
+
+class ChangesPage(BaseModel):
+    changes: list[ChangeOut]
+    next: int = Field(description="Pass as ``since`` on the next call")
+    has_more: bool
+    resync_required: bool = Field(description="The cursor is missing, compacted away or unknown: reload everything, then sync from ``next``")
+
 class ApplianceIntervalUpdate(BaseModel):
     cleaning_interval_days: int | None = Field(default=None, ge=1)
 
 class BulkDeleteAppliancesRequest(BaseModel):
     ids: list[int] = Field(min_length=1)
 
+class RescheduleRequest(BaseModel):
+    appliance_ids: list[int] | None = Field(default=None, description="Only these appliances; all when omitted")
+
+class RescheduleResult(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    appliances: int
+    deleted: int
+    created: int
+
+class BulkUpsertAppliancesResult(BaseModel):
+    created: int
+    updated: int
+    scheduled: int
+
 class BulkDeleteAppliancesResult(BaseModel):
     deleted: int
 
 class TemperatureClearResult(BaseModel):
     deleted: int
+
+class TemperatureBatchResult(BaseModel):
+    inserted: int
+    chunks: int
+
+class TemperatureRollupOut(BaseModel):
+    room: str
+    resolution: str
+    bucket_start: datetime
+    count: int
+    min_c: float
+    max_c: float
+    mean_c: float
+
+class TemperatureStatsOut(BaseModel):
+    room: str
+    bucket_start: datetime | None = Field(description="Start of the bucket (UTC); null when not bucketed")
+    count: int
+    min_c: float
+    max_c: float
+    mean_c: float
+    stddev_c: float = Field(description="Population standard deviation")
+    percentiles: dict[str, float] = Field(description='Keyed like "p50", "p95"')
+
+class StartupReportOut(BaseModel):
+    import_ms: float
+    phases_ms: dict[str, float]
+    migrations_applied: list[int]
+    schema_version: int
+    seeded: bool
+    ready_ms: float | None
+
+class RetentionPolicyOut(BaseModel):
+    enabled: bool
+    default_days: int | None
+    room_days: dict[str, int]
+    interval_s: float
+    batch_size: int
+    minute_rollup_days: int | None
+    task_archive_days: int | None
+    change_log_hours: float | None
+
+class RetentionStatusOut(BaseModel):
+    policy: RetentionPolicyOut
+    runs: int
+    running: bool
+    last_started_at: datetime | None
+    last_duration_ms: float | None
+    last_rows_purged: int
+    last_rows_purged_by_room: dict[str, int]
+    last_rollups_purged: int
+    last_tasks_archived: int
+    last_changes_compacted: int
+    last_pages_vacuumed: int
+    total_rows_purged: int
+    total_duration_ms: float
+    last_error: str | None
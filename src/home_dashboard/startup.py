@@ -0,0 +1,49 @@
+"""Boot timing: how long import, engine creation, migrations and seeding took.
+
+The lifespan fills a :class:`StartupReport`, logs a one-line summary and keeps it on
+``app.state.startup`` for ``GET /api/admin/startup``.  ``ready_ms`` runs from the start of the
+package import to the moment the app can serve its first request.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from . import IMPORT_STARTED
+
+logger = logging.getLogger(__name__)
+
+def _ms_since(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 3)
+
+@dataclass
+class StartupReport:
+    import_ms: float
+    phases_ms: dict[str, float] = field(default_factory=dict)
+    migrations_applied: list[int] = field(default_factory=list)
+    schema_version: int = 0
+    seeded: bool = False
+    ready_ms: float | None = None
+
+    @classmethod
+    def begin(cls, imported_at: float) -> StartupReport:
+        return cls(import_ms=round((imported_at - IMPORT_STARTED) * 1000, 3))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases_ms[name] = _ms_since(started)
+
+    def ready(self) -> None:
+        self.ready_ms = _ms_since(IMPORT_STARTED)
+        phases = ", ".join(f"{name} {ms:.1f}ms" for name, ms in self.phases_ms.items())
+        logger.info(
+            "ready in %.1fms (import %.1fms, %s; schema v%d, %d migrations applied)",
+            self.ready_ms, self.import_ms, phases, self.schema_version, len(self.migrations_applied),
+        )
@@ -0,0 +1,106 @@
+"""Per-room (and optionally per-bucket) temperature statistics computed server-side.
+
+count/min/max/mean and the sum of squares for the standard deviation come from one grouped
+SQL aggregate.  Percentiles need the value distribution, so a second query streams only the
+``value_c`` column ordered by (room, bucket, value); each group lands already sorted in a
+compact ``array('d')`` and every percentile is a constant-time interpolation on it.  Only
+one group's values are held in memory at a time.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import Integer, cast, func, null, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, models, rollups
+
+DEFAULT_PERCENTILES = (50.0, 95.0, 99.0)
+STREAM_CHUNK_ROWS = 10_000
+
+@dataclass
+class GroupStats:
+    room: str
+    bucket_start: int | None
+    count: int
+    min_c: float
+    max_c: float
+    mean_c: float
+    stddev_c: float
+    percentiles: dict[float, float] = field(default_factory=dict)
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Linear interpolation between closest ranks (NumPy's default method)."""
+    rank = pct / 100 * (len(sorted_values) - 1)
+    lo = math.floor(rank)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (rank - lo)
+
+def _bucket_expr(bucket: str | None):
+    if bucket is None:
+        return null()
+    step = rollups.RESOLUTIONS[bucket]
+    epoch = cast(func.strftime("%s", models.TemperatureReading.recorded_at), Integer)
+    return (epoch // step) * step
+
+async def compute(
+    session: AsyncSession,
+    rooms: Sequence[str] | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    bucket: str | None = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+) -> list[GroupStats]:
+    reading = models.TemperatureReading
+    filters = crud.temperature_filters(None, start, end)
+    if rooms:
+        filters.append(reading.room.in_(rooms))
+    bucket_col = _bucket_expr(bucket).label("bucket")
+    aggregate = (
+        select(
+            reading.room,
+            bucket_col,
+            func.count(),
+            func.min(reading.value_c),
+            func.max(reading.value_c),
+            func.avg(reading.value_c),
+            func.avg(reading.value_c * reading.value_c),
+        )
+        .where(*filters)
+        .group_by(reading.room, bucket_col)
+        .order_by(reading.room, bucket_col)
+    )
+    groups: dict[tuple[str, int | None], GroupStats] = {}
+    for room, bucket_start, count, min_c, max_c, mean_c, mean_sq in (await session.execute(aggregate)).all():
+        # population variance; clamp tiny negative results of floating point cancellation
+        stddev = math.sqrt(max(mean_sq - mean_c * mean_c, 0.0))
+        groups[(room, bucket_start)] = GroupStats(room, bucket_start, count, min_c, max_c, mean_c, stddev)
+    if not percentiles or not groups:
+        return list(groups.values())
+
+    values_stmt = (
+        select(reading.room, bucket_col, reading.value_c)
+        .where(*filters)
+        .order_by(reading.room, bucket_col, reading.value_c)
+    )
+    current: tuple[str, int | None] | None = None
+    values = array("d")
+
+    def finish() -> None:
+        if current is not None and values:
+            groups[current].percentiles = {pct: percentile(values, pct) for pct in percentiles}
+
+    result = await session.stream(values_stmt, execution_options={"yield_per": STREAM_CHUNK_ROWS})
+    async for rows in result.partitions():
+        for room, bucket_start, value in rows:
+            key = (room, bucket_start)
+            if key != current:
+                finish()
+                current, values = key, array("d")
+            values.append(value)
+    finish()
+    return list(groups.values())
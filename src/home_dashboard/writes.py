@@ -0,0 +1,145 @@
+"""Write coordination for SQLite shared by several worker processes.
+
+Routers hand their mutations to :meth:`WriteCoordinator.run` instead of committing a
+request-scoped session themselves.  Every write transaction starts with ``BEGIN IMMEDIATE``,
+so the database write lock is taken up front (waiting up to ``busy_timeout``) rather than
+on a deferred read-to-write upgrade, which SQLite fails immediately with ``SQLITE_BUSY``.
+If the lock still cannot be had, the whole operation is rolled back and retried after a
+jittered exponential backoff.
+
+With ``HOME_DASHBOARD_WRITE_MODE=queue`` mutations are additionally funneled through one
+writer task per process, so a worker's requests never contend with each other for the lock
+and only whole processes take turns.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+from fastapi import Request
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+WRITE_MODES = ("direct", "queue")
+_STOP = object()
+
+def is_busy_error(exc: BaseException) -> bool:
+    message = str(getattr(exc, "orig", None) or exc).lower()
+    return "database is locked" in message or "busy" in message
+
+@dataclass
+class WriteSettings:
+    mode: str = "direct"
+    retries: int = 5
+    backoff_ms: float = 20.0
+    backoff_max_ms: float = 1000.0
+    max_queue: int = 1000
+
+    @classmethod
+    def from_env(cls) -> WriteSettings:
+        mode = os.getenv("HOME_DASHBOARD_WRITE_MODE", "direct").lower()
+        if mode not in WRITE_MODES:
+            raise ValueError(f"HOME_DASHBOARD_WRITE_MODE must be one of {WRITE_MODES}, got {mode!r}")
+        return cls(
+            mode=mode,
+            retries=int(os.getenv("HOME_DASHBOARD_WRITE_RETRIES", "5")),
+            backoff_ms=float(os.getenv("HOME_DASHBOARD_WRITE_BACKOFF_MS", "20")),
+            backoff_max_ms=float(os.getenv("HOME_DASHBOARD_WRITE_BACKOFF_MAX_MS", "1000")),
+            max_queue=int(os.getenv("HOME_DASHBOARD_WRITE_QUEUE_MAX", "1000")),
+        )
+
+class WriteCoordinator:
+    def __init__(self, session_factory: Callable[[], AsyncSession], settings: WriteSettings | None = None):
+        self.session_factory = session_factory
+        self.settings = settings or WriteSettings()
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self.commits = 0
+        self.busy_retries = 0
+        self.busy_failures = 0
+        self.backoff_s = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def run(self, op: Callable[[AsyncSession], Awaitable[T]], retries: int | None = None) -> T:
+        """Run ``op(session)`` in its own write transaction and commit it.
+
+        ``op`` may run more than once, so it must not consume anything it cannot re-read;
+        pass ``retries=0`` for operations that stream the request body.
+        """
+        if self.settings.mode == "queue":
+            return await self._submit(op, retries)
+        return await self._execute(op, retries)
+
+    async def _execute(self, op: Callable[[AsyncSession], Awaitable[T]], retries: int | None) -> T:
+        max_retries = self.settings.retries if retries is None else retries
+        attempt = 0
+        while True:
+            async with self.session_factory() as session:
+                try:
+                    conn = await session.connection()
+                    await conn.exec_driver_sql("BEGIN IMMEDIATE")
+                    result = await op(session)
+                    await session.commit()
+                    self.commits += 1
+                    return result
+                except OperationalError as exc:
+                    await session.rollback()
+                    if not is_busy_error(exc) or attempt >= max_retries:
+                        if is_busy_error(exc):
+                            self.busy_failures += 1
+                        raise
+            delay = self._backoff(attempt)
+            attempt += 1
+            self.busy_retries += 1
+            self.backoff_s += delay
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter keeps workers that collided once from colliding again in lockstep
+        ceiling = min(self.settings.backoff_max_ms, self.settings.backoff_ms * 2**attempt)
+        return random.uniform(0, ceiling) / 1000
+
+    async def _submit(self, op: Callable[[AsyncSession], Awaitable[T]], retries: int | None) -> T:
+        if self._task is None:
+            self._queue = asyncio.Queue(self.settings.max_queue)
+            self._task = asyncio.create_task(self._writer())
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, retries, future))  # type: ignore[union-attr]
+        return await future
+
+    async def _writer(self) -> None:
+        assert self._queue is not None
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            op, retries, future = item
+            if future.cancelled():
+                continue
+            try:
+                result = await self._execute(op, retries)
+            except Exception as exc:  # handed to the waiting request
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def stop(self) -> None:
+        if self._task is None or self._queue is None:
+            return
+        # queued mutations finish before the sentinel is reached
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+def get_writer(request: Request) -> WriteCoordinator:
+    """Dependency returning the app's coordinator (set up in ``create_app``)."""
+    return request.app.state.writer
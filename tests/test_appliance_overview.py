@@ -0,0 +1,53 @@
+import uuid
+import pytest
+from datetime import date, timedelta
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from home_dashboard import models
+from home_dashboard.db import get_read_engine, init_db, new_session
+from home_dashboard.main import create_app
+
+@pytest.mark.asyncio
+async def test_overview_summarizes_tasks_in_one_query():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        # fresh names each run: the test database outlives the test
+        name = f'Overview Filter {uuid.uuid4().hex[:8]}'
+        scheduled = (await client.post('/api/appliances/', json={'name': name, 'cleaning_interval_days': 10})).json()
+        unscheduled = (await client.post('/api/appliances/', json={'name': f'Overview Vase {uuid.uuid4().hex[:8]}', 'cleaning_interval_days': None})).json()
+        async with new_session() as session:
+            # an overdue chore and a completed one next to the scheduled task
+            overdue = models.CleaningTask(appliance_id=scheduled['id'], due_date=date.today() - timedelta(days=3))
+            session.add_all([overdue, models.CleaningTask(appliance_id=scheduled['id'], due_date=date.today() - timedelta(days=20), completed=True)])
+            await session.commit()
+            overdue_id = overdue.id
+
+        statements = []
+
+        def listener(*args):
+            statements.append(args[2])
+        event.listen(get_read_engine().sync_engine, "before_cursor_execute", listener)
+        try:
+            r = await client.get('/api/appliances/overview')
+        finally:
+            event.remove(get_read_engine().sync_engine, "before_cursor_execute", listener)
+        assert r.status_code == 200
+        assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+        by_id = {a['id']: a for a in r.json()}
+        s = by_id[scheduled['id']]
+        assert s['name'] == name and s['overdue'] is True
+        assert s['next_task_id'] == overdue_id and s['next_due_date'] == (date.today() - timedelta(days=3)).isoformat()
+        assert (s['task_count'], s['open_task_count'], s['overdue_task_count']) == (3, 2, 1)
+        u = by_id[unscheduled['id']]
+        assert (u['task_count'], u['overdue'], u['next_task_id'], u['last_completed_at']) == (0, False, None, None)
+
+        page = await client.get('/api/appliances/overview', params={'limit': 1})
+        assert len(page.json()) == 1 and 'X-Next-Cursor' in page.headers
+
+@pytest.mark.asyncio
+async def test_tasks_for_unknown_appliance_is_404():
+    transport = ASGITransport(app=create_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get('/api/appliances/999999/tasks')).status_code == 404
@@ -0,0 +1,71 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import create_engine, select
+from home_dashboard import archive, migrations, models
+from home_dashboard.db import init_db, new_session
+from home_dashboard.main import create_app
+
+@pytest.mark.asyncio
+async def test_stats_follow_completions_reopen_and_archive():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        appliance = (await client.post('/api/appliances/', json={'name': 'Stats Hood', 'cleaning_interval_days': 7})).json()
+        assert (await client.get(f"/api/appliances/{appliance['id']}/stats")).json()['completions'] == 0
+        async with new_session() as session:
+            late = models.CleaningTask(appliance_id=appliance['id'], due_date=date.today() - timedelta(days=4))
+            session.add(late)
+            await session.commit()
+            late_id = late.id
+        first = (await client.get(f"/api/appliances/{appliance['id']}/tasks")).json()
+        upcoming = next(t for t in first if t['id'] != late_id)
+
+        await client.patch(f'/api/tasks/{late_id}', json={'completed': True})
+        await client.patch('/api/tasks/bulk', json={'tasks': [{'task_id': upcoming['id'], 'completed': True}]})
+        stats = (await client.get(f"/api/appliances/{appliance['id']}/stats")).json()
+        early = (date.today() - date.fromisoformat(upcoming['due_date'])).days
+        assert stats['completions'] == 2 and stats['max_lateness_days'] == 4
+        assert stats['avg_lateness_days'] == (4 + early) / 2 and stats['last_completed_at']
+
+        # completing twice counts once; reopening recounts from the rows
+        await client.patch(f'/api/tasks/{late_id}', json={'completed': True})
+        assert (await client.get(f"/api/appliances/{appliance['id']}/stats")).json()['completions'] == 2
+        await client.patch(f'/api/tasks/{late_id}', json={'completed': False})
+        stats = (await client.get(f"/api/appliances/{appliance['id']}/stats")).json()
+        assert (stats['completions'], stats['max_lateness_days']) == (1, early)
+        await client.patch(f'/api/tasks/{late_id}', json={'completed': True})
+
+        async with new_session() as session:
+            moved = await archive.archive_completed(session, datetime.now(timezone.utc) + timedelta(minutes=1), limit=100)
+            await session.commit()
+            left = (await session.execute(select(models.CleaningTask.id).where(
+                models.CleaningTask.appliance_id == appliance['id'], models.CleaningTask.completed == True))).all()  # noqa: E712
+        assert moved >= 2 and left == []
+        stats = (await client.get(f"/api/appliances/{appliance['id']}/stats")).json()
+        assert stats['completions'] == 2 and stats['archived_tasks'] == 2
+        # the next task is still planned from the (now archived) last completion
+        tasks = (await client.get(f"/api/appliances/{appliance['id']}/tasks")).json()
+        assert [t['completed'] for t in tasks] == [False]
+
+        assert (await client.get('/api/appliances/999999/stats')).status_code == 404
+        await client.post('/api/appliances/bulk-delete', json={'ids': [appliance['id']]})
+        async with new_session() as session:
+            assert await session.get(models.ApplianceStats, appliance['id']) is None
+
+def test_migration_backfills_stats_from_existing_tasks():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        for migration in migrations.MIGRATIONS[:3]:
+            migration.apply(conn)
+        conn.exec_driver_sql("DROP TABLE appliance_stats")
+        conn.exec_driver_sql("INSERT INTO appliances (id, name, created_at) VALUES (1, 'Old', '2024-01-01 00:00:00')")
+        conn.exec_driver_sql(
+            "INSERT INTO cleaning_tasks (appliance_id, due_date, completed, completed_at) VALUES "
+            "(1, '2024-01-10', 1, '2024-01-12 08:00:00'), (1, '2024-01-20', 1, '2024-01-19 08:00:00'), (1, '2024-01-30', 0, NULL)"
+        )
+        migrations.MIGRATIONS[3].apply(conn)
+        row = conn.execute(select(models.ApplianceStats)).one()
+    assert (row.completions, row.total_lateness_days, row.max_lateness_days, row.archived_tasks) == (2, 1, 2, 0)
+    assert row.last_completed_at == datetime(2024, 1, 19, 8)
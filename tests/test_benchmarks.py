@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.run import compare
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def test_benchmark_suite_smoke(tmp_path):
+    output = tmp_path / "results.json"
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    args = [
+        sys.executable, "-m", "benchmarks.run", "--db", str(tmp_path / "bench.db"),
+        "--appliances", "20", "--tasks-per-appliance", "5", "--readings", "500", "--rooms", "3",
+        "--iterations", "2", "--warmup", "0", "--output", str(output),
+    ]
+    subprocess.run(args, cwd=ROOT, env=env, check=True, capture_output=True)
+    report = json.loads(output.read_text())
+    assert report["meta"]["dataset"]["appliances"] == 20
+    dashboard = report["results"]["GET /api/dashboard[uncached]"]
+    assert dashboard["iterations"] == 2 and dashboard["queries"] >= 1
+    # the dataset is reused and comparing a run with itself never flags a regression
+    rerun = subprocess.run(args[:-2] + ["--only", "crud.", "--baseline", str(output), "--threshold", "100"], cwd=ROOT, env=env, capture_output=True)
+    assert rerun.returncode == 0, rerun.stderr
+    assert b"generated" not in rerun.stderr
+
+def test_compare_flags_slowdowns_and_extra_queries():
+    meta = {"dataset": {"appliances": 1}}
+    baseline = {"meta": meta, "results": {"a": {"p50_ms": 10.0, "queries": 1.0}, "b": {"p50_ms": 10.0, "queries": 1.0}}}
+    current = {"meta": meta, "results": {"a": {"p50_ms": 11.0, "queries": 1.0}, "b": {"p50_ms": 30.0, "queries": 3.0}}}
+    regressions = compare(current, baseline, threshold=0.2)
+    assert len(regressions) == 2 and all(line.startswith("b:") for line in regressions)
@@ -0,0 +1,51 @@
+import uuid
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from home_dashboard.db import get_engine, init_db
+from home_dashboard.main import create_app
+
+@pytest.mark.asyncio
+async def test_bulk_completion_schedules_follow_ups_in_constant_queries():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        # fresh names each run: the test database outlives the test
+        run = uuid.uuid4().hex[:8]
+        first_tasks = []
+        for i in range(4):
+            r = await client.post('/api/appliances/', json={'name': f'BulkDone-{run}-{i}', 'cleaning_interval_days': 3 + i})
+            tasks = (await client.get(f"/api/appliances/{r.json()['id']}/tasks")).json()
+            first_tasks.append(tasks[0])
+
+        statements = []
+
+        def listener(*args):
+            statements.append(args[2])
+        event.listen(get_engine().sync_engine, "before_cursor_execute", listener)
+        try:
+            body = {'tasks': [{'task_id': t['id'], 'completed': True} for t in first_tasks] + [{'task_id': 999999, 'completed': True}]}
+            r = await client.patch('/api/tasks/bulk', json=body)
+        finally:
+            event.remove(get_engine().sync_engine, "before_cursor_execute", listener)
+        assert r.status_code == 200
+        result = r.json()
+        # BEGIN, load tasks, stats upsert, UPDATE (executemany), scheduling state, INSERT ... RETURNING, change log
+        assert len(statements) <= 7, statements
+        assert result['missing'] == [999999]
+        assert {t['id'] for t in result['updated']} == {t['id'] for t in first_tasks}
+        assert all(t['completed'] and t['completed_at'] for t in result['updated'])
+        first_due = {t['appliance_id']: t['due_date'] for t in first_tasks}
+        assert sorted(t['appliance_id'] for t in result['created']) == sorted(first_due)
+        assert all(t['due_date'] > first_due[t['appliance_id']] and not t['completed'] for t in result['created'])
+
+        # completing again adds nothing: every appliance already has an upcoming task
+        again = (await client.patch('/api/tasks/bulk', json=body)).json()
+        assert again['created'] == []
+
+        # reopening clears the completion time
+        reopened = (await client.patch('/api/tasks/bulk', json={'tasks': [{'task_id': first_tasks[0]['id'], 'completed': False}]})).json()
+        assert reopened['updated'][0]['completed_at'] is None
+
+        assert (await client.patch('/api/tasks/bulk', json={'tasks': []})).status_code == 422
@@ -0,0 +1,44 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_json_and_csv():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        items = [{"name": f"Imported {i}", "cleaning_interval_days": 10} for i in range(1100)]
+        items.append({"name": "Imported Unscheduled"})
+        resp = await client.post("/api/appliances/bulk", json=items)
+        assert resp.status_code == 200
+        assert resp.json() == {"created": 1101, "updated": 0, "scheduled": 1100}
+
+        head = (await client.get("/api/changes")).json()["next"]
+        # only Imported 0 changes: a blank or identical interval is not an update
+        csv_body = "name,cleaning_interval_days\nImported 0,20\nImported 1,\nImported 2,10\nImported CSV,3\n"
+        resp = await client.post("/api/appliances/bulk", content=csv_body, headers={"content-type": "text/csv"})
+        assert resp.status_code == 200
+        assert resp.json() == {"created": 1, "updated": 1, "scheduled": 1}
+        logged = (await client.get("/api/changes", params={"since": head})).json()["changes"]
+        assert sorted((c["kind"], c["data"]["name"]) for c in logged if c["kind"].startswith("appliance.")) == [
+            ("appliance.created", "Imported CSV"), ("appliance.updated", "Imported 0"),
+        ]
+
+        listing = {a["name"]: a for a in (await client.get("/api/appliances/")).json()}
+        assert listing["Imported 0"]["cleaning_interval_days"] == 20
+        assert listing["Imported 1"]["cleaning_interval_days"] == 10  # blank keeps the interval
+        tasks = (await client.get(f"/api/appliances/{listing['Imported CSV']['id']}/tasks")).json()
+        assert len(tasks) == 1 and not tasks[0]["completed"]
+
+        bad = await client.post("/api/appliances/bulk", content="name,cleaning_interval_days\n,5\n", headers={"content-type": "text/csv"})
+        assert bad.status_code == 422
+
+        ids = [a["id"] for name, a in listing.items() if name.startswith("Imported")]
+        deleted = await client.post("/api/appliances/bulk-delete", json={"ids": ids + [10**9]})
+        assert deleted.json() == {"deleted": len(ids)}
+        remaining = {a["name"] for a in (await client.get("/api/appliances/")).json()}
+        assert not any(name.startswith("Imported") for name in remaining)
+        orphaned = await client.get(f"/api/appliances/{listing['Imported CSV']['id']}/tasks")
+        assert orphaned.status_code == 404
@@ -0,0 +1,60 @@
+import pytest
+from datetime import date, timedelta
+from httpx import AsyncClient, ASGITransport
+from home_dashboard import scheduling
+from home_dashboard.db import init_db
+from home_dashboard.main import create_app
+
+def test_projection_merges_appliances_in_date_order():
+    today = date(2030, 1, 1)
+    weekly = scheduling.ScheduleState(1, 7, None, today + timedelta(days=2), None, today + timedelta(days=2))
+    # no upcoming task: projected from the last completion
+    fortnightly = scheduling.ScheduleState(2, 14, None, None, None, today - timedelta(days=10))
+    unscheduled = scheduling.ScheduleState(3, None, None, None, None, None)
+    entries = list(scheduling.project([weekly, fortnightly, unscheduled], today, today + timedelta(days=20)))
+    assert entries == [
+        (today + timedelta(days=2), 1, True),
+        (today + timedelta(days=4), 2, False),
+        (today + timedelta(days=9), 1, False),
+        (today + timedelta(days=16), 1, False),
+        (today + timedelta(days=18), 2, False),
+    ]
+    # a window starting later jumps straight to it
+    later = list(scheduling.project([weekly], today + timedelta(days=365), today + timedelta(days=372)))
+    assert later == [(today + timedelta(days=366), 1, False)]
+
+@pytest.mark.asyncio
+async def test_calendar_endpoint_pages_without_writing_tasks():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        appliance = (await client.post('/api/appliances/', json={'name': 'Calendar Dryer', 'cleaning_interval_days': 30})).json()
+        tasks_before = (await client.get(f"/api/appliances/{appliance['id']}/tasks")).json()
+        end = date.today() + timedelta(days=365)
+        r = await client.get('/api/calendar', params={'end': end.isoformat(), 'appliance_id': appliance['id']})
+        assert r.status_code == 200
+        mine = r.json()
+        assert {e['appliance_id'] for e in mine} == {appliance['id']}
+        assert len(mine) >= 12 and mine[0]['scheduled'] and not any(e['scheduled'] for e in mine[1:])
+        assert mine[0]['due_date'] == tasks_before[0]['due_date'] and mine[0]['appliance_name'] == 'Calendar Dryer'
+        assert (await client.get(f"/api/appliances/{appliance['id']}/tasks")).json() == tasks_before
+
+        # walking the pages yields the same entries
+        paged, cursor = [], None
+        while True:
+            params = {'end': end.isoformat(), 'appliance_id': appliance['id'], 'limit': 5, **({'cursor': cursor} if cursor else {})}
+            page = await client.get('/api/calendar', params=params)
+            paged += page.json()
+            cursor = page.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+        assert paged == mine
+
+        # unfiltered, every appliance is merged in date order
+        everyone = (await client.get('/api/calendar', params={'end': mine[0]['due_date'], 'limit': 10_000})).json()
+        keys = [(e['due_date'], e['appliance_id']) for e in everyone]
+        assert keys == sorted(keys) and (mine[0]['due_date'], appliance['id']) in keys
+
+        assert (await client.get('/api/calendar', params={'appliance_id': 999999})).status_code == 404
+        assert (await client.get('/api/calendar', params={'start': '2030-01-02', 'end': '2030-01-01'})).status_code == 422
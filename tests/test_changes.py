@@ -0,0 +1,68 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from httpx import AsyncClient, ASGITransport
+from home_dashboard import changes, crud
+from home_dashboard.db import init_db, new_session
+from home_dashboard.main import create_app
+
+@pytest.mark.asyncio
+async def test_change_feed_returns_only_new_changes_and_signals_resync():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        start = (await client.get('/api/changes')).json()
+        assert start['resync_required'] and start['changes'] == []
+        head = start['next']
+        assert (await client.get('/api/changes', params={'since': head})).json() == {
+            'changes': [], 'next': head, 'has_more': False, 'resync_required': False,
+        }
+
+        appliance = (await client.post('/api/appliances/', json={'name': 'Feed Oven', 'cleaning_interval_days': 4})).json()
+        task = (await client.get(f"/api/appliances/{appliance['id']}/tasks")).json()[0]
+        await client.patch(f"/api/tasks/{task['id']}", json={'completed': True})
+        await client.post('/api/temperature/', json={'value_c': 19.5, 'room': 'feed-room'})
+        await client.post('/api/temperature/batch', json=[{'value_c': 20.0 + i, 'room': 'feed-room'} for i in range(3)])
+        await client.delete('/api/temperature/', params={'room': 'feed-room'})
+        await client.post('/api/appliances/bulk-delete', json={'ids': [appliance['id']]})
+
+        feed = (await client.get('/api/changes', params={'since': head})).json()
+        assert not feed['resync_required'] and not feed['has_more']
+        assert [c['kind'] for c in feed['changes']] == [
+            'appliance.created', 'task.created', 'task.updated', 'task.created',
+            'temperature.added', 'temperature.batch', 'temperature.cleared', 'appliance.deleted',
+        ]
+        ids = [c['id'] for c in feed['changes']]
+        assert ids == sorted(ids) and feed['next'] == ids[-1]
+        created, _, updated = feed['changes'][:3]
+        assert created['entity_id'] == appliance['id'] and created['data']['name'] == 'Feed Oven'
+        assert updated['data']['completed'] is True and updated['data']['id'] == task['id']
+        assert feed['changes'][5]['data']['count'] == 3 and feed['changes'][5]['room'] == 'feed-room'
+
+        page = (await client.get('/api/changes', params={'since': head, 'limit': 3})).json()
+        assert page['has_more'] and [c['id'] for c in page['changes']] == ids[:3]
+        rest = (await client.get('/api/changes', params={'since': page['next']})).json()
+        assert [c['id'] for c in rest['changes']] == ids[3:]
+
+        # nothing is logged for a rolled back write
+        async def failing(session):
+            await crud.create_appliance(session, 'Feed Ghost', 3)
+            raise RuntimeError("boom")
+        with pytest.raises(RuntimeError):
+            await app.state.writer.run(failing)
+        assert (await client.get('/api/changes', params={'since': feed['next']})).json()['changes'] == []
+
+        # a cursor from before compaction (or from the future) must resync
+        async with new_session() as session:
+            assert await changes.compact(session, datetime.now(timezone.utc) + timedelta(minutes=1)) >= len(ids)
+            await session.commit()
+        stale = (await client.get('/api/changes', params={'since': head})).json()
+        assert stale['resync_required'] and stale['next'] >= feed['next']
+        assert not (await client.get('/api/changes', params={'since': stale['next']})).json()['resync_required']
+        assert (await client.get('/api/changes', params={'since': stale['next'] + 1000})).json()['resync_required']
+
+        # ids keep growing after the log was emptied
+        await client.post('/api/temperature/', json={'value_c': 18.0, 'room': 'feed-room'})
+        after = (await client.get('/api/changes', params={'since': stale['next']})).json()
+        assert [c['kind'] for c in after['changes']] == ['temperature.added'] and after['next'] > feed['next']
+        await client.delete('/api/temperature/', params={'room': 'feed-room'})
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from home_dashboard import cache, models
+from home_dashboard.main import create_app
+from home_dashboard.db import database_url, init_db
+
+@pytest.mark.asyncio
+async def test_dashboard_etag_revalidation():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.get('/api/dashboard')
+        assert first.status_code == 200
+        etag = first.headers['etag']
+        assert etag.startswith('"') and not etag.startswith('W/')
+
+        unchanged = await client.get('/api/dashboard', headers={'If-None-Match': etag})
+        assert unchanged.status_code == 304
+        assert unchanged.content == b''
+
+        # a committed write invalidates the cached payload
+        await client.post('/api/temperature/', json={'value_c': 23.0, 'room': 'etag-room'})
+        changed = await client.get('/api/dashboard', headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['etag'] != etag
+        assert 'etag-room' in changed.json()['recent_temps_by_room']
+
+        again = await client.get('/api/dashboard')
+        assert again.content == changed.content
+        assert app.state.dashboard_cache.hits >= 1
+
+        # a different query shape gets its own tag
+        per_room = await client.get('/api/dashboard', params={'per_room_limit': 5})
+        assert per_room.headers['etag'] != again.headers['etag']
+        await client.delete('/api/temperature/?room=etag-room')
+
+@pytest.mark.asyncio
+async def test_etag_sees_writes_from_other_processes():
+    app = create_app()
+    await init_db()
+    # another worker: its own engine, and no Session commit in this process to bump the local version
+    other = create_async_engine(database_url())
+    transport = ASGITransport(app=app)
+    try:
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            etag = (await client.get('/api/dashboard')).headers['etag']
+            version = cache.data_version()
+            async with other.begin() as conn:
+                await conn.execute(insert(models.TemperatureReading).values(value_c=19.0, room='etag-other'))
+                await conn.execute(insert(models.ChangeLogEntry).values(
+                    kind='temperature.added', room='etag-other', data='{}', created_at=datetime.now(timezone.utc)
+                ))
+            assert cache.data_version() == version
+            changed = await client.get('/api/dashboard', headers={'If-None-Match': etag})
+            assert changed.status_code == 200 and changed.headers['etag'] != etag
+            await client.delete('/api/temperature/?room=etag-other')
+    finally:
+        await other.dispose()
@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from home_dashboard import db
+from home_dashboard.db import init_db, EngineProfile, _pragmas
+
+def test_production_profile_pragmas():
+    stmts = _pragmas(db.PROFILES["production"], read_only=False)
+    assert "PRAGMA journal_mode=WAL" in stmts
+    assert "PRAGMA synchronous=NORMAL" in stmts
+    read_stmts = _pragmas(db.PROFILES["production"], read_only=True)
+    assert "PRAGMA query_only=ON" in read_stmts
+    assert not any("journal_mode" in s for s in read_stmts)
+    assert _pragmas(EngineProfile("bare"), read_only=False) == []
+
+@pytest.mark.asyncio
+async def test_read_session_is_query_only():
+    await init_db()
+    if db.get_read_engine() is db.get_engine():
+        pytest.skip("in-memory database shares one engine")
+    async with db.ReadSessionLocal() as session:
+        count = await session.execute(text("SELECT count(*) FROM appliances"))
+        assert count.scalar_one() >= 0
+        with pytest.raises(OperationalError):
+            await session.execute(text("DELETE FROM app_meta WHERE key = '__never__'"))
+    if db.profile.journal_mode:
+        async with db.get_engine().connect() as conn:
+            mode = (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar_one()
+            assert mode.lower() == db.profile.journal_mode.lower()
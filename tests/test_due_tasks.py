@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+import pytest
+from httpx import AsyncClient, ASGITransport
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+
+@pytest.mark.asyncio
+async def test_due_tasks_horizon_and_pagination():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for name in ["DuePager1", "DuePager2", "DuePager3"]:
+            await client.post("/api/appliances/", json={"name": name, "cleaning_interval_days": 3})
+        # today + 3 is outside the default 2 day horizon
+        default = await client.get("/api/tasks/due")
+        assert not any(t["appliance"]["name"].startswith("DuePager") for t in default.json()["items"])
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"horizon_days": 3, "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            page = (await client.get("/api/tasks/due", params=params)).json()
+            assert len(page["items"]) <= 2
+            seen.extend(page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        names = [t["appliance"]["name"] for t in seen if t["appliance"]["name"].startswith("DuePager")]
+        assert sorted(names) == ["DuePager1", "DuePager2", "DuePager3"]
+        keys = [(t["due_date"], t["id"]) for t in seen]
+        assert keys == sorted(keys) and len(set(keys)) == len(keys)
+        horizon = str(date.today() + timedelta(days=3))
+        assert all(t["due_date"] <= horizon for t in seen)
+
+        bad = await client.get("/api/tasks/due", params={"cursor": "not-a-cursor"})
+        assert bad.status_code == 400
@@ -0,0 +1,35 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from pydantic import TypeAdapter
+from home_dashboard import schemas
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+
+@pytest.mark.asyncio
+async def test_pre_rendered_payloads_match_response_models():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        created = (await client.post("/api/appliances/", json={"name": "FastPathProbe", "cleaning_interval_days": 1})).json()
+        await client.post("/api/temperature/", json={"value_c": 20.25, "room": "FastPathRoom"})
+
+        # re-serializing through the documented schemas must reproduce the bytes exactly
+        checks = [
+            ("/api/dashboard", schemas.DashboardData),
+            ("/api/tasks/due", schemas.DueTasksPage),
+            ("/api/appliances/", list[schemas.ApplianceOut]),
+            (f"/api/appliances/{created['id']}/tasks", list[schemas.CleaningTaskOut]),
+            ("/api/temperature/", list[schemas.TemperatureReadingOut]),
+            ("/api/temperature/?per_room_limit=5", list[schemas.TemperatureReadingOut]),
+        ]
+        for url, model in checks:
+            resp = await client.get(url)
+            assert resp.status_code == 200 and resp.headers["content-type"] == "application/json"
+            adapter = TypeAdapter(model)
+            assert adapter.dump_json(adapter.validate_json(resp.content)) == resp.content, url
+
+        dashboard = (await client.get("/api/dashboard")).json()
+        assert any(t["appliance"]["name"] == "FastPathProbe" for t in dashboard["due_tasks"])
+        flat = [r for r in dashboard["recent_temps"] if r["room"] == "FastPathRoom"]
+        assert flat and dashboard["recent_temps_by_room"]["FastPathRoom"] == flat
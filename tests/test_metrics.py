@@ -0,0 +1,51 @@
+import logging
+import pytest
+from httpx import AsyncClient, ASGITransport
+from home_dashboard import metrics
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+
+def _sample(text: str, prefix: str) -> float:
+    return sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(prefix))
+
+@pytest.mark.asyncio
+async def test_metrics_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("HOME_DASHBOARD_METRICS", raising=False)
+    monkeypatch.delenv("HOME_DASHBOARD_SLOW_REQUEST_MS", raising=False)
+    app = create_app()
+    assert not any(m.cls is metrics.MetricsMiddleware for m in app.user_middleware)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/api/metrics")).status_code == 404
+
+@pytest.mark.asyncio
+async def test_prometheus_metrics_and_slow_log(monkeypatch, caplog):
+    monkeypatch.setenv("HOME_DASHBOARD_METRICS", "true")
+    monkeypatch.setenv("HOME_DASHBOARD_SLOW_REQUEST_MS", "0.001")
+    metrics.reset()
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        created = (await client.post("/api/appliances/", json={"name": "MetricsProbe", "cleaning_interval_days": 4})).json()
+        with caplog.at_level(logging.WARNING, logger="home_dashboard.metrics"):
+            await client.get(f"/api/appliances/{created['id']}/tasks")
+        await client.get("/api/appliances/999999")
+
+        resp = await client.get("/api/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = resp.text
+
+    route = '/api/appliances/{appliance_id}/tasks'
+    assert f'home_dashboard_http_requests_total{{method="GET",route="{route}",status="200"}} 1' in body
+    assert 'route="/api/appliances/{appliance_id}",status="404"' in body
+    assert f'home_dashboard_http_request_duration_seconds_count{{method="GET",route="{route}"}} 1' in body
+    # a non-empty task listing is one query; the appliance is only looked up for empty pages
+    assert f'home_dashboard_http_request_queries_sum{{method="GET",route="{route}"}} 1' in body
+    assert _sample(body, "home_dashboard_db_queries_total") > 0
+    assert "home_dashboard_db_pool_checked_out" in body
+    assert "home_dashboard_dashboard_cache_hits_total 0" in body
+
+    slow = [r for r in caplog.records if "slow request GET" in r.getMessage()]
+    assert slow and "SELECT" in slow[0].getMessage()
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from httpx import AsyncClient, ASGITransport
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+
+async def _walk(client, url, params):
+    seen, pages, cursor = [], [], None
+    while True:
+        resp = await client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert resp.status_code == 200
+        pages.append(resp.json())
+        seen.extend(resp.json())
+        cursor = resp.headers.get("x-next-cursor")
+        if not cursor:
+            return seen, pages
+
+@pytest.mark.asyncio
+async def test_temperature_keyset_pages_and_time_range():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        room = "PagerRoom"
+        await client.delete("/api/temperature/", params={"room": room})
+        base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        batch = [{"value_c": float(i), "room": room, "recorded_at": (base + timedelta(minutes=i)).isoformat()} for i in range(7)]
+        assert (await client.post("/api/temperature/batch", json=batch)).status_code == 201
+
+        seen, pages = await _walk(client, "/api/temperature/", {"room": room, "limit": 3})
+        assert [len(p) for p in pages] == [3, 3, 1]
+        # each page is chronological, pages walk back in time
+        assert [r["value_c"] for r in pages[0]] == [4.0, 5.0, 6.0]
+        assert sorted(r["value_c"] for r in seen) == [float(i) for i in range(7)]
+
+        window = await client.get("/api/temperature/", params={
+            "room": room,
+            "start": (base + timedelta(minutes=2)).isoformat(),
+            "end": (base + timedelta(minutes=5)).isoformat(),
+        })
+        assert [r["value_c"] for r in window.json()] == [2.0, 3.0, 4.0]
+        assert "x-next-cursor" not in window.headers
+
+        bad = await client.get("/api/temperature/", params={"cursor": "%%%"})
+        assert bad.status_code == 400
+
+@pytest.mark.asyncio
+async def test_appliance_and_task_pages():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for name in ["PagerAppliance1", "PagerAppliance2", "PagerAppliance3"]:
+            await client.post("/api/appliances/", json={"name": name, "cleaning_interval_days": 5})
+        everything = (await client.get("/api/appliances/")).json()
+        seen, pages = await _walk(client, "/api/appliances/", {"limit": 2})
+        assert all(len(p) <= 2 for p in pages)
+        assert [a["id"] for a in seen] == [a["id"] for a in everything]
+
+        appliance = next(a for a in everything if a["name"] == "PagerAppliance1")
+        url = f"/api/appliances/{appliance['id']}/tasks"
+        for _ in range(2):
+            open_task = next(t for t in (await client.get(url)).json() if not t["completed"])
+            await client.patch(f"/api/tasks/{open_task['id']}", json={"completed": True})
+        tasks, pages = await _walk(client, url, {"limit": 1})
+        assert len(pages) == 3 and len(tasks) == 3
+        keys = [(t["due_date"], t["id"]) for t in tasks]
+        assert keys == sorted(keys)
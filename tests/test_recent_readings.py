@@ -0,0 +1,81 @@
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from home_dashboard import crud, recent
+from home_dashboard.db import get_read_engine
+from home_dashboard.main import create_app
+
+def test_ring_keeps_newest_in_order():
+    ring = recent.RoomRing("lab", 3)
+    for i, us in enumerate([10, 20, 30, 40]):
+        ring.add(i + 1, us, float(us))
+    assert [r.id for r in ring.newest(5)] == [4, 3, 2] and not ring.complete
+    ring.add(9, 25, 25.0)  # back-dated but inside the window
+    assert [r.value_c for r in ring.newest(3)] == [40.0, 30.0, 25.0]
+    ring.add(8, 5, 5.0)  # older than everything kept
+    assert ring.size == 3 and not ring.can_serve(4)
+    # mid-purge the pushed-out rows may still exist, so the ring only becomes complete at the end
+    ring.evict_before(35, purged=False)
+    assert [r.id for r in ring.newest(3)] == [4] and not ring.complete and not ring.can_serve(2)
+    ring.evict_before(35)
+    assert ring.complete
+
+async def _get(client, url, **params):
+    response = await client.get(url, params=params)
+    assert response.status_code == 200
+    return response.content
+
+@pytest.mark.asyncio
+async def test_hot_reads_match_database_without_queries(monkeypatch):
+    monkeypatch.setenv("HOME_DASHBOARD_TEMP_CACHE_ROWS", "5")
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        assert recent.readings.ready
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.delete('/api/temperature/')
+            base = datetime(2031, 1, 1)
+            await client.post('/api/temperature/', json={'value_c': 18.5, 'room': 'rr-attic', 'recorded_at': base.isoformat() + 'Z'})
+            await client.post('/api/temperature/batch', json=[
+                {'value_c': 20.0 + i, 'room': 'rr-cellar', 'recorded_at': (base + timedelta(minutes=i)).isoformat() + 'Z'}
+                for i in range(7)
+            ])
+            # back-dated reading inside the cellar window
+            await client.post('/api/temperature/', json={'value_c': 99.0, 'room': 'rr-cellar', 'recorded_at': (base + timedelta(minutes=4, seconds=30)).isoformat() + 'Z'})
+
+            reads = [
+                ('/api/temperature/', {'room': 'rr-cellar', 'limit': 4}),
+                ('/api/temperature/', {'per_room_limit': 3}),
+                ('/api/temperature/', {'limit': 4}),
+                ('/api/dashboard', {'per_room_limit': 2}),
+            ]
+            statements = []
+
+            def listener(*args):
+                statements.append(args[2])
+            event.listen(get_read_engine().sync_engine, "before_cursor_execute", listener)
+            try:
+                cached = [await _get(client, url, **params) for url, params in reads]
+                cached_statements = [s for s in statements if 'temperature_readings' in s]
+            finally:
+                event.remove(get_read_engine().sync_engine, "before_cursor_execute", listener)
+            assert cached_statements == []
+
+            # the same reads straight from SQLite
+            recent.readings.reset(0)
+            assert [await _get(client, url, **params) for url, params in reads] == cached
+            recent.readings.reset(5)
+            async with app.state.writer.session_factory() as session:
+                recent.readings.load(await crud.recent_temperatures_per_room(session, 5))
+
+            # the ring holds 5 of 8 cellar readings: deeper pages fall back to the database
+            hits = recent.readings.hits
+            await _get(client, '/api/temperature/', room='rr-cellar', limit=10)
+            assert recent.readings.hits == hits and recent.readings.misses >= 1
+
+            await client.delete('/api/temperature/', params={'room': 'rr-cellar'})
+            assert 'rr-cellar' not in recent.readings.rooms
+            await client.delete('/api/temperature/')
+            assert recent.readings.rooms == {}
+    assert not recent.readings.ready
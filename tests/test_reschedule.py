@@ -0,0 +1,46 @@
+import uuid
+from datetime import date, timedelta
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import update
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db, SessionLocal
+from home_dashboard import models
+
+@pytest.mark.asyncio
+async def test_reschedule_replans_from_single_query():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        # fresh names each run: the test database outlives the test
+        run = uuid.uuid4().hex[:8]
+        a = (await client.post("/api/appliances/", json={"name": f"ReplanA-{run}", "cleaning_interval_days": 5})).json()
+        b = (await client.post("/api/appliances/", json={"name": f"ReplanB-{run}", "cleaning_interval_days": 5})).json()
+        # simulate an import that changed intervals without touching tasks
+        async with SessionLocal() as session:
+            await session.execute(
+                update(models.Appliance).where(models.Appliance.id.in_([a["id"], b["id"]])).values(cleaning_interval_days=12)
+            )
+            await session.commit()
+
+        resp = await client.post("/api/appliances/reschedule", json={"appliance_ids": [a["id"]]})
+        assert resp.status_code == 200
+        assert resp.json() == {"appliances": 1, "deleted": 1, "created": 1}
+        tasks_a = (await client.get(f"/api/appliances/{a['id']}/tasks")).json()
+        assert [t["due_date"] for t in tasks_a] == [str(date.today() + timedelta(days=12))]
+        tasks_b = (await client.get(f"/api/appliances/{b['id']}/tasks")).json()
+        assert [t["due_date"] for t in tasks_b] == [str(date.today() + timedelta(days=5))]
+
+        # re-planning everything is idempotent for appliances that are already consistent
+        # (scoped to this test's appliances: a full re-plan would also touch other tests' data)
+        both = (await client.post("/api/appliances/reschedule", json={"appliance_ids": [a["id"], b["id"]]})).json()
+        assert both["appliances"] == 2
+        tasks_a_again = (await client.get(f"/api/appliances/{a['id']}/tasks")).json()
+        assert [t["due_date"] for t in tasks_a_again] == [str(date.today() + timedelta(days=12))]
+
+        # completion still advances strictly past the completed due date
+        done = await client.patch(f"/api/tasks/{tasks_a_again[0]['id']}", json={"completed": True})
+        assert done.status_code == 200
+        after = (await client.get(f"/api/appliances/{a['id']}/tasks")).json()
+        assert [t["due_date"] for t in after if not t["completed"]] == [str(date.today() + timedelta(days=24))]
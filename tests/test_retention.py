@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from httpx import AsyncClient, ASGITransport
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+from home_dashboard.retention import RetentionPolicy, RetentionWorker, _parse_room_days
+
+def test_parse_room_days():
+    assert _parse_room_days("office=7, garage=90,") == {"office": 7, "garage": 90}
+    policy = RetentionPolicy(default_days=30, room_days={"office": 7})
+    assert policy.enabled
+    assert policy.days_for("office") == 7
+    assert policy.days_for("living") == 30
+    assert not RetentionPolicy().enabled
+
+@pytest.mark.asyncio
+async def test_retention_purges_expired_rows_in_chunks():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete('/api/temperature/?room=ret-room')
+        old = (datetime.now(timezone.utc) - timedelta(days=45)).isoformat()
+        fresh = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+        await client.post('/api/temperature/batch', json=[{'value_c': 10.0 + i, 'room': 'ret-room', 'recorded_at': old} for i in range(5)])
+        await client.post('/api/temperature/', json={'value_c': 21.0, 'room': 'ret-room', 'recorded_at': fresh})
+
+        idle = await client.post('/api/admin/retention/run')
+        assert idle.status_code == 409
+
+        worker = RetentionWorker(app.state.writer, RetentionPolicy(room_days={'ret-room': 30}, batch_size=2, pause_ms=0))
+        app.state.retention = worker
+        resp = await client.post('/api/admin/retention/run')
+        assert resp.status_code == 200
+        status = resp.json()
+        assert status['last_rows_purged_by_room'] == {'ret-room': 5}
+        assert status['policy']['room_days'] == {'ret-room': 30}
+        assert status['runs'] == 1 and status['last_duration_ms'] >= 0
+
+        report = await client.get('/api/admin/retention')
+        assert report.json()['total_rows_purged'] == 5
+        # raw rows are gone but the daily rollup still remembers them
+        daily = await client.get('/api/temperature/rollup', params={'room': 'ret-room', 'resolution': 'day'})
+        assert sum(b['count'] for b in daily.json()) == 6
+        cleared = await client.delete('/api/temperature/?room=ret-room')
+        assert cleared.json()['deleted'] == 1
@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import create_engine, inspect
+from home_dashboard import migrations
+from home_dashboard.main import create_app
+
+def test_migrations_run_once_and_upgrade_legacy_schema():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        # a database from before rooms, schema versions and app_meta existed
+        conn.exec_driver_sql("CREATE TABLE temperature_readings (id INTEGER PRIMARY KEY, recorded_at DATETIME, value_c FLOAT)")
+        conn.exec_driver_sql("INSERT INTO temperature_readings (recorded_at, value_c) VALUES ('2024-01-01 00:00:00', 20.5)")
+        assert migrations.current_version(conn) == 0
+        assert migrations.upgrade(conn) == [m.version for m in migrations.MIGRATIONS]
+        assert migrations.current_version(conn) == migrations.LATEST_VERSION
+        assert migrations.upgrade(conn) == []
+        cols = {c["name"] for c in inspect(conn).get_columns("temperature_readings")}
+        indexes = {i["name"] for i in inspect(conn).get_indexes("temperature_readings")}
+        room = conn.exec_driver_sql("SELECT room FROM temperature_readings").scalar_one()
+    assert "room" in cols and room == "default"
+    assert "ix_temperature_readings_room_recorded_at" in indexes
+
+@pytest.mark.asyncio
+async def test_lifespan_reports_startup_timing():
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            report = (await client.get("/api/admin/startup")).json()
+    assert report["schema_version"] == migrations.LATEST_VERSION
+    assert set(report["phases_ms"]) == {"engine", "migrate", "seed"}
+    assert report["import_ms"] > 0 and report["ready_ms"] >= report["import_ms"]
+
+    # a second boot against the same database finds the schema current
+    again = create_app()
+    async with again.router.lifespan_context(again):
+        assert again.state.startup.migrations_applied == []
+
+@pytest.mark.asyncio
+async def test_startup_report_missing_without_lifespan():
+    transport = ASGITransport(app=create_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/api/admin/startup")).status_code == 404
+
+def test_upgrade_merges_duplicate_appliance_names():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        # names were not unique before ux_appliances_name
+        conn.exec_driver_sql("CREATE TABLE appliances (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, cleaning_interval_days INTEGER, created_at DATETIME)")
+        conn.exec_driver_sql("CREATE TABLE cleaning_tasks (id INTEGER PRIMARY KEY, appliance_id INTEGER NOT NULL REFERENCES appliances(id) ON DELETE CASCADE, due_date DATE NOT NULL, completed BOOLEAN, completed_at DATETIME)")
+        conn.exec_driver_sql(
+            "INSERT INTO appliances (id, name, cleaning_interval_days) VALUES"
+            " (1, 'Washer', 30), (2, 'Dryer', 60), (3, 'Washer', 7), (4, 'Heater', 90), (5, 'Heater', 90), (6, 'Heater', 90)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO cleaning_tasks (id, appliance_id, due_date, completed) VALUES"
+            " (1, 1, '2024-01-01', 1), (2, 1, '2024-05-01', 0), (3, 3, '2023-12-01', 1), (4, 3, '2024-02-01', 0),"
+            " (5, 2, '2024-03-01', 0), (6, 5, '2024-04-01', 0), (7, 6, '2024-03-15', 0)"
+        )
+        migrations.upgrade(conn)
+        appliances = conn.exec_driver_sql("SELECT id, name FROM appliances ORDER BY id").all()
+        tasks = conn.exec_driver_sql("SELECT id, appliance_id FROM cleaning_tasks ORDER BY id").all()
+        indexes = {i["name"] for i in inspect(conn).get_indexes("appliances")}
+    assert [tuple(a) for a in appliances] == [(1, "Washer"), (2, "Dryer"), (4, "Heater")]
+    # completed history moves over; the survivor keeps its own open task, or else the duplicates' earliest
+    assert [tuple(t) for t in tasks] == [(1, 1), (2, 1), (3, 1), (5, 2), (7, 4)]
+    assert "ux_appliances_name" in indexes
+
+_BOOT = """
+import asyncio
+from home_dashboard.db import dispose_engines, init_db
+
+async def boot():
+    await init_db()
+    await dispose_engines()
+
+asyncio.run(boot())
+"""
+
+def test_workers_booting_together_migrate_once(tmp_path):
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    env = {**os.environ, "HOME_DASHBOARD_DB_URL": f"sqlite+aiosqlite:///{tmp_path / 'race.db'}", "PYTHONPATH": src}
+    workers = [subprocess.Popen([sys.executable, "-c", _BOOT], env=env, stderr=subprocess.PIPE) for _ in range(3)]
+    errors = [worker.communicate()[1].decode() for worker in workers]
+    assert [worker.returncode for worker in workers] == [0, 0, 0], errors
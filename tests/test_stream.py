@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from httpx import AsyncClient, ASGITransport
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+from home_dashboard import broadcast
+from home_dashboard.routers.stream import event_stream
+
+class _Connected:
+    def __init__(self):
+        self.closed = False
+
+    async def is_disconnected(self):
+        return self.closed
+
+def test_subscription_filters_and_coalesces():
+    hub = broadcast.Broadcaster()
+    living = hub.subscribe(["living"], max_queue=2)
+    everyone = hub.subscribe()
+    for value in (20.0, 21.0, 22.0):
+        hub.publish(broadcast.Event("temperature.added", {"value_c": value}, room="living"))
+    hub.publish(broadcast.Event("temperature.added", {"value_c": 5.0}, room="garage"))
+    hub.publish(broadcast.Event("task.updated", {"id": 1}))
+    queued = list(living._events)
+    # garage filtered out, the living backlog collapsed to its newest reading, task kept
+    assert [e.kind for e in queued] == ["temperature.added", "task.updated"]
+    assert queued[0].data["value_c"] == 22.0
+    assert living.take_dropped() == 2
+    assert len(everyone._events) == 5
+    hub.unsubscribe(everyone)
+    assert hub.subscriber_count == 1
+
+@pytest.mark.asyncio
+async def test_committed_writes_reach_stream():
+    app = create_app()
+    await init_db()
+    request = _Connected()
+    stream = event_stream(request, broadcast.broadcaster, ["sse-room"], heartbeat_s=0.05)
+    assert await stream.__anext__() == "retry: 3000\n\n"
+    assert await stream.__anext__() == ": ping\n\n"
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post('/api/temperature/', json={'value_c': 24.5, 'room': 'other-room'})
+        await client.post('/api/temperature/', json={'value_c': 19.5, 'room': 'sse-room'})
+        frame = await asyncio.wait_for(stream.__anext__(), 1)
+        assert "event: temperature.added" in frame
+        assert '"room":"sse-room"' in frame and '"value_c":19.5' in frame
+        await client.delete('/api/temperature/?room=sse-room')
+        await client.delete('/api/temperature/?room=other-room')
+    request.closed = True
+    await stream.aclose()
@@ -0,0 +1,59 @@
+import json
+import pytest
+from httpx import AsyncClient, ASGITransport
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+
+@pytest.mark.asyncio
+async def test_batch_json_array_and_ndjson():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete('/api/temperature/?room=batch-json')
+        await client.delete('/api/temperature/?room=batch-nd')
+        items = [{"value_c": 20 + i / 10, "room": "batch-json"} for i in range(1200)]
+        resp = await client.post('/api/temperature/batch', json=items)
+        assert resp.status_code == 201
+        assert resp.json() == {"inserted": 1200, "chunks": 3}
+        lines = [json.dumps({"value_c": 19.5, "room": "batch-nd", "recorded_at": "2024-01-01T10:00:00+02:00"}) for _ in range(3)]
+        resp = await client.post(
+            '/api/temperature/batch',
+            content="\n".join(lines) + "\n",
+            headers={"content-type": "application/x-ndjson"},
+        )
+        assert resp.status_code == 201
+        assert resp.json()["inserted"] == 3
+        cleared = await client.delete('/api/temperature/?room=batch-json')
+        assert cleared.json()["deleted"] == 1200
+        cleared = await client.delete('/api/temperature/?room=batch-nd')
+        assert cleared.json()["deleted"] == 3
+
+@pytest.mark.asyncio
+async def test_batch_invalid_item_rejects_whole_batch():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete('/api/temperature/?room=batch-bad')
+        body = '{"value_c": 20.0, "room": "batch-bad"}\n{"value_c": "hot", "room": "batch-bad"}\n'
+        resp = await client.post('/api/temperature/batch', content=body, headers={"content-type": "application/x-ndjson"})
+        assert resp.status_code == 422
+        assert resp.json()["detail"][0]["loc"][:2] == ["body", 1]
+        cleared = await client.delete('/api/temperature/?room=batch-bad')
+        assert cleared.json()["deleted"] == 0
+
+@pytest.mark.asyncio
+async def test_ndjson_line_must_hold_one_reading():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete('/api/temperature/?room=batch-lines')
+        # errors are located by line index, blank lines included
+        body = '{"value_c": 20.0, "room": "batch-lines"}\n\n{"value_c": 1, "room": "batch-lines"},{"value_c": 2, "room": "batch-lines"}\n'
+        resp = await client.post('/api/temperature/batch', content=body, headers={"content-type": "application/x-ndjson"})
+        assert resp.status_code == 422
+        assert [e["loc"][:2] for e in resp.json()["detail"]] == [["body", 2]]
+        cleared = await client.delete('/api/temperature/?room=batch-lines')
+        assert cleared.json()["deleted"] == 0
@@ -0,0 +1,74 @@
+import ast
+import csv
+import io
+import json
+import struct
+from datetime import datetime, timedelta, timezone
+import pytest
+from httpx import AsyncClient, ASGITransport
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+
+ROOM = "ExportRoom"
+
+def _parse_npy(body: bytes):
+    assert body[:8] == b"\x93NUMPY\x01\x00"
+    header_len = struct.unpack("<H", body[8:10])[0]
+    assert (10 + header_len) % 64 == 0
+    header = ast.literal_eval(body[10:10 + header_len].decode("latin1"))
+    width = int(header["descr"][3][1][2:])
+    record = struct.Struct(f"<qqd{width}s")
+    data = body[10 + header_len:]
+    assert len(data) == record.size * header["shape"][0]
+    return header, list(record.iter_unpack(data))
+
+@pytest.mark.asyncio
+async def test_export_formats_and_range(monkeypatch):
+    # tiny partitions so the stream spans several chunks
+    monkeypatch.setattr("home_dashboard.export.EXPORT_CHUNK_ROWS", 3)
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete("/api/temperature/", params={"room": ROOM})
+        base = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        batch = [{"value_c": 20 + i / 4, "room": ROOM, "recorded_at": (base + timedelta(minutes=i)).isoformat()} for i in range(10)]
+        await client.post("/api/temperature/batch", json=batch)
+        window = {"room": ROOM, "start": (base + timedelta(minutes=2)).isoformat(), "end": (base + timedelta(minutes=9)).isoformat()}
+
+        resp = await client.get("/api/temperature/export", params={**window, "format": "csv"})
+        assert resp.headers["content-type"].startswith("text/csv")
+        assert 'filename="temperature-ExportRoom.csv"' in resp.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(resp.text)))
+        assert [float(r["value_c"]) for r in rows] == [20 + i / 4 for i in range(2, 9)]
+
+        resp = await client.get("/api/temperature/export", params={**window, "format": "ndjson"})
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [r["value_c"] for r in lines] == [20 + i / 4 for i in range(2, 9)]
+        assert lines[0]["room"] == ROOM and lines[0]["recorded_at"].startswith("2024-05-01T00:02:00")
+
+        resp = await client.get("/api/temperature/export", params={"room": ROOM, "format": "npy"})
+        header, records = _parse_npy(resp.content)
+        assert header["shape"] == (10,) and header["descr"][1] == ("recorded_at", "<M8[us]")
+        assert [r[2] for r in records] == [20 + i / 4 for i in range(10)]
+        assert records[0][1] == int(base.timestamp()) * 1_000_000
+        assert {r[3].rstrip(b"\0") for r in records} == {ROOM.encode()}
+
+        empty = await client.get("/api/temperature/export", params={"room": "NoSuchRoom", "format": "npy"})
+        assert _parse_npy(empty.content)[0]["shape"] == (0,)
+        assert (await client.get("/api/temperature/export", params={"format": "xlsx"})).status_code == 422
+
+@pytest.mark.asyncio
+async def test_export_filename_is_header_safe():
+    await init_db()
+    transport = ASGITransport(app=create_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/temperature/export", params={"room": "客厅"})
+        assert resp.status_code == 200
+        assert resp.headers["content-disposition"] == (
+            "attachment; filename=\"temperature-__.csv\"; filename*=UTF-8''temperature-%E5%AE%A2%E5%8E%85.csv"
+        )
+        resp = await client.get("/api/temperature/export", params={"room": 'a"b', "format": "ndjson"})
+        assert resp.headers["content-disposition"] == (
+            "attachment; filename=\"temperature-a_b.ndjson\"; filename*=UTF-8''temperature-a%22b.ndjson"
+        )
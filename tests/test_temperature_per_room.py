@@ -0,0 +1,33 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+
+@pytest.mark.asyncio
+async def test_per_room_latest_keeps_quiet_rooms():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete('/api/temperature/')
+        # a chatty room that would fill the global top 200 on its own
+        await client.post('/api/temperature/', json={'value_c': 16.0, 'room': 'pr-quiet', 'recorded_at': '2024-01-01T00:00:00Z'})
+        await client.post('/api/temperature/batch', json=[
+            {'value_c': round(20.0 + i / 100, 2), 'room': 'pr-chatty', 'recorded_at': f'2024-01-02T{i // 60:02d}:{i % 60:02d}:00Z'}
+            for i in range(250)
+        ])
+        default = await client.get('/api/dashboard')
+        assert 'pr-quiet' not in default.json()['recent_temps_by_room']
+
+        resp = await client.get('/api/dashboard', params={'per_room_limit': 3})
+        grouped = resp.json()['recent_temps_by_room']
+        assert len(grouped['pr-quiet']) == 1
+        assert [r['value_c'] for r in grouped['pr-chatty']] == [22.47, 22.48, 22.49]
+
+        listing = await client.get('/api/temperature/', params={'per_room_limit': 2})
+        assert [(r['room'], r['value_c']) for r in listing.json()] == [
+            ('pr-chatty', 22.48), ('pr-chatty', 22.49), ('pr-quiet', 16.0),
+        ]
+        one_room = await client.get('/api/temperature/', params={'room': 'pr-chatty', 'per_room_limit': 2})
+        assert [r['value_c'] for r in one_room.json()] == [22.48, 22.49]
+        await client.delete('/api/temperature/')
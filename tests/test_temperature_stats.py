@@ -0,0 +1,55 @@
+import statistics
+from datetime import datetime, timedelta, timezone
+import pytest
+from httpx import AsyncClient, ASGITransport
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+from home_dashboard.stats import percentile
+
+def test_percentile_interpolates_like_numpy():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 0) == 1.0 and percentile(values, 100) == 4.0
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 90) == pytest.approx(3.7)
+    assert percentile([7.0], 95) == 7.0
+
+@pytest.mark.asyncio
+async def test_stats_per_room_and_bucket():
+    app = create_app()
+    await init_db()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        rooms = ["StatsA", "StatsB"]
+        for room in rooms + ["StatsOther"]:
+            await client.delete("/api/temperature/", params={"room": room})
+        base = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        values = {"StatsA": [18.0, 19.0, 20.0, 21.0, 22.0, 30.0], "StatsB": [5.0, 5.0]}
+        batch = [
+            {"value_c": v, "room": room, "recorded_at": (base + timedelta(minutes=40 * i)).isoformat()}
+            for room, vs in values.items() for i, v in enumerate(vs)
+        ]
+        batch.append({"value_c": 99.0, "room": "StatsOther", "recorded_at": base.isoformat()})
+        await client.post("/api/temperature/batch", json=batch)
+
+        resp = await client.get("/api/temperature/stats", params={"rooms": "StatsA,StatsB", "percentiles": "50,95"})
+        assert resp.status_code == 200
+        by_room = {g["room"]: g for g in resp.json()}
+        assert set(by_room) == set(rooms)
+        a = by_room["StatsA"]
+        assert a["count"] == 6 and a["min_c"] == 18.0 and a["max_c"] == 30.0 and a["bucket_start"] is None
+        assert a["mean_c"] == pytest.approx(statistics.fmean(values["StatsA"]))
+        assert a["stddev_c"] == pytest.approx(statistics.pstdev(values["StatsA"]))
+        assert a["percentiles"] == {"p50": pytest.approx(20.5), "p95": pytest.approx(28.0)}
+        assert by_room["StatsB"]["stddev_c"] == 0.0
+
+        # readings at minutes 0, 40, 80, 120, 160 and 200
+        hourly = (await client.get("/api/temperature/stats", params={"rooms": "StatsA", "bucket": "hour"})).json()
+        assert [g["count"] for g in hourly] == [2, 1, 2, 1]
+        assert hourly[2]["min_c"] == 21.0 and hourly[2]["max_c"] == 22.0
+        assert hourly[0]["bucket_start"].startswith("2024-06-01T00:00:00")
+        assert set(hourly[0]["percentiles"]) == {"p50", "p95", "p99"}
+
+        none = (await client.get("/api/temperature/stats", params={"rooms": "StatsB", "percentiles": ""})).json()
+        assert none[0]["percentiles"] == {}
+        bad = await client.get("/api/temperature/stats", params={"percentiles": "50,150"})
+        assert bad.status_code == 422
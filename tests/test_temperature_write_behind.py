@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.exc import OperationalError
+from home_dashboard import crud
+from home_dashboard.main import create_app
+from home_dashboard.db import init_db
+from home_dashboard.ingest import TemperatureWriteBuffer
+
+@pytest.mark.asyncio
+async def test_group_commit_acknowledges_after_flush():
+    app = create_app()
+    await init_db()
+    buffer = TemperatureWriteBuffer(app.state.writer, flush_rows=5, flush_ms=20, durability="commit")
+    await buffer.start()
+    app.state.temperature_buffer = buffer
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete('/api/temperature/?room=wb-commit')
+        posts = [client.post('/api/temperature/', json={'value_c': 20 + i, 'room': 'wb-commit'}) for i in range(12)]
+        responses = await asyncio.gather(*posts)
+        assert all(r.status_code == 201 for r in responses)
+        assert len({r.json()['id'] for r in responses}) == 12
+        assert buffer.flushes < 12
+        await buffer.stop()
+        cleared = await client.delete('/api/temperature/?room=wb-commit')
+        assert cleared.json()['deleted'] == 12
+
+@pytest.mark.asyncio
+async def test_enqueue_mode_backpressure_and_drain():
+    app = create_app()
+    await init_db()
+    buffer = TemperatureWriteBuffer(app.state.writer, flush_rows=100, flush_ms=10, durability="enqueue", max_queue=2)
+    app.state.temperature_buffer = buffer
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete('/api/temperature/?room=wb-enqueue')
+        # writer not started yet, so the bounded queue fills up
+        first = await client.post('/api/temperature/', json={'value_c': 18.0, 'room': 'wb-enqueue'})
+        second = await client.post('/api/temperature/', json={'value_c': 18.5, 'room': 'wb-enqueue'})
+        third = await client.post('/api/temperature/', json={'value_c': 19.0, 'room': 'wb-enqueue'})
+        assert first.status_code == 202 and first.json()['queued'] is True
+        assert second.status_code == 202
+        assert third.status_code == 429
+        await buffer.start()
+        await buffer.stop()
+        assert buffer.flushed_rows == 2
+        cleared = await client.delete('/api/temperature/?room=wb-enqueue')
+        assert cleared.json()['deleted'] == 2
+
+@pytest.mark.asyncio
+async def test_busy_flush_is_retried_not_dropped(monkeypatch):
+    app = create_app()
+    await init_db()
+    real = crud.add_temperature_readings
+    calls = []
+
+    async def locked_once(session, rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+        return await real(session, rows)
+
+    monkeypatch.setattr(crud, "add_temperature_readings", locked_once)
+    buffer = TemperatureWriteBuffer(app.state.writer, flush_rows=10, flush_ms=10, durability="enqueue")
+    app.state.temperature_buffer = buffer
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.delete('/api/temperature/?room=wb-busy')
+        await buffer.start()
+        accepted = await client.post('/api/temperature/', json={'value_c': 17.5, 'room': 'wb-busy'})
+        assert accepted.status_code == 202
+        await buffer.stop()
+        assert calls == [1, 1] and app.state.writer.busy_retries == 1
+        assert buffer.failed_rows == 0 and buffer.flushed_rows == 1
+        cleared = await client.delete('/api/temperature/?room=wb-busy')
+        assert cleared.json()['deleted'] == 1
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from home_dashboard import models, writes
+from home_dashboard.db import new_session
+from home_dashboard.main import create_app
+
+def _locked() -> OperationalError:
+    return OperationalError("INSERT", {}, Exception("database is locked"))
+
+@pytest.mark.asyncio
+async def test_busy_write_is_rolled_back_and_retried():
+    coordinator = writes.WriteCoordinator(new_session, writes.WriteSettings(backoff_ms=1))
+    attempts = []
+
+    async def op(session):
+        attempts.append(1)
+        session.add(models.Appliance(name=f"Retry-{id(attempts)}", cleaning_interval_days=3))
+        await session.flush()
+        if len(attempts) == 1:
+            raise _locked()
+        return len(attempts)
+
+    assert await coordinator.run(op) == 2
+    assert coordinator.busy_retries == 1 and coordinator.commits == 1
+    async with new_session() as session:
+        names = (await session.execute(select(models.Appliance.name).where(models.Appliance.name == f"Retry-{id(attempts)}"))).scalars().all()
+    assert len(names) == 1  # the failed attempt left nothing behind
+
+@pytest.mark.asyncio
+async def test_busy_write_gives_up_after_retries_and_other_errors_are_not_retried():
+    coordinator = writes.WriteCoordinator(new_session, writes.WriteSettings(retries=2, backoff_ms=1))
+
+    async def always_locked(session):
+        raise _locked()
+
+    with pytest.raises(OperationalError):
+        await coordinator.run(always_locked)
+    assert coordinator.busy_retries == 2 and coordinator.busy_failures == 1
+
+    async def broken(session):
+        raise OperationalError("SELECT", {}, Exception("no such table: nope"))
+
+    with pytest.raises(OperationalError):
+        await coordinator.run(broken)
+    assert coordinator.busy_retries == 2
+
+@pytest.mark.asyncio
+async def test_queue_mode_runs_one_write_at_a_time_and_drains_on_stop():
+    coordinator = writes.WriteCoordinator(new_session, writes.WriteSettings(mode="queue"))
+    running = []
+    overlap = []
+
+    async def op(session):
+        running.append(1)
+        overlap.append(len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+        return True
+
+    results = await asyncio.gather(*(coordinator.run(op) for _ in range(5)))
+    assert results == [True] * 5 and max(overlap) == 1
+    await coordinator.stop()
+    assert coordinator.commits == 5 and coordinator.queue_depth == 0
+
+@pytest.mark.asyncio
+async def test_endpoints_write_through_the_coordinator(monkeypatch):
+    monkeypatch.setenv("HOME_DASHBOARD_WRITE_MODE", "queue")
+    app = create_app()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        created = await client.post("/api/appliances/", json={"name": "Queued Kettle", "cleaning_interval_days": 5})
+        assert created.status_code in (200, 201)
+        appliance_id = created.json()["id"]
+        assert (await client.patch(f"/api/appliances/{appliance_id}/interval", json={"cleaning_interval_days": 9})).json()["cleaning_interval_days"] == 9
+        assert (await client.patch("/api/appliances/999999/interval", json={"cleaning_interval_days": 9})).status_code == 404
+    assert app.state.writer.commits >= 3
+    await app.state.writer.stop()
+
+def test_write_mode_is_validated(monkeypatch):
+    monkeypatch.setenv("HOME_DASHBOARD_WRITE_MODE", "parallel")
+    with pytest.raises(ValueError):
+        writes.WriteSettings.from_env()